@@ -0,0 +1,34 @@
+"""
+Benchmark the integer-cents engine against the float engines it replaces, and
+report how far the float plans drift from the exact one.
+
+Run from the main directory:
+    python -m benchmarks.bench_cents_engine
+"""
+import numpy as np
+from strategies.snowball import SnowballStrategy
+from benchmarks.bench_plan_summary import best_of, make_portfolio, EXTRA_CASH
+
+LOAN_COUNTS = (5, 25, 100, 300)
+
+
+def main():
+    print(f"{'loans':>6}{'months':>8}{'python ms':>11}{'numpy ms':>10}{'cents ms':>10}"
+          f"{'vs python':>11}{'vs numpy':>10}{'max drift $':>13}")
+    for loan_count in LOAN_COUNTS:
+        loans = make_portfolio(loan_count)
+        times = {}
+        plans = {}
+        for engine in ("python", "numpy", "cents"):
+            strategy = SnowballStrategy(engine=engine)
+            plans[engine] = strategy.generate_payment_plan(loans, extra_cash=EXTRA_CASH)
+            times[engine] = best_of(lambda: strategy.generate_payment_plan(loans, extra_cash=EXTRA_CASH))
+        exact, periods = plans["cents"], min(len(plans["cents"]), len(plans["python"]))
+        drift = np.abs(plans["python"].balances[:periods] - exact.balances[:periods]).max()
+        print(f"{loan_count:>6}{len(exact):>8}{times['python'] * 1000:>11.1f}{times['numpy'] * 1000:>10.1f}"
+              f"{times['cents'] * 1000:>10.1f}{times['python'] / times['cents']:>10.1f}x"
+              f"{times['numpy'] / times['cents']:>9.1f}x{drift:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
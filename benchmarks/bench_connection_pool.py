@@ -0,0 +1,66 @@
+"""
+Benchmark point reads of the loans table through the connection pool against
+opening a new connection per read, as LoanListView.load_loans did, from one thread
+and from several reader threads at once.
+
+Run from the main directory:
+    python -m benchmarks.bench_connection_pool
+"""
+import contextlib
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+from database.db import ConnectionPool, Database
+from benchmarks.bench_portfolio_load import fill_database
+
+LOAN_COUNT = 10_000
+READS = 20_000
+THREAD_COUNTS = (1, 4)
+QUERY = "SELECT * FROM loans WHERE id = ?"
+
+
+def reconnecting_read(path, loan_id):
+    # What Database() + connect() + close() cost, without their console output
+    pool = ConnectionPool(path)
+    pool.connection().execute(QUERY, (loan_id,)).fetchone()
+    pool.close_all()
+
+
+def run_readers(thread_count, read):
+    def work(seed):
+        for loan_id in random.Random(seed).choices(range(1, LOAN_COUNT + 1), k=READS // thread_count):
+            read(loan_id)
+
+    threads = [threading.Thread(target=work, args=(seed,)) for seed in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "loans.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = Database(path)
+            db.connect()
+            fill_database(db, LOAN_COUNT)
+
+        print(f"{READS} lookups among {LOAN_COUNT} loans")
+        print(f"{'threads':>8}{'reconnect ms':>14}{'pooled ms':>11}{'speedup':>9}")
+        for thread_count in THREAD_COUNTS:
+            reconnect = run_readers(thread_count, lambda loan_id: reconnecting_read(path, loan_id))
+            pooled = run_readers(thread_count, lambda loan_id: db.fetchone(QUERY, (loan_id,)))
+            print(f"{thread_count:>8}{reconnect * 1000:>14.0f}{pooled * 1000:>11.0f}{reconnect / pooled:>8.1f}x")
+        print(f"pool: {db.pool.stats()}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
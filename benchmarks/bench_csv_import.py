@@ -0,0 +1,59 @@
+"""
+Benchmark the bulk CSV import against inserting and committing one row at a time,
+as LoanManagerApp.import_from_csv did before. Both write to a database file, so
+the per-row path pays a commit (and fsync) per loan.
+
+Run from the main directory:
+    python -m benchmarks.bench_csv_import
+"""
+import csv
+import os
+import tempfile
+import time
+from database.db import Database
+from database.csv_import import INSERT_LOAN, import_loans_csv, validate_rows
+
+ROW_COUNTS = (1_000, 10_000, 50_000)
+
+
+def write_csv(path, row_count):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "principal", "current_balance", "interest_rate", "monthly_min_payment",
+                         "extra_payment", "first_due_date", "lender", "loan_term_months", "notes"])
+        for i in range(row_count):
+            writer.writerow([f"Loan {i}", 10000.0, 8000.0 + i % 500, 5.0, 150.0, 0.0,
+                             f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}", "Bank", 120, ""])
+
+
+def import_row_by_row(db, path):
+    with open(path, "r", newline="", encoding="utf-8") as csvfile:
+        values, _, _ = validate_rows(csv.DictReader(csvfile))
+    for params in values:
+        db.execute(INSERT_LOAN, params)
+
+
+def timed_import(directory, csv_path, run):
+    db = Database(os.path.join(directory, f"bench_{time.perf_counter_ns()}.db"))
+    db.connect()
+    db.init_schema()
+    start = time.perf_counter()
+    run(db, csv_path)
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'rows':>8}{'row by row s':>14}{'bulk s':>10}{'speedup':>10}")
+        for row_count in ROW_COUNTS:
+            csv_path = os.path.join(directory, f"loans_{row_count}.csv")
+            write_csv(csv_path, row_count)
+            before = timed_import(directory, csv_path, import_row_by_row)
+            after = timed_import(directory, csv_path, import_loans_csv)
+            print(f"{row_count:>8}{before:>14.2f}{after:>10.3f}{before / after:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark import and read throughput of a loans database file under each
+performance profile in config.DB_PROFILES:
+
+- bulk: import_loans_csv of a large file, one transaction
+- single: loans added one commit at a time, as the loan entry form does
+- scan: Portfolio.from_database over the whole table, on a fresh connection
+- lookup: fetchone by id for random loans
+
+Run from the main directory:
+    python -m benchmarks.bench_db_profiles
+"""
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+from config import DB_PROFILES
+from database.db import Database
+from database.csv_import import INSERT_LOAN, import_loans_csv
+from models.portfolio import Portfolio
+from benchmarks.bench_csv_import import write_csv
+from benchmarks.bench_plan_summary import best_of
+
+BULK_ROWS = 100_000
+SINGLE_ROWS = 2_000
+LOOKUPS = 20_000
+
+
+def open_database(path, profile):
+    # Database.connect reports every connection; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = Database(path, profile)
+        db.connect()
+    return db
+
+
+def close_database(db):
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.close()
+
+
+def run_profile(directory, csv_path, profile):
+    path = os.path.join(directory, f"{profile}.db")
+    db = open_database(path, profile)
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.init_schema()
+
+    start = time.perf_counter()
+    import_loans_csv(db, csv_path)
+    bulk = time.perf_counter() - start
+
+    params = ("Form Loan", 10000.0, 8000.0, 5.0, 150.0, 0.0, "2025-06-01", None, None, None)
+    start = time.perf_counter()
+    for _ in range(SINGLE_ROWS):
+        db.execute(INSERT_LOAN, params)
+    single = time.perf_counter() - start
+    close_database(db)
+
+    def scan():
+        reader = open_database(path, profile)
+        Portfolio.from_database(reader)
+        close_database(reader)
+
+    scan_time = best_of(scan)
+    db = open_database(path, profile)
+    ids = random.Random(0).choices(range(1, BULK_ROWS + 1), k=LOOKUPS)
+    lookup = best_of(lambda: [db.fetchone("SELECT * FROM loans WHERE id = ?", (loan_id,)) for loan_id in ids])
+    close_database(db)
+    return bulk, single, scan_time, lookup
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "loans.csv")
+        write_csv(csv_path, BULK_ROWS)
+        print(f"{'profile':<9}{'bulk rows/s':>13}{'single rows/s':>15}{'scan rows/s':>13}{'lookups/s':>11}")
+        for profile in DB_PROFILES:
+            bulk, single, scan, lookup = run_profile(directory, csv_path, profile)
+            print(f"{profile:<9}{BULK_ROWS / bulk:>13,.0f}{SINGLE_ROWS / single:>15,.0f}"
+                  f"{(BULK_ROWS + SINGLE_ROWS) / scan:>13,.0f}{LOOKUPS / lookup:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark cloning and storing loans: the slotted Loan.copy() against re-running the
+constructor, and the slotted layout against the same fields kept in an instance dict.
+
+Run from the main directory:
+    python -m benchmarks.bench_loan_clone
+"""
+import tracemalloc
+from models.loan import Loan
+from benchmarks.bench_plan_summary import best_of, make_portfolio
+
+LOAN_COUNT = 10_000
+
+
+class DictLoan:
+    """The same fields stored in a per-instance __dict__, as Loan did before it was slotted."""
+
+    def __init__(self, fields):
+        self.__dict__.update(fields)
+
+
+def constructor_clone(loan):
+    # The clone generate_payment_plan used to make: every field back through __init__
+    fields = loan.to_dict()
+    del fields["adjusted_min_payment"]
+    return Loan(**fields)
+
+
+def allocated(build):
+    tracemalloc.start()
+    objects = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def main():
+    loans = make_portfolio(LOAN_COUNT)
+    constructor = best_of(lambda: [constructor_clone(loan) for loan in loans])
+    copied = best_of(lambda: [loan.copy() for loan in loans])
+    print(f"clone {LOAN_COUNT} loans: constructor {constructor * 1000:.1f} ms, copy() {copied * 1000:.1f} ms "
+          f"({constructor / copied:.1f}x)")
+
+    fields = [loan.to_dict() for loan in loans]
+    slotted = allocated(lambda: [loan.copy() for loan in loans])
+    dict_backed = allocated(lambda: [DictLoan(row) for row in fields])
+    print(f"memory for {LOAN_COUNT} loans: __dict__ {dict_backed / 1024:.0f} KiB, __slots__ {slotted / 1024:.0f} KiB "
+          f"({dict_backed / slotted:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark bulk loading loans with Loan.from_row, against the strptime-only date
+parsing Loan used before its ISO fast path and cache.
+
+Run from the main directory:
+    python -m benchmarks.bench_loan_load
+"""
+import random
+from datetime import date, datetime, timedelta
+from models import loan as loan_module
+from models.loan import Loan
+from benchmarks.bench_plan_summary import best_of
+
+ROW_COUNT = 100_000
+
+
+def strptime_parse_date(value):
+    # Loan._parse_date before the fast path
+    if value is None:
+        return None
+    if isinstance(value, date):
+        return value
+    for fmt in loan_module.DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except (ValueError, TypeError):
+            continue
+    raise ValueError(f"Date '{value}' is not in a recognized format")
+
+
+def make_rows(row_count, seed=0):
+    """Rows shaped like SELECT * FROM loans: due dates on the 1st, timestamps from a few import runs."""
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    imports = [datetime(2025, 1, 1) + timedelta(seconds=rng.randrange(10_000_000)) for _ in range(200)]
+    rows = []
+    for i in range(row_count):
+        due = start + timedelta(days=31 * rng.randrange(120))
+        rows.append({
+            "id": i, "name": f"Loan {i}", "principal": 10000.0, "current_balance": 8000.0, "interest_rate": 5.0,
+            "monthly_min_payment": 150.0, "extra_payment": 0.0, "first_due_date": due.replace(day=1).isoformat(),
+            "interest_change_rate": 0.0, "loan_term_months": 120, "lender": None, "notes": None,
+            "forbearance_start_date": None, "forbearance_end_date": None, "total_paid": 0.0,
+            "last_payment_date": None, "created_at": rng.choice(imports).strftime("%Y-%m-%d %H:%M:%S"),
+        })
+    return rows
+
+
+def main():
+    rows = make_rows(ROW_COUNT)
+
+    def load():
+        return [Loan.from_row(row) for row in rows]
+
+    fast_path = Loan.__dict__["_parse_date"]
+    Loan._parse_date = staticmethod(strptime_parse_date)
+    try:
+        before = best_of(load)
+    finally:
+        Loan._parse_date = fast_path
+
+    def load_cold():
+        loan_module._parse_date_string.cache_clear()
+        return load()
+
+    cold = best_of(load_cold)
+    warm = best_of(load)
+    print(f"from_row x {ROW_COUNT}: strptime {before * 1000:.0f} ms, fast path {cold * 1000:.0f} ms "
+          f"({before / cold:.1f}x), warm cache {warm * 1000:.0f} ms ({before / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
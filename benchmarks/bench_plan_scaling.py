@@ -0,0 +1,50 @@
+"""
+Benchmark how generate_payment_plan scales with plan length.
+
+Each portfolio is sized so the plan runs for the requested number of periods.
+With the per-period extra-cash schedule applied in O(1), time per period should
+stay flat as plans grow; the old replay of every earlier period made it grow
+linearly (quadratic overall).
+
+Run from the main directory:
+    python -m benchmarks.bench_plan_scaling
+"""
+import time
+from models.loan import Loan
+from utils.generate_payment_plan import generate_payment_plan
+
+LOAN_COUNT = 20
+PERIODS = (60, 120, 240, 480, 600, 960)
+
+
+def make_portfolio(periods, loan_count=LOAN_COUNT):
+    """Zero-interest loans that each take ``periods`` months to retire on minimums alone."""
+    return [
+        Loan(id=i, name=f"Loan {i}", principal=periods * 50.0, current_balance=periods * 50.0,
+             interest_rate=0.0, monthly_min_payment=50.0, extra_payment=0.0, first_due_date="2025-06-01")
+        for i in range(loan_count)
+    ]
+
+
+def time_plan(loans, engine, extra_cash_schedule, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        plan = generate_payment_plan(loans, 0.0, engine=engine, extra_cash_schedule=extra_cash_schedule)
+        best = min(best, time.perf_counter() - start)
+    return len(plan), best
+
+
+def main():
+    print(f"{'engine':<8}{'periods':>10}{'total ms':>12}{'us/period':>12}")
+    for engine in ("python", "numpy"):
+        for periods in PERIODS:
+            loans = make_portfolio(periods)
+            # A sparse schedule: a zero-extra month every year
+            schedule = {month: 0.0 for month in range(0, periods, 12)}
+            rows, seconds = time_plan(loans, engine, schedule)
+            print(f"{engine:<8}{rows:>10}{seconds * 1000:>12.1f}{seconds / rows * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
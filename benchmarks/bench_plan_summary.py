@@ -0,0 +1,62 @@
+"""
+Benchmark summarize_plan against building the full plan and aggregating its rows.
+
+Run from the main directory:
+    python -m benchmarks.bench_plan_summary
+"""
+import random
+import time
+from models.loan import Loan
+from strategies.snowball import SnowballStrategy
+from strategies.avalanche import AvalancheStrategy
+
+LOAN_COUNTS = (5, 25, 100, 300)
+EXTRA_CASH = 250.0
+
+
+def make_portfolio(loan_count, seed=0):
+    """Amortizing loans that take roughly 10 to 30 years to retire."""
+    rng = random.Random(seed)
+    loans = []
+    for i in range(loan_count):
+        balance = round(rng.uniform(2000, 40000), 2)
+        rate = round(rng.uniform(2, 24), 2)
+        months = rng.randint(120, 360)
+        monthly_rate = rate / 100 / 12
+        # Minimum covers the (doubly accrued) interest with room to amortize
+        min_payment = round(balance * 2 * monthly_rate + balance / months, 2)
+        loans.append(Loan(id=i, name=f"Loan {i}", principal=balance, current_balance=balance, interest_rate=rate,
+                          monthly_min_payment=min_payment, extra_payment=0.0, first_due_date="2025-06-01"))
+    return loans
+
+
+def best_of(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def summary_from_rows(strategy, loans):
+    plan = strategy.generate_payment_plan(loans, extra_cash=EXTRA_CASH)
+    return len(plan), sum(sum(period["payments"].values()) for period in plan)
+
+
+def main():
+    print(f"{'strategy':<11}{'engine':<8}{'loans':>6}{'months':>8}{'full plan ms':>14}{'summary ms':>12}{'speedup':>9}")
+    for strategy_class in (SnowballStrategy, AvalancheStrategy):
+        for engine in ("python", "numpy", "events"):
+            strategy = strategy_class(engine=engine)
+            for loan_count in LOAN_COUNTS:
+                loans = make_portfolio(loan_count)
+                months = strategy.summarize_plan(loans, extra_cash=EXTRA_CASH)["payoff_month"]
+                full = best_of(lambda: summary_from_rows(strategy, loans))
+                summary = best_of(lambda: strategy.summarize_plan(loans, extra_cash=EXTRA_CASH))
+                print(f"{strategy_class.__name__[:-8]:<11}{engine:<8}{loan_count:>6}{months:>8}"
+                      f"{full * 1000:>14.1f}{summary * 1000:>12.1f}{full / summary:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
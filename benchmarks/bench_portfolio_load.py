@@ -0,0 +1,51 @@
+"""
+Benchmark building and prioritizing the loans table's rows: Loan.from_row objects
+sorted in Python against a columnar Portfolio sorted with an argsort. The SQLite
+fetch both paths start from is timed separately.
+
+Run from the main directory:
+    python -m benchmarks.bench_portfolio_load
+"""
+import os
+import tempfile
+from database.db import Database
+from models.loan import Loan
+from models.portfolio import FIELDS, Portfolio
+from strategies.snowball import SnowballStrategy
+from strategies.avalanche import AvalancheStrategy
+from strategies.custom_strategy import CustomStrategy
+from benchmarks.bench_plan_summary import best_of, make_portfolio
+
+LOAN_COUNT = 50_000
+
+
+def fill_database(db, loan_count):
+    db.init_schema()
+    db.conn.executemany(
+        "INSERT INTO loans (id, name, principal, current_balance, interest_rate, monthly_min_payment, "
+        "extra_payment, first_due_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(loan.id + 1, loan.name, loan.principal, loan.current_balance, loan.interest_rate,
+          loan.monthly_min_payment, loan.extra_payment, "2025-06-01") for loan in make_portfolio(loan_count)])
+    db.conn.commit()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, "loans.db"))
+        db.connect()
+        fill_database(db, LOAN_COUNT)
+        fields = ", ".join(field for field, _, _ in FIELDS)
+        fetch = best_of(lambda: db.fetchall(f"SELECT {fields} FROM loans"))
+        rows = db.fetchall(f"SELECT {fields} FROM loans")
+        print(f"fetch {LOAN_COUNT} rows from SQLite: {fetch * 1000:.1f} ms (shared by both paths)")
+        print(f"{'strategy':<11}{'Loan objects ms':>17}{'Portfolio ms':>14}{'speedup':>9}")
+        for strategy in (SnowballStrategy(), AvalancheStrategy(), CustomStrategy()):
+            objects = best_of(lambda: strategy.prioritize([Loan.from_row(row) for row in rows]))
+            columns = best_of(lambda: strategy.prioritize(Portfolio.from_rows(rows)))
+            print(f"{type(strategy).__name__[:-8]:<11}{objects * 1000:>17.1f}{columns * 1000:>14.1f}"
+                  f"{objects / columns:>8.1f}x")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,35 @@ DB_NAME = "loans.db"
 DB_PATH = BASE_DIR / "database" / DB_NAME
 SCHEMA_PATH = BASE_DIR / "database" / "schema.sql"
 
+# SQLite performance profiles, applied as PRAGMAs by Database.connect in the order listed.
+# cache_size is in pages, or in KiB when negative; mmap_size is in bytes; busy_timeout in ms.
+DB_PROFILES = {
+    # SQLite's own settings: rollback journal, synchronous=FULL, about 2 MB of page cache
+    "default": {},
+    # Single-user installs: WAL lets the GUI read while a write commits, and synchronous=NORMAL
+    # only syncs at checkpoints, which in WAL mode cannot corrupt the file on power loss
+    "desktop": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 64 * 1024 * 1024,
+        "cache_size": -16 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # Batch hosts importing and planning large portfolios: a large cache and memory map keep
+    # the loans table resident, and writers wait longer for each other instead of failing
+    "batch": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 1024 * 1024 * 1024,
+        "cache_size": -256 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+}
+# Profile Database.connect applies unless given another; LOAN_DB_PROFILE overrides it per host
+DB_PROFILE = os.environ.get("LOAN_DB_PROFILE", "desktop")
+
 # GUI settings
 WINDOW_TITLE = "Loan Manager"
 WINDOW_SIZE = "800x600"
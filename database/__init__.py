@@ -1,3 +1,3 @@
-from .db import Database
+from .db import ConnectionPool, Database, PoolStats
 
-__all__ = ["Database"]
\ No newline at end of file
+__all__ = ["ConnectionPool", "Database", "PoolStats"]
\ No newline at end of file
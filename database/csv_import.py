@@ -0,0 +1,199 @@
+import argparse
+import csv
+import sqlite3
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple
+from config import DB_PROFILES
+from .db import Database, DB_PATH
+
+REQUIRED_COLUMNS = ['name', 'principal', 'current_balance', 'interest_rate',
+                    'monthly_min_payment', 'first_due_date']
+
+# Rows validated and inserted per executemany call; a chunk that fails rolls back to its savepoint alone
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 10
+
+INSERT_LOAN = """
+INSERT INTO loans (name, principal, current_balance, interest_rate,
+                 monthly_min_payment, extra_payment, first_due_date,
+                 lender, loan_term_months, notes)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+ImportResult = namedtuple("ImportResult", ["imported", "errors"])
+ImportResult.__doc__ = """
+Outcome of a CSV import: the number of loans inserted and one "Row N: ..." message per rejected row.
+"""
+
+
+@lru_cache(maxsize=4096)
+def _check_date(value: str):
+    # Imports repeat a handful of due dates, so each distinct string is parsed once
+    datetime.strptime(value, '%Y-%m-%d')
+
+
+def validate_rows(rows: Iterable[dict], start: int = 2) -> Tuple[List[tuple], List[int], List[Tuple[int, str]]]:
+    """
+    Validate CSV rows and convert them to INSERT parameters.
+
+    Args:
+        rows (Iterable[dict]): Rows as read by csv.DictReader.
+        start (int): File row number of the first row; row 1 holds the headers.
+
+    Returns:
+        Tuple[List[tuple], List[int], List[Tuple[int, str]]]: Parameters of the valid
+        rows, their row numbers, and (row number, error message) per invalid row.
+    """
+    values, row_nums, errors = [], [], []
+    for row_num, row in enumerate(rows, start=start):
+        try:
+            name = row['name'].strip()
+            if not name:
+                errors.append((row_num, f"Row {row_num}: Loan name is required"))
+                continue
+
+            principal = float(row['principal'])
+            current_balance = float(row['current_balance'])
+            interest_rate = float(row['interest_rate'])
+            monthly_min_payment = float(row['monthly_min_payment'])
+
+            extra_payment = float(row.get('extra_payment', 0) or 0)
+            loan_term_months = int(row['loan_term_months']) if row.get('loan_term_months') and row['loan_term_months'].strip() else None
+            lender = row.get('lender', '').strip() or None
+            notes = row.get('notes', '').strip() or None
+
+            first_due_date = row['first_due_date'].strip()
+            if not first_due_date:
+                errors.append((row_num, f"Row {row_num}: First due date is required"))
+                continue
+            try:
+                _check_date(first_due_date)
+            except ValueError:
+                errors.append((row_num, f"Row {row_num}: Invalid date format. Use YYYY-MM-DD"))
+                continue
+
+            values.append((name, principal, current_balance, interest_rate, monthly_min_payment,
+                           extra_payment, first_due_date, lender, loan_term_months, notes))
+            row_nums.append(row_num)
+        except ValueError as e:
+            errors.append((row_num, f"Row {row_num}: Invalid numeric value - {str(e)}"))
+        except Exception as e:
+            errors.append((row_num, f"Row {row_num}: {str(e)}"))
+    return values, row_nums, errors
+
+
+def _insert_chunk(db: Database, values: List[tuple], row_nums: List[int], errors: List[Tuple[int, str]]) -> int:
+    # One executemany in a nested transaction (a savepoint); if the database rejects
+    # any row, the chunk is undone and inserted row by row so only the offending rows
+    # are reported
+    try:
+        with db.transaction():
+            db.executemany(INSERT_LOAN, values)
+        return len(values)
+    except sqlite3.Error:
+        pass
+    inserted = 0
+    for row_num, params in zip(row_nums, values):
+        try:
+            db.execute(INSERT_LOAN, params)
+            inserted += 1
+        except sqlite3.Error as e:
+            errors.append((row_num, f"Row {row_num}: {str(e)}"))
+    return inserted
+
+
+def import_loan_rows(db: Database, rows: Iterable[dict], chunk_size: int = CHUNK_SIZE) -> ImportResult:
+    """
+    Insert loans from CSV rows in one transaction, a chunk at a time.
+
+    Rows are validated chunk_size at a time and each chunk's valid rows are inserted
+    with a single executemany inside a savepoint, so memory stays bounded and the
+    whole import costs one commit instead of one per row. Invalid rows, and rows the
+    database rejects, are skipped and reported; everything else is committed together.
+
+    Args:
+        db (Database): Connected database.
+        rows (Iterable[dict]): Rows as read by csv.DictReader, starting at file row 2.
+        chunk_size (int): Rows validated and inserted per batch.
+
+    Returns:
+        ImportResult: Number of loans imported and the error message of every skipped row.
+    """
+    rows = iter(rows)
+    imported, errors, row_num = 0, [], 2
+    with db.transaction():
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            values, row_nums, chunk_errors = validate_rows(chunk, start=row_num)
+            if values:
+                imported += _insert_chunk(db, values, row_nums, chunk_errors)
+            # Validation and insert errors of the chunk, in row order
+            errors.extend(message for _, message in sorted(chunk_errors))
+            row_num += len(chunk)
+    return ImportResult(imported, errors)
+
+
+def import_loans_csv(db: Database, file_path: str, chunk_size: int = CHUNK_SIZE) -> ImportResult:
+    """
+    Import loans from a CSV file in the loan_template.csv format.
+
+    Args:
+        db (Database): Connected database.
+        file_path (str): Path of the CSV file.
+        chunk_size (int): Rows validated and inserted per batch.
+
+    Returns:
+        ImportResult: Number of loans imported and the error message of every skipped row.
+
+    Raises:
+        ValueError: If the file lacks any of REQUIRED_COLUMNS.
+    """
+    with open(file_path, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in (reader.fieldnames or [])]
+        if missing_columns:
+            raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+        return import_loan_rows(db, reader, chunk_size)
+
+
+def import_report(result: ImportResult, max_errors: Optional[int] = MAX_REPORTED_ERRORS) -> str:
+    """Summary of an import, listing the first max_errors errors (all of them when None)."""
+    message = f"Successfully imported {result.imported} loans."
+    if result.errors:
+        shown = result.errors if max_errors is None else result.errors[:max_errors]
+        error_message = "\n".join(shown)
+        if len(result.errors) > len(shown):
+            error_message += f"\n... and {len(result.errors) - len(shown)} more errors"
+        message += f"\n\nErrors encountered:\n{error_message}"
+    return message
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Import loans from a CSV file without opening the GUI.")
+    parser.add_argument("csv_file", help="CSV file in the loan_template.csv format")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database file (default: %(default)s)")
+    parser.add_argument("--profile", choices=tuple(DB_PROFILES),
+                        help="database performance profile (default: config.DB_PROFILE)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per batch (default: %(default)s)")
+    parser.add_argument("--all-errors", action="store_true", help="list every rejected row")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db, args.profile)
+    db.connect()
+    try:
+        db.init_schema()
+        result = import_loans_csv(db, args.csv_file, args.chunk_size)
+    except ValueError as e:
+        parser.exit(1, f"CSV Import Error: {e}\n")
+    finally:
+        db.close()
+    print(import_report(result, None if args.all_errors else MAX_REPORTED_ERRORS))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,327 @@
 import sqlite3
 import os
-from typing import List
+import re
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Union
+from config import DB_PROFILE, DB_PROFILES
 from models import Loan
 
 # Define the path to your database file
 DB_PATH = os.path.join(os.path.dirname(__file__), 'loans.db')
 SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'schema.sql')
 
-class Database:
-    def __init__(self, db_path=DB_PATH):
+# Leading verb and target table of a data-modifying statement
+WRITE_PATTERN = re.compile(
+    r"^\s*(INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+(\w+)",
+    re.IGNORECASE)
+
+# PRAGMAs a performance profile may set, with their allowed keyword values (int for numeric ones)
+PROFILE_PRAGMAS = {
+    "journal_mode": ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"),
+    "synchronous": ("OFF", "NORMAL", "FULL", "EXTRA"),
+    "temp_store": ("DEFAULT", "FILE", "MEMORY"),
+    "mmap_size": int,
+    "cache_size": int,
+    "busy_timeout": int,
+}
+
+
+def resolve_profile(profile: Union[str, Dict[str, object], None] = None) -> Dict[str, object]:
+    """
+    PRAGMA settings of a performance profile, checked against PROFILE_PRAGMAS.
+
+    Args:
+        profile (str | dict, optional): Name of a profile in config.DB_PROFILES, or the
+            settings themselves; defaults to config.DB_PROFILE.
+
+    Returns:
+        Dict[str, object]: PRAGMA name to value, in the order they are applied.
+
+    Raises:
+        ValueError: If the profile is unknown or sets a PRAGMA or value that is not allowed.
+    """
+    if profile is None or isinstance(profile, str):
+        name = profile or DB_PROFILE
+        if name not in DB_PROFILES:
+            raise ValueError(f"Unknown database profile '{name}', expected one of {tuple(DB_PROFILES)}")
+        profile = DB_PROFILES[name]
+    pragmas = {}
+    for pragma, value in profile.items():
+        allowed = PROFILE_PRAGMAS.get(pragma)
+        if allowed is None:
+            raise ValueError(f"Unsupported PRAGMA '{pragma}' in database profile, expected one of {tuple(PROFILE_PRAGMAS)}")
+        if allowed is int:
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f"PRAGMA {pragma} takes an integer, got {value!r}")
+        elif str(value).upper() not in allowed:
+            raise ValueError(f"PRAGMA {pragma} must be one of {allowed}, got {value!r}")
+        else:
+            value = str(value).upper()
+        pragmas[pragma] = value
+    return pragmas
+
+
+PoolStats = namedtuple("PoolStats", ["requests", "opened", "closed", "open"])
+PoolStats.__doc__ = """
+Connection pool counters: connections handed out, opened and closed so far, and open now.
+requests - opened is the number of times an open connection was reused.
+"""
+
+
+class _Slot:
+    # A thread's connection and how often the thread asked for it
+    __slots__ = ("conn", "thread", "requests", "closed")
+
+    def __init__(self, conn: sqlite3.Connection, thread: threading.Thread):
+        self.conn = conn
+        self.thread = thread
+        self.requests = 0
+        self.closed = False
+
+
+class ConnectionPool:
+    """
+    Thread-local SQLite connections to one database, opened on first use and reused.
+
+    sqlite3 connections must not be used by two threads at once, so each thread gets
+    its own, configured with the pool's performance profile, and keeps it for every
+    later request until it calls release() or the pool is closed. Under a WAL profile
+    the GUI thread and background workers then read concurrently, each on a warm
+    connection. Connections of threads that have exited are closed the next time a
+    connection is opened, so short-lived workers do not leak them.
+
+    Every thread connecting to ":memory:" gets a separate, empty database.
+    """
+
+    def __init__(self, db_path=DB_PATH, profile: Union[str, Dict[str, object], None] = None):
+        """
+        Args:
+            db_path (str): SQLite database file, or ":memory:".
+            profile (str | dict, optional): Performance profile applied to every connection; a
+                name in config.DB_PROFILES or PRAGMA settings. Defaults to config.DB_PROFILE.
+        """
         self.db_path = db_path
-        self.conn = None
+        self.pragmas = resolve_profile(profile)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._slots: Dict[threading.Thread, _Slot] = {}
+        self._opened = 0
+        self._closed = 0
+        self._closed_requests = 0
+
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on its first request."""
+        slot = getattr(self._local, "slot", None)
+        if slot is None or slot.closed:
+            slot = self._open()
+        slot.requests += 1
+        return slot.conn
+
+    def has_connection(self) -> bool:
+        """Whether the calling thread has an open connection."""
+        slot = getattr(self._local, "slot", None)
+        return slot is not None and not slot.closed
+
+    def _open(self) -> _Slot:
+        # Connections may be closed by another thread (close_all, pruning), never used by one
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            conn.row_factory = sqlite3.Row  # Enable name-based access to columns
+            for pragma, value in self.pragmas.items():
+                # Values were checked by resolve_profile; PRAGMAs cannot take bound parameters
+                conn.execute(f"PRAGMA {pragma} = {value}")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        slot = _Slot(conn, threading.current_thread())
+        with self._lock:
+            for thread in [thread for thread in self._slots if not thread.is_alive()]:
+                self._close_slot(self._slots.pop(thread))
+            self._slots[slot.thread] = slot
+            self._opened += 1
+        self._local.slot = slot
+        return slot
+
+    def _close_slot(self, slot: _Slot):
+        # Called with the lock held
+        slot.conn.close()
+        slot.closed = True
+        self._closed += 1
+        self._closed_requests += slot.requests
+
+    def release(self):
+        """Close the calling thread's connection; its next request opens a new one."""
+        slot = getattr(self._local, "slot", None)
+        self._local.slot = None
+        if slot is None:
+            return
+        with self._lock:
+            if self._slots.get(slot.thread) is slot:
+                del self._slots[slot.thread]
+                self._close_slot(slot)
+
+    def close_all(self):
+        """Close every thread's connection. Call once no other thread is using the pool."""
+        with self._lock:
+            slots, self._slots = list(self._slots.values()), {}
+            for slot in slots:
+                self._close_slot(slot)
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            requests = self._closed_requests + sum(slot.requests for slot in self._slots.values())
+            return PoolStats(requests, self._opened, self._closed, len(self._slots))
+
+
+class Database:
+    def __init__(self, db_path=DB_PATH, profile: Union[str, Dict[str, object], None] = None,
+                 pool: Optional[ConnectionPool] = None):
+        """
+        Args:
+            db_path (str): SQLite database file, or ":memory:".
+            profile (str | dict, optional): Performance profile applied on connect; a name in
+                config.DB_PROFILES or PRAGMA settings. Defaults to config.DB_PROFILE.
+            pool (ConnectionPool, optional): Pool to take connections from, shared with other
+                Database objects; its path and profile override db_path and profile.
+        """
+        self.pool = pool or ConnectionPool(db_path, profile)
+        self.db_path = self.pool.db_path
+        self.pragmas = self.pool.pragmas
+        self._write_listeners = []
+        # Transaction depth and held-back writes belong to the thread's connection
+        self._local = threading.local()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use and reused afterwards."""
+        return self.pool.connection()
+
+    @property
+    def _transaction_depth(self) -> int:
+        return getattr(self._local, "depth", 0)
+
+    @_transaction_depth.setter
+    def _transaction_depth(self, depth: int):
+        self._local.depth = depth
+
+    @property
+    def _pending_writes(self) -> list:
+        return self._local.__dict__.setdefault("pending", [])
+
+    @_pending_writes.setter
+    def _pending_writes(self, writes: list):
+        self._local.pending = writes
+
+    def add_write_listener(self, listener: Callable[[str, Optional[int]], None]):
+        """
+        Register a callback run after every committed write.
+
+        The listener receives the table name and the id of the affected row when it is
+        known (inserts and delete_loan), or None when the write may touch any row.
+        """
+        self._write_listeners.append(listener)
+
+    def _notify_write(self, table: str, row_id: Optional[int] = None):
+        if self._transaction_depth:
+            # Held back until the outermost transaction commits
+            self._pending_writes.append((table, row_id))
+            return
+        for listener in self._write_listeners:
+            listener(table, row_id)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group the writes made inside the block into one commit.
+
+        Statements run through execute, executemany and the helper methods are not
+        committed one by one inside the block; the block commits them together when it
+        exits and rolls them all back if it raises. Blocks nest: an inner block is a
+        savepoint, so an exception caught outside it undoes only the inner writes.
+        Write listeners run once the outermost block commits, and not at all for
+        writes that were rolled back.
+
+        Example:
+            with db.transaction():
+                for priority, loan_id in enumerate(order, start=1):
+                    db.add_loan_priority(strategy_id, loan_id, priority)
+        """
+        conn = self.conn
+        depth = self._transaction_depth
+        pending = len(self._pending_writes)
+        conn.execute("BEGIN" if depth == 0 else f"SAVEPOINT tx_{depth}")
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth = depth
+            del self._pending_writes[pending:]
+            if depth == 0:
+                conn.rollback()
+            else:
+                conn.execute(f"ROLLBACK TO SAVEPOINT tx_{depth}")
+                conn.execute(f"RELEASE SAVEPOINT tx_{depth}")
+            raise
+        self._transaction_depth = depth
+        if depth:
+            conn.execute(f"RELEASE SAVEPOINT tx_{depth}")
+            return
+        conn.commit()
+        writes, self._pending_writes = self._pending_writes, []
+        # One notification per distinct write, in the order they happened
+        for table, row_id in dict.fromkeys(writes):
+            self._notify_write(table, row_id)
+
+    def _commit_outside_transaction(self, conn: sqlite3.Connection):
+        # sqlite3 opens a transaction implicitly only for data-modifying statements,
+        # so reads never leave one open and never commit
+        if conn.in_transaction and not self._transaction_depth:
+            conn.commit()
+
+    def _rollback_outside_transaction(self, conn: sqlite3.Connection):
+        # A failed write leaves sqlite3's implicit transaction open; outside a transaction()
+        # block nothing else would end it, and the next block could not BEGIN
+        if conn.in_transaction and not self._transaction_depth:
+            conn.rollback()
 
     def connect(self):
-        """Establish a connection to the SQLite database."""
+        """
+        Open the calling thread's connection to the SQLite database.
+
+        Connecting again from the same thread reuses the open connection. Other threads
+        do not need to connect: their first query opens their own connection.
+        """
+        if self.pool.has_connection():
+            return
         try:
             print(f"Attempting to connect to database at {self.db_path}")  # Add this line
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row  # Enable name-based access to columns
+            self.pool.connection()
             print(f"Connected to database at {self.db_path}")
         except sqlite3.Error as e:
             print(f"Connection failed: {e}")
             raise
 
+    def pragma_settings(self) -> Dict[str, object]:
+        """
+        Current value of every PRAGMA a profile may set, as SQLite reports it (None where
+        the database does not support it, such as mmap_size in memory).
+        """
+        settings = {}
+        for pragma in PROFILE_PRAGMAS:
+            row = self.conn.execute(f"PRAGMA {pragma}").fetchone()
+            settings[pragma] = row[0] if row else None
+        return settings
+
+    def release(self):
+        """Close the calling thread's connection, such as at the end of a worker thread."""
+        self.pool.release()
+
     def close(self):
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close()
+        """Close the connection of every thread."""
+        if self.pool.stats().open:
+            self.pool.close_all()
             print("Database connection closed.")
 
     def init_schema(self, schema_path=SCHEMA_PATH):
@@ -44,18 +339,45 @@ class Database:
             raise
 
     def execute(self, query, params=None):
-        """Execute a single query with optional parameters."""
+        """
+        Execute a single query with optional parameters.
+
+        Writes are committed straight away unless they run inside a transaction() block.
+        """
+        conn = self.conn
         try:
-            cursor = self.conn.cursor()
+            cursor = conn.cursor()
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            self.conn.commit()
-            return cursor
+            self._commit_outside_transaction(conn)
         except sqlite3.Error as e:
             print(f"Query execution failed: {e}")
+            self._rollback_outside_transaction(conn)
             raise
+        write = WRITE_PATTERN.match(query)
+        if write:
+            verb, table = write.groups()
+            self._notify_write(table.lower(), cursor.lastrowid if verb.upper().startswith("INSERT") else None)
+        return cursor
+
+    def executemany(self, query, seq_of_params: Iterable):
+        """
+        Execute a data-modifying query once per parameter tuple, committed like execute.
+        """
+        conn = self.conn
+        try:
+            cursor = conn.executemany(query, seq_of_params)
+            self._commit_outside_transaction(conn)
+        except sqlite3.Error as e:
+            print(f"Query execution failed: {e}")
+            self._rollback_outside_transaction(conn)
+            raise
+        write = WRITE_PATTERN.match(query)
+        if write:
+            self._notify_write(write.group(2).lower())
+        return cursor
 
     def fetchall(self, query, params=None):
         """Fetch all rows from a query."""
@@ -78,6 +400,16 @@ class Database:
         """
         self.execute(query, (strategy_id, loan_id, priority))
 
+    def get_or_create_strategy(self, strategy_name: str) -> int:
+        """
+        Return the id of the payoff strategy with this name, creating it if needed.
+        """
+        row = self.fetchone("SELECT id FROM payoff_strategies WHERE strategy_name = ? ORDER BY id LIMIT 1",
+                            (strategy_name,))
+        if row:
+            return row["id"]
+        return self.execute("INSERT INTO payoff_strategies (strategy_name) VALUES (?)", (strategy_name,)).lastrowid
+
     def get_loans_by_strategy(self, strategy_id: int) -> List[Loan]:
         """
         Retrieve loans associated with a specific strategy, ordered by priority.
@@ -94,8 +426,9 @@ class Database:
 
     def delete_loan(self, loan_id):
         """Delete a loan by its ID."""
-        with self.conn:
+        with self.transaction():
             self.conn.execute("DELETE FROM loans WHERE id = ?", (loan_id,))
+            self._notify_write("loans", loan_id)
     
 if __name__ == "__main__":
     db = Database()
@@ -116,6 +449,6 @@ if __name__ == "__main__":
     # Example: Retrieve loans by strategy
     loans = db.get_loans_by_strategy(strategy_id=1)
     for loan in loans:
-        print(vars(loan))
+        print(loan.to_dict())
 
     db.close()
\ No newline at end of file
@@ -1,15 +1,27 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import csv
 import os
+import threading
 from database.db import Database
+from database.csv_import import import_loans_csv, import_report
 from gui.loan_entry import LoanEntryForm
 from gui.salary_calculator import SalaryCalculatorPopup
-from models.loan import Loan
+from models.portfolio import Portfolio
 from strategies.snowball import SnowballStrategy
 from strategies.avalanche import AvalancheStrategy
 from strategies.custom_strategy import CustomStrategy
 from gui.payoff_plan import PayoffPlanPopup
+from utils.plan_cache import PlanCache
+from utils.strategy_comparison import compare_strategies, default_strategies
+from utils.order_optimizer import optimize_custom_order, save_custom_order
+from utils.analytics import loan_analytics
+
+# How often the Tk thread checks on background work, in milliseconds
+BACKGROUND_POLL_MS = 100
+# Below these portfolio sizes the work takes less than starting worker processes, so it runs in one
+OPTIMIZER_POOL_MIN_LOANS = 12
+COMPARISON_POOL_MIN_LOANS = 2000
+
 
 class LoanManagerApp(tk.Tk):
     def __init__(self, db=None):
@@ -20,6 +32,10 @@ class LoanManagerApp(tk.Tk):
         self.db = db if db else Database()
         self.db.connect()
 
+        # Plans are reused across exports until a loan changes in the database
+        self.plan_cache = PlanCache()
+        self.plan_cache.watch(self.db)
+
         # Strategy selection
         self.strategy_var = tk.StringVar(value="Snowball")
         strategy_options = ["Snowball", "Avalanche", "Custom"]
@@ -35,8 +51,16 @@ class LoanManagerApp(tk.Tk):
         salary_calc_button = tk.Button(self, text="Salary Calculator", command=self.open_salary_calculator)
         salary_calc_button.grid(row=0, column=2, padx=10, pady=5, sticky="w")
 
+        # Compare Strategies button
+        self.compare_button = tk.Button(self, text="Compare Strategies", command=self.open_strategy_comparison)
+        self.compare_button.grid(row=0, column=3, padx=10, pady=5, sticky="w")
+
+        # Optimize Custom Order button
+        self.optimize_button = tk.Button(self, text="Optimize Custom Order", command=self.optimize_custom_order)
+        self.optimize_button.grid(row=0, column=4, padx=10, pady=5, sticky="w")
+
         # Treeview for loans
-        self.tree = ttk.Treeview(self, columns=("ID", "Name", "Principal", "Balance", "Interest Rate", "Min Payment", "Extra Payment", "First Due Date"), show='headings')
+        self.tree = ttk.Treeview(self, columns=("ID", "Name", "Principal", "Balance", "Interest Rate", "Min Payment", "Extra Payment", "First Due Date", "Payoff Months", "Total Interest", "WAL (Months)"), show='headings')
         self.tree.column("ID", width=0, stretch=False)  # Hide the ID column
         for col in self.tree["columns"]:
             self.tree.heading(col, text=col)
@@ -65,18 +89,80 @@ class LoanManagerApp(tk.Tk):
     def get_strategy(self):
         strategy = self.strategy_var.get()
         if strategy == "Snowball":
-            return SnowballStrategy()
+            return SnowballStrategy(engine="numpy", plan_cache=self.plan_cache)
         elif strategy == "Avalanche":
-            return AvalancheStrategy()
+            return AvalancheStrategy(engine="numpy", plan_cache=self.plan_cache)
         elif strategy == "Custom":
-            # For demo, sort by name
-            return CustomStrategy(loan_priority=[loan.id for loan in sorted(self.get_loans(), key=lambda l: l.name)])
+            return CustomStrategy(loan_priority=self.get_custom_order(), engine="numpy", plan_cache=self.plan_cache)
         else:
-            return SnowballStrategy()
+            return SnowballStrategy(engine="numpy", plan_cache=self.plan_cache)
+
+    def get_custom_order(self):
+        """Saved custom ordering, followed by any loans it does not cover sorted by name"""
+        saved = [loan.id for loan in self.db.get_loans_by_strategy(self.db.get_or_create_strategy("custom"))]
+        unsaved = sorted((loan for loan in self.get_loans() if loan.id not in saved), key=lambda l: l.name)
+        return saved + [loan.id for loan in unsaved]
+
+    def run_in_background(self, work, on_done, title, button=None):
+        """
+        Run work() on a worker thread, then on_done(result) back on the Tk thread.
+
+        The window keeps responding meanwhile: it shows a busy cursor and disables button
+        until the work finishes, polling every BACKGROUND_POLL_MS. An exception raised by
+        work is shown in an error box titled title instead.
+        """
+        outcome = {}
+
+        def target():
+            try:
+                outcome["result"] = work()
+            except Exception as e:
+                outcome["error"] = e
+
+        worker = threading.Thread(target=target, daemon=True)
+        self.config(cursor="watch")
+        if button is not None:
+            button.config(state="disabled")
+        worker.start()
+
+        def poll():
+            if worker.is_alive():
+                self.after(BACKGROUND_POLL_MS, poll)
+                return
+            self.config(cursor="")
+            if button is not None:
+                button.config(state="normal")
+            if "error" in outcome:
+                messagebox.showerror(title, str(outcome["error"]))
+            else:
+                on_done(outcome["result"])
+
+        self.after(BACKGROUND_POLL_MS, poll)
+
+    def optimize_custom_order(self):
+        """Search for the custom ordering with the least total interest and save it"""
+        loans = self.get_loans()
+        if len(loans) < 2:
+            messagebox.showinfo("Optimize Custom Order", "Add at least two loans to optimize their order.")
+            return
+        processes = None if len(loans) >= OPTIMIZER_POOL_MIN_LOANS else 1
+
+        def on_done(result):
+            save_custom_order(self.db, self.db.get_or_create_strategy("custom"), result["order"])
+            self.strategy_var.set("Custom")
+            self.load_loans()
+            summary = result["summary"]
+            messagebox.showinfo("Optimize Custom Order",
+                                f"Saved the ordering with the least total interest "
+                                f"(${summary['total_interest']:,.2f} over {summary['payoff_month']} months).")
+
+        # The search only reads the loans loaded here; saving happens back on the Tk thread
+        self.run_in_background(lambda: optimize_custom_order(loans, processes=processes), on_done,
+                               "Optimize Custom Order", self.optimize_button)
 
     def get_loans(self):
-        loans = self.db.fetchall("SELECT * FROM loans")
-        return [Loan.from_row(row) for row in loans]
+        # Columnar; strategies sort it with an argsort and it yields Loan objects when iterated
+        return Portfolio.from_database(self.db)
 
     def load_loans(self):
         for item in self.tree.get_children():
@@ -85,7 +171,10 @@ class LoanManagerApp(tk.Tk):
         strategy = self.get_strategy()
         if hasattr(strategy, "prioritize"):
             loans = strategy.prioritize(loans)
-        for loan in loans:
+        # Closed-form figures for each loan on its own payments, cheap enough to refresh on every reload
+        analytics = loan_analytics(loans)
+        for index, loan in enumerate(loans):
+            paid_off = analytics["paid_off"][index]
             self.tree.insert('', 'end', values=(
                 loan.id,  # Add ID as first value
                 loan.name,
@@ -94,7 +183,10 @@ class LoanManagerApp(tk.Tk):
                 f"{loan.interest_rate:.2f}",
                 f"${loan.monthly_min_payment:,.2f}",
                 f"${loan.extra_payment:,.2f}",
-                loan.first_due_date.strftime("%Y-%m-%d")
+                loan.first_due_date.strftime("%Y-%m-%d"),
+                analytics["payoff_month"][index] if paid_off else "Never",
+                f"${analytics['total_interest'][index]:,.2f}" if paid_off else "-",
+                f"{analytics['wal'][index]:.1f}" if paid_off else "-"
             ))
 
     def open_add_loan_form(self):
@@ -124,90 +216,18 @@ class LoanManagerApp(tk.Tk):
             return
         
         try:
-            imported_count = 0
-            errors = []
-            
-            with open(file_path, 'r', newline='', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                
-                # Validate required columns
-                required_columns = ['name', 'principal', 'current_balance', 'interest_rate', 
-                                  'monthly_min_payment', 'first_due_date']
-                missing_columns = [col for col in required_columns if col not in reader.fieldnames]
-                
-                if missing_columns:
-                    messagebox.showerror("CSV Import Error", 
-                                       f"Missing required columns: {', '.join(missing_columns)}")
-                    return
-                
-                for row_num, row in enumerate(reader, start=2):  # Start at 2 because row 1 is headers
-                    try:
-                        # Validate and convert data
-                        name = row['name'].strip()
-                        if not name:
-                            errors.append(f"Row {row_num}: Loan name is required")
-                            continue
-                        
-                        # Required numeric fields
-                        principal = float(row['principal'])
-                        current_balance = float(row['current_balance'])
-                        interest_rate = float(row['interest_rate'])
-                        monthly_min_payment = float(row['monthly_min_payment'])
-                        
-                        # Optional fields with defaults
-                        extra_payment = float(row.get('extra_payment', 0) or 0)
-                        loan_term_months = int(row['loan_term_months']) if row.get('loan_term_months') and row['loan_term_months'].strip() else None
-                        lender = row.get('lender', '').strip() or None
-                        notes = row.get('notes', '').strip() or None
-                        
-                        # Date field
-                        first_due_date = row['first_due_date'].strip()
-                        if not first_due_date:
-                            errors.append(f"Row {row_num}: First due date is required")
-                            continue
-                        
-                        # Validate date format (basic check)
-                        try:
-                            from datetime import datetime
-                            datetime.strptime(first_due_date, '%Y-%m-%d')
-                        except ValueError:
-                            errors.append(f"Row {row_num}: Invalid date format. Use YYYY-MM-DD")
-                            continue
-                        
-                        # Insert into database
-                        insert_query = """
-                        INSERT INTO loans (name, principal, current_balance, interest_rate, 
-                                         monthly_min_payment, extra_payment, first_due_date, 
-                                         lender, loan_term_months, notes)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """
-                        self.db.execute(insert_query, (
-                            name, principal, current_balance, interest_rate,
-                            monthly_min_payment, extra_payment, first_due_date,
-                            lender, loan_term_months, notes
-                        ))
-                        imported_count += 1
-                        
-                    except ValueError as e:
-                        errors.append(f"Row {row_num}: Invalid numeric value - {str(e)}")
-                    except Exception as e:
-                        errors.append(f"Row {row_num}: {str(e)}")
-            
-            # Show results
-            message = f"Successfully imported {imported_count} loans."
-            if errors:
-                error_message = "\n".join(errors[:10])  # Show first 10 errors
-                if len(errors) > 10:
-                    error_message += f"\n... and {len(errors) - 10} more errors"
-                message += f"\n\nErrors encountered:\n{error_message}"
-            
-            messagebox.showinfo("CSV Import Results", message)
-            
-            if imported_count > 0:
-                self.load_loans()
-                
+            result = import_loans_csv(self.db, file_path)
+        except ValueError as e:
+            messagebox.showerror("CSV Import Error", str(e))
+            return
         except Exception as e:
             messagebox.showerror("CSV Import Error", f"Failed to read CSV file: {str(e)}")
+            return
+
+        messagebox.showinfo("CSV Import Results", import_report(result))
+
+        if result.imported > 0:
+            self.load_loans()
 
     def show_csv_format_help(self):
         """Show information about the required CSV format."""
@@ -239,12 +259,35 @@ A template file 'loan_template.csv' has been created in your project directory."
     def export_payoff_plan(self):
         loans = self.get_loans()
         strategy = self.get_strategy()
-        if hasattr(strategy, "generate_payment_plan"):
-            plan = strategy.generate_payment_plan(loans, extra_cash=0.0)
+        if hasattr(strategy, "iter_payment_plan"):
+            # Streamed so the first rows show before the whole plan is simulated
+            plan = strategy.iter_payment_plan(loans, extra_cash=0.0)
             PayoffPlanPopup(self, plan, loans, strategy=strategy)
         else:
             tk.messagebox.showerror("Error", "Selected strategy does not support payoff plan export.")
 
+    def open_strategy_comparison(self):
+        """Show Snowball, Avalanche and the Custom ordering side by side"""
+        loans = self.get_loans()
+        strategies = default_strategies([self.get_custom_order()])
+        strategies["Custom"] = strategies.pop("Custom 1")
+        processes = None if len(loans) >= COMPARISON_POOL_MIN_LOANS else 1
+        self.run_in_background(lambda: compare_strategies(loans, strategies, processes=processes),
+                               self.show_strategy_comparison, "Strategy Comparison", self.compare_button)
+
+    def show_strategy_comparison(self, rows):
+        """Show compare_strategies rows in a popup table"""
+        popup = tk.Toplevel(self)
+        popup.title("Strategy Comparison")
+        columns = ("Strategy", "Payoff Date", "Months", "Total Interest", "Months Saved")
+        tree = ttk.Treeview(popup, columns=columns, show="headings", height=len(rows))
+        for col in columns:
+            tree.heading(col, text=col)
+        for row in rows:
+            tree.insert("", "end", values=(row["strategy"], row["payoff_date"] or "Not paid off", row["payoff_month"],
+                                           f"${row['total_interest']:,.2f}", row["months_saved"]))
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
     def open_salary_calculator(self):
         """Open the salary calculator popup"""
         loans = self.get_loans()
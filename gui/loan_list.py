@@ -4,10 +4,12 @@ from database.db import Database
 from gui.loan_entry import LoanEntryForm  # Assuming this is your loan entry form
 
 class LoanListView(tk.Toplevel):
-    def __init__(self, master=None):
+    def __init__(self, master=None, db=None):
         super().__init__(master)
         self.title("Loan List")
         self.geometry("800x400")
+        # Share the application's database so refreshes reuse its connection
+        self.db = db or getattr(master, "db", None) or Database()
 
         # Create Treeview
         columns = ("id", "name", "principal", "current_balance", "interest_rate", "monthly_min_payment", "extra_payment", "first_due_date")
@@ -36,10 +38,7 @@ class LoanListView(tk.Toplevel):
             self.tree.delete(row)
 
         # Fetch data from database
-        db = Database()
-        db.connect()
-        loans = db.fetchall("SELECT * FROM loans")
-        db.close()
+        loans = self.db.fetchall("SELECT * FROM loans")
 
         # Insert data into Treeview
         for loan in loans:
@@ -57,4 +56,4 @@ class LoanListView(tk.Toplevel):
     def open_add_loan(self):
         def on_submit():
             self.load_loans()
-        LoanEntryForm(master=self, on_submit=on_submit)
\ No newline at end of file
+        LoanEntryForm(master=self, db=self.db, on_submit=on_submit)
\ No newline at end of file
@@ -2,10 +2,15 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter.simpledialog import askfloat  # Import askfloat from tkinter.simpledialog
 from utils.generate_payment_plan import generate_payment_plan
+from utils.checkpointed_plan import CheckpointedPlan
+from utils.plan_frame import PlanFrame
 from models.loan import Loan
 
 
 class PayoffPlanPopup(tk.Toplevel):
+    # Rows inserted per event-loop turn when a plan is streamed in from iter_payment_plan
+    STREAM_BATCH = 60
+
     def __init__(self, master, plan, loans, strategy=None, recalc_callback=None):
         super().__init__(master)
         self.title("Payoff Plan")
@@ -15,6 +20,12 @@ class PayoffPlanPopup(tk.Toplevel):
         self.plan = plan
         self.strategy = strategy
         self.recalc_callback = recalc_callback
+        self._stream = None
+        self._stream_job = None
+        # Extra payments typed into individual rows, keyed by row index
+        self.row_extras = {}
+        # Engine state per period, built on the first row edit
+        self._checkpoints = None
 
         # --- Top area for summary and controls ---
         top_frame = tk.Frame(self)
@@ -89,7 +100,7 @@ class PayoffPlanPopup(tk.Toplevel):
         self.display_plan(plan)
 
         # Save button
-        save_btn = tk.Button(self, text="Save to File", command=lambda: self.save_plan(self.plan, self.loan_names))
+        save_btn = tk.Button(self, text="Save to File", command=lambda: self.save_plan(self.finish_stream(), self.loan_names))
         save_btn.pack(pady=5)
 
         # Bind treeview for extra cash editing
@@ -100,46 +111,84 @@ class PayoffPlanPopup(tk.Toplevel):
         self.min_label.config(text=f"Total Minimum Monthly Payment: ${min_payment:,.2f}")
 
     def display_plan(self, plan):
-        # Clear existing rows
+        # Clear existing rows, dropping any plan still streaming in
+        self.cancel_stream()
         for row in self.tree.get_children():
             self.tree.delete(row)
 
+        if not isinstance(plan, (list, PlanFrame)):
+            # Streamed plan: show the first screen now and fill in the rest from the event loop
+            self.plan = []
+            self._stream = iter(plan)
+            self._stream_rows()
+            return
+
         # Display each period in the plan
         for idx, period in enumerate(plan):
-            row = [period["date"]]
-            balances = period.get("balances", {})
-            for name in self.loan_names:
-                payment = period["payments"].get(name, 0)
-                new_bal = balances.get(name, 0)
-                prev_bal = new_bal + payment
-                if payment > 0 or new_bal > 0:
-                    cell_text = f"{prev_bal:,.2f} - {payment:,.2f} = {new_bal:,.2f}"
-                else:
-                    cell_text = ""
-                row.append(cell_text)
-            
-            # Extra Payment - either stored row-specific value or calculated difference
-            if "row_extra_payment" in period:
-                extra_payment = period["row_extra_payment"]
+            self.tree.insert("", "end", values=self.format_row(period, self.row_extras.get(idx)))
+
+    def _stream_rows(self):
+        self._stream_job = None
+        for count, period in enumerate(self._stream, start=1):
+            self.plan.append(period)
+            self.tree.insert("", "end", values=self.format_row(period))
+            if count == self.STREAM_BATCH:
+                self._stream_job = self.after(1, self._stream_rows)
+                return
+        self._stream = None
+
+    def cancel_stream(self):
+        """Stop inserting rows from a streamed plan."""
+        if self._stream_job is not None:
+            self.after_cancel(self._stream_job)
+        self._stream = self._stream_job = None
+
+    def finish_stream(self):
+        """Insert the rest of a streamed plan right away and return the complete plan."""
+        stream = self._stream
+        self.cancel_stream()
+        if stream is not None:
+            for period in stream:
+                self.plan.append(period)
+                self.tree.insert("", "end", values=self.format_row(period))
+        return self.plan
+
+    def format_row(self, period, row_extra=None):
+        """Build the table cells for one period, showing row_extra as its extra payment if set."""
+        row = [period["date"]]
+        balances = period.get("balances", {})
+        for name in self.loan_names:
+            payment = period["payments"].get(name, 0)
+            new_bal = balances.get(name, 0)
+            prev_bal = new_bal + payment
+            if payment > 0 or new_bal > 0:
+                cell_text = f"{prev_bal:,.2f} - {payment:,.2f} = {new_bal:,.2f}"
             else:
-                minimum_total_payment = period.get("minimum_total_payment", 0)
-                total_payment = sum(period["payments"].values())
-                extra_payment = total_payment - minimum_total_payment
-            row.append(f"${extra_payment:,.2f}")  # Display Extra Payment
-
-            # Total Minimum Payment
+                cell_text = ""
+            row.append(cell_text)
+        
+        # Extra Payment - either stored row-specific value or calculated difference
+        if row_extra is not None:
+            extra_payment = row_extra
+        else:
             minimum_total_payment = period.get("minimum_total_payment", 0)
-            row.append(f"${minimum_total_payment:,.2f}")  # Display Total Minimum Payment
+            total_payment = sum(period["payments"].values())
+            extra_payment = total_payment - minimum_total_payment
+        row.append(f"${extra_payment:,.2f}")  # Display Extra Payment
+
+        # Total Minimum Payment
+        minimum_total_payment = period.get("minimum_total_payment", 0)
+        row.append(f"${minimum_total_payment:,.2f}")  # Display Total Minimum Payment
 
-            # Total Payment (sum of all loan payments)
-            total_payment = sum(period["payments"].values())  # Corrected calculation
-            row.append(f"${total_payment:,.2f}")  # Display Total Payment
+        # Total Payment (sum of all loan payments)
+        total_payment = sum(period["payments"].values())  # Corrected calculation
+        row.append(f"${total_payment:,.2f}")  # Display Total Payment
 
-            # Total Balance
-            total_balance = period.get("total_balance", 0)
-            row.append(f"${total_balance:,.2f}")  # Display Total Balance
+        # Total Balance
+        total_balance = period.get("total_balance", 0)
+        row.append(f"${total_balance:,.2f}")  # Display Total Balance
 
-            self.tree.insert("", "end", values=row)
+        return row
 
     def recalculate_plan(self):
         try:
@@ -154,13 +203,15 @@ class PayoffPlanPopup(tk.Toplevel):
         elif self.strategy:
             # Generate a completely fresh payment plan from scratch using the strategy
             # This will start with the original loan balances and create a new plan
-            new_plan = self.strategy.generate_payment_plan(self.loans, extra_cash=extra_cash)
+            new_plan = self.strategy.iter_payment_plan(self.loans, extra_cash=extra_cash)
         else:
             # Fallback if no strategy is available
             messagebox.showinfo("Recalculate", f"Would recalculate with extra cash: ${extra_cash:,.2f}")
             return
 
         # Replace the entire plan with the new one (complete recalculation from scratch)
+        self.row_extras = {}
+        self._checkpoints = None
         self.plan = new_plan
         self.display_plan(new_plan)
         self.update_min_payment_label()
@@ -185,6 +236,9 @@ class PayoffPlanPopup(tk.Toplevel):
             messagebox.showerror("Error", f"Could not save file: {e}")
 
     def on_extra_cash_edit(self, event):
+        # Row edits recalculate the rest of the plan, so it has to be complete
+        self.finish_stream()
+
         # Get the selected row and column
         selected_item = self.tree.focus()
         if not selected_item:
@@ -201,8 +255,8 @@ class PayoffPlanPopup(tk.Toplevel):
         period = self.plan[row_index]
         
         # Check if this row has a stored individual extra payment, otherwise calculate from current state
-        if "row_extra_payment" in period:
-            current_value = period["row_extra_payment"]
+        if row_index in self.row_extras:
+            current_value = self.row_extras[row_index]
         else:
             # Calculate current extra payment (total - minimum for this row)
             minimum_total_payment = period.get("minimum_total_payment", 0)
@@ -229,7 +283,7 @@ class PayoffPlanPopup(tk.Toplevel):
                 return
 
             # Store the extra payment for this specific row
-            self.plan[row_index]["row_extra_payment"] = extra_payment
+            self.row_extras[row_index] = extra_payment
             
             # Recalculate from this row forward with individual extra payments
             self.recalculate_from_row_with_individual_extras(row_index)
@@ -243,131 +297,37 @@ class PayoffPlanPopup(tk.Toplevel):
 
     def recalculate_from_row_with_individual_extras(self, start_row):
         """Recalculate payment plan from a specific row forward, preserving individual extra payments"""
-        # Get starting loan states from the previous row (or original if start_row is 0)
-        if start_row == 0:
-            # Start with original loan states
-            working_loans = [Loan(**loan.__dict__) for loan in self.loans]
-            for loan in working_loans:
-                loan.adjusted_min_payment = loan.monthly_min_payment
-                loan.total_paid = 0.0
-        else:
-            # Reconstruct loan states from previous period
-            prev_period = self.plan[start_row - 1]
-            working_loans = []
-            for loan in self.loans:
-                loan_copy = Loan(**loan.__dict__)
-                loan_copy.current_balance = prev_period["balances"].get(loan.name, 0)
-                # Keep adjusted_min_payment as original monthly payment if balance > 0, otherwise 0
-                loan_copy.adjusted_min_payment = loan.monthly_min_payment if loan_copy.current_balance > 0 else 0
-                loan_copy.total_paid = 0.0  # We don't track this in period recalc
-                working_loans.append(loan_copy)
-        
         # Get the global extra cash amount
         try:
             global_extra_cash = float(self.extra_var.get())
         except (ValueError, AttributeError):
             global_extra_cash = 0.0
-        
-        # Compute fixed budgets (this should remain constant)
-        minimum_total_payment = sum(loan.monthly_min_payment for loan in self.loans)
-        
-        # Recalculate each period from start_row forward
-        from datetime import datetime, timedelta
-        base_date = datetime.today().date()
-        
-        for row_idx in range(start_row, len(self.plan)):
-            period = self.plan[row_idx]
-            
-            # For periods after start_row, update working_loans with balances from previous period
-            if row_idx > start_row:
-                prev_period = self.plan[row_idx - 1]
-                for loan in working_loans:
-                    loan.current_balance = prev_period["balances"].get(loan.name, 0)
-                    # Update adjusted_min_payment based on current balance
-                    loan.adjusted_min_payment = loan.monthly_min_payment if loan.current_balance > 0 else 0
-            
-            # Get the extra payment for this specific period
-            # Use stored row-specific value if it exists, otherwise use global
-            if "row_extra_payment" in period:
-                requested_extra_cash = period["row_extra_payment"]
+
+        checkpoints = self._checkpoints
+        if checkpoints is None or checkpoints.user_extra_cash != global_extra_cash:
+            # First edit of this plan, or the global extra cash changed: simulate once with every row override
+            if self.strategy:
+                prioritized_loans, rank_by = self.strategy.prioritize(self.loans), self.strategy.rank_by
             else:
-                requested_extra_cash = global_extra_cash
-            
-            # Sort loans by balance (snowball method)
-            working_loans.sort(key=lambda l: l.current_balance)
-            
-            # Calculate the maximum we could possibly need (total balance + interest)
-            max_needed = 0.0
-            for loan in working_loans:
-                if loan.current_balance > 0:
-                    interest = loan.current_balance * (loan.interest_rate / 100 / 12)
-                    max_needed += loan.current_balance + interest
-            
-            # Cap the extra payment at what's actually needed
-            effective_extra_cash = min(requested_extra_cash, max(0, max_needed - minimum_total_payment))
-            
-            # Calculate the desired budget for this period
-            adjusted_total_payment = minimum_total_payment + effective_extra_cash
-            
-            period_payments = {}
-            freed = 0.0
-            
-            # 1) Pay minimums and collect freed amounts (exact logic from generate_payment_plan)
-            for loan in working_loans:
-                if loan.current_balance <= 0:
-                    period_payments[loan.name] = 0.0
-                    continue
-
-                # Accrue interest
-                interest = loan.current_balance * (loan.interest_rate / 100 / 12)
-                loan.current_balance += interest
-
-                # Determine payment (cap at balance)
-                min_pay = loan.adjusted_min_payment
-                payment_amt = min(min_pay, loan.current_balance)
-                principal = max(0.0, payment_amt - min(payment_amt, interest))
-
-                # Apply payment
-                loan.current_balance -= principal
-                period_payments[loan.name] = round(payment_amt, 2)
-
-                # Freed from min_pay
-                freed += (min_pay - payment_amt)
-                if loan.current_balance <= 0:
-                    loan.adjusted_min_payment = 0.0
-
-            # 2) Build extra pool and redistribute immediately (exact logic from generate_payment_plan)
-            extra_pool = effective_extra_cash + freed
-            for loan in working_loans:
-                if loan.current_balance <= 0 or extra_pool <= 0:
-                    continue
-                bonus = min(extra_pool, loan.current_balance)
-                loan.current_balance -= bonus
-                period_payments[loan.name] = period_payments.get(loan.name, 0.0) + round(bonus, 2)
-                extra_pool -= bonus
-
-            # 2a) Apply any remaining budget if needed, but don't exceed what's owed
-            actual_total = sum(period_payments.values())
-            remaining_budget = adjusted_total_payment - actual_total
-            
-            # Only try to spend more if we have remaining budget and remaining balances
-            if remaining_budget > 0:
-                for loan in working_loans:
-                    if loan.current_balance <= 0 or remaining_budget <= 0:
-                        continue
-                    bonus = min(remaining_budget, loan.current_balance)
-                    loan.current_balance -= bonus
-                    period_payments[loan.name] = period_payments.get(loan.name, 0.0) + round(bonus, 2)
-                    remaining_budget -= bonus
-
-            # 3) Update the period with new calculations
-            final_total_payment = sum(period_payments.values())
-            period["payments"] = period_payments
-            period["balances"] = {loan.name: round(max(loan.current_balance, 0), 2) for loan in working_loans}
-            period["total_payment"] = round(final_total_payment, 2)
-            period["total_balance"] = round(sum(max(loan.current_balance, 0) for loan in working_loans), 2)
-            period["minimum_total_payment"] = round(minimum_total_payment, 2)
-            period["adjusted_total_payment"] = round(adjusted_total_payment, 2)
-        
-        # Update the display
-        self.display_plan(self.plan)
+                prioritized_loans, rank_by = self.loans, "balance"
+            checkpoints = self._checkpoints = CheckpointedPlan(prioritized_loans, global_extra_cash,
+                                                               self.row_extras, rank_by)
+            changed = range(len(checkpoints))
+        else:
+            # Resume from the edited row's checkpoint; rows after the trajectories rejoin are reused
+            changed = checkpoints.set_extra_cash(start_row, self.row_extras.get(start_row))
+
+        self.plan = checkpoints.frame
+        self.redraw_rows(changed)
+
+    def redraw_rows(self, rows):
+        """Refresh the given table rows and match the table's length to the plan."""
+        items = self.tree.get_children()
+        for idx in rows:
+            values = self.format_row(self.plan[idx], self.row_extras.get(idx))
+            if idx < len(items):
+                self.tree.item(items[idx], values=values)
+            else:
+                self.tree.insert("", "end", values=values)
+        for item in items[len(self.plan):]:
+            self.tree.delete(item)
@@ -1,3 +1,4 @@
 from .loan import Loan
+from .portfolio import Portfolio
 
-__all__ = ['Loan']
\ No newline at end of file
+__all__ = ['Loan', 'Portfolio']
\ No newline at end of file
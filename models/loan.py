@@ -1,6 +1,44 @@
 from datetime import datetime, timedelta, date
+from functools import lru_cache
+
+DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S")
+# Distinct date strings remembered by Loan._parse_date; rows repeat due dates and timestamps heavily
+DATE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date_string(value):
+    # Fast path for the zero-padded forms SQLite stores: "YYYY-MM-DD" and "YYYY-MM-DD HH:MM:SS"
+    if value.isascii() and len(value) in (10, 19) and value[4] == value[7] == "-":
+        year, month, day = value[0:4], value[5:7], value[8:10]
+        if len(value) == 10:
+            valid_time = True
+        else:
+            hour, minute, second = value[11:13], value[14:16], value[17:19]
+            valid_time = (value[10] == " " and value[13] == value[16] == ":"
+                          and hour.isdigit() and minute.isdigit() and second.isdigit()
+                          and int(hour) < 24 and int(minute) < 60 and int(second) < 60)
+        if valid_time and year.isdigit() and month.isdigit() and day.isdigit():
+            try:
+                return date(int(year), int(month), int(day))
+            except ValueError:
+                pass
+    # Everything else strptime accepts, such as unpadded months and days
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Date '{value}' is not in a recognized format")
+
 
 class Loan:
+    # Slotted: plans clone every loan per run, and portfolios can hold thousands of them
+    __slots__ = ("id", "name", "principal", "current_balance", "interest_rate", "monthly_min_payment",
+                 "extra_payment", "first_due_date", "interest_change_rate", "loan_term_months", "lender",
+                 "notes", "forbearance_start_date", "forbearance_end_date", "total_paid", "last_payment_date",
+                 "created_at", "adjusted_min_payment")
+
     def __init__(self, id, name, principal, current_balance, interest_rate,
                  monthly_min_payment, extra_payment, first_due_date,
                  interest_change_rate=0.0, loan_term_months=None, lender=None,
@@ -23,6 +61,36 @@ class Loan:
         self.total_paid = total_paid
         self.last_payment_date = self._parse_date(last_payment_date)
         self.created_at = self._parse_date(created_at) if created_at else datetime.today().date()
+        # Simulation state: the minimum the payoff engines still owe this month, 0.0 once paid off
+        self.adjusted_min_payment = monthly_min_payment
+
+    def copy(self):
+        """Return an independent copy without re-running the constructor or parsing dates."""
+        # Field by field: several times faster than a setattr loop over __slots__
+        clone = Loan.__new__(Loan)
+        clone.id = self.id
+        clone.name = self.name
+        clone.principal = self.principal
+        clone.current_balance = self.current_balance
+        clone.interest_rate = self.interest_rate
+        clone.monthly_min_payment = self.monthly_min_payment
+        clone.extra_payment = self.extra_payment
+        clone.first_due_date = self.first_due_date
+        clone.interest_change_rate = self.interest_change_rate
+        clone.loan_term_months = self.loan_term_months
+        clone.lender = self.lender
+        clone.notes = self.notes
+        clone.forbearance_start_date = self.forbearance_start_date
+        clone.forbearance_end_date = self.forbearance_end_date
+        clone.total_paid = self.total_paid
+        clone.last_payment_date = self.last_payment_date
+        clone.created_at = self.created_at
+        clone.adjusted_min_payment = self.adjusted_min_payment
+        return clone
+
+    def to_dict(self):
+        """Return the loan's fields as a dict, simulation state included."""
+        return {field: getattr(self, field) for field in Loan.__slots__}
 
     @staticmethod
     def _parse_date(value):
@@ -30,11 +98,8 @@ class Loan:
             return None
         if isinstance(value, date):
             return value
-        for fmt in ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S"):
-            try:
-                return datetime.strptime(value, fmt).date()
-            except (ValueError, TypeError):
-                continue
+        if isinstance(value, str):
+            return _parse_date_string(value)
         raise ValueError(f"Date '{value}' is not in a recognized format")
 
     @classmethod
@@ -66,18 +131,30 @@ class Loan:
         check_date = check_date or datetime.today().date()
         return self.forbearance_start_date <= check_date <= self.forbearance_end_date
 
+    def forbearance_days(self, from_date, to_date):
+        """Count the days from from_date up to (not including) to_date that fall in forbearance."""
+        if not self.forbearance_start_date or not self.forbearance_end_date:
+            return 0
+        # Forbearance covers its end date, so the interval is closed on both ends
+        start = max(from_date, self.forbearance_start_date)
+        end = min(to_date, self.forbearance_end_date + timedelta(days=1))
+        return max(0, (end - start).days)
+
     def calculate_accrued_interest(self, from_date=None, to_date=None):
-        """Calculate accrued interest between two dates."""
+        """
+        Calculate accrued interest between two dates.
+
+        Interest accrues daily on the current balance for every day from from_date up
+        to to_date, except days in forbearance. See utils.accrual.accrued_interest for
+        every loan of a portfolio at once.
+        """
         from_date = from_date or self.last_payment_date or self.first_due_date
         to_date = to_date or datetime.today().date()
         if from_date >= to_date:
             return 0.0
 
         # Skip interest accrual during forbearance
-        if self.is_in_forbearance(to_date):
-            return 0.0
-
-        days = (to_date - from_date).days
+        days = (to_date - from_date).days - self.forbearance_days(from_date, to_date)
         daily_rate = self.interest_rate / 100 / 365
         accrued_interest = self.current_balance * daily_rate * days
         return round(accrued_interest, 2)
@@ -104,30 +181,16 @@ class Loan:
         }
 
     def generate_amortization_schedule(self):
-        """Generate an amortization schedule."""
-        schedule = []
-        balance = self.current_balance
-        monthly_rate = self.interest_rate / 100 / 12
+        """
+        Generate an amortization schedule, paying the minimum plus the extra payment each month.
+
+        Raises:
+            ValueError: If that payment does not cover the monthly interest, so the loan never pays off.
+        """
+        from utils.amortization import amortize, schedule_rows
         payment = self.monthly_min_payment + self.extra_payment
-        payment_date = self.first_due_date
-
-        while balance > 0:
-            interest = balance * monthly_rate
-            principal = payment - interest
-            if principal > balance:
-                principal = balance
-                payment = principal + interest
-            balance -= principal
-            schedule.append({
-                "date": payment_date,
-                "payment": round(payment, 2),
-                "principal": round(principal, 2),
-                "interest": round(interest, 2),
-                "balance": round(balance, 2)
-            })
-            payment_date += timedelta(days=30)  # Approximate next month
-
-        return schedule
+        return schedule_rows(amortize(self.current_balance, self.interest_rate / 100 / 12, payment,
+                                      self.first_due_date))
 
 if __name__ == "__main__":
     # Example loan for testing
@@ -143,13 +206,13 @@ if __name__ == "__main__":
     )
 
     print("Initial loan state:")
-    print(vars(loan))
+    print(loan.to_dict())
 
     # Apply a payment
     payment_result = loan.apply_payment(300.0, payment_date="2025-07-01")
     print("\nAfter payment:")
     print(payment_result)
-    print(vars(loan))
+    print(loan.to_dict())
 
     # Generate amortization schedule
     print("\nAmortization schedule (first 5 months):")
@@ -0,0 +1,137 @@
+from datetime import date, datetime
+from typing import Iterator, List, Sequence
+import numpy as np
+from models.loan import Loan
+
+# Columns of the loans table, in the order Portfolio loads them, and how each is stored
+FIELDS = (
+    ("id", "ids", "int"),
+    ("name", "names", "object"),
+    ("principal", "principals", "float"),
+    ("current_balance", "balances", "float"),
+    ("interest_rate", "interest_rates", "float"),
+    ("monthly_min_payment", "min_payments", "float"),
+    ("extra_payment", "extra_payments", "float"),
+    ("first_due_date", "first_due_dates", "date"),
+    ("interest_change_rate", "interest_change_rates", "float"),
+    ("loan_term_months", "loan_term_months", "object"),
+    ("lender", "lenders", "object"),
+    ("notes", "notes", "object"),
+    ("forbearance_start_date", "forbearance_start_dates", "date"),
+    ("forbearance_end_date", "forbearance_end_dates", "date"),
+    ("total_paid", "totals_paid", "float"),
+    ("last_payment_date", "last_payment_dates", "date"),
+    ("created_at", "created_dates", "date"),
+)
+COLUMNS = tuple(column for _, column, _ in FIELDS)
+# Ordinal stored for a missing date; real ordinals start at 1 (date.min)
+NO_DATE = 0
+
+
+def _date_ordinals(values) -> np.ndarray:
+    # Rows share due dates and timestamps heavily, so parse each distinct value once
+    ordinals = {value: NO_DATE if value is None else Loan._parse_date(value).toordinal()
+                for value in set(values)}
+    return np.array([ordinals[value] for value in values], dtype=np.int64)
+
+
+class Portfolio:
+    """
+    Loans stored column by column, as typed numpy arrays in table order.
+
+    Numeric fields are float64 arrays (ids int64), dates are int64 ordinals with
+    NO_DATE for missing values, and text fields are object arrays; the attribute
+    names are listed in COLUMNS. A Portfolio is also a read-only sequence of Loan:
+    indexing and iterating build Loan objects on demand, so it can be passed
+    anywhere a List[Loan] is accepted, while the strategies and the array engines
+    work on the columns directly.
+    """
+
+    def __init__(self, **columns):
+        """
+        Args:
+            **columns: One array per name in COLUMNS, all of the same length.
+        """
+        for _, column, kind in FIELDS:
+            dtype = {"int": np.int64, "float": float, "date": np.int64, "object": object}[kind]
+            setattr(self, column, np.asarray(columns[column], dtype=dtype))
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence]) -> "Portfolio":
+        """
+        Build a Portfolio from rows holding the loans table's columns in FIELDS order.
+        """
+        values = list(zip(*rows)) or [()] * len(FIELDS)
+        columns = {}
+        for (_, column, kind), column_values in zip(FIELDS, values):
+            if kind == "date":
+                columns[column] = _date_ordinals(column_values)
+            elif kind == "object":
+                array = np.empty(len(column_values), dtype=object)
+                array[:] = column_values
+                columns[column] = array
+            else:
+                columns[column] = column_values
+        return cls(**columns)
+
+    @classmethod
+    def from_database(cls, db) -> "Portfolio":
+        """
+        Load every row of the loans table straight into columns, without creating Loan objects.
+        """
+        fields = ", ".join(field for field, _, _ in FIELDS)
+        return cls.from_rows(db.fetchall(f"SELECT {fields} FROM loans"))
+
+    @classmethod
+    def from_loans(cls, loans: Sequence[Loan]) -> "Portfolio":
+        """
+        Build a Portfolio from Loan objects.
+        """
+        return cls.from_rows([tuple(getattr(loan, field) for field, _, _ in FIELDS) for loan in loans])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def take(self, indices) -> "Portfolio":
+        """
+        Return a new Portfolio with the loans at the given positions, in that order.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        return Portfolio(**{column: getattr(self, column)[indices] for column in COLUMNS})
+
+    def positions(self, loan_ids: Sequence[int]) -> np.ndarray:
+        """
+        Positions of the given loan ids, in the order given; ids not in the portfolio are skipped.
+        """
+        index = {loan_id: position for position, loan_id in enumerate(self.ids.tolist())}
+        return np.array([index[loan_id] for loan_id in loan_ids if loan_id in index], dtype=np.intp)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return self.take(np.arange(len(self))[position])
+        return self.to_loans(np.array([position]))[0]
+
+    def __iter__(self) -> Iterator[Loan]:
+        return iter(self.to_loans())
+
+    def to_loans(self, indices=None) -> List[Loan]:
+        """
+        Build Loan objects for every loan, or for the loans at the given positions.
+        """
+        columns = [getattr(self, column) if indices is None else getattr(self, column)[indices]
+                   for column in COLUMNS]
+        # tolist() turns numpy scalars back into the Python floats and ints Loan normally holds
+        rows = zip(*(column.tolist() for column in columns))
+        today = datetime.today().date()
+        loans = []
+        for row in rows:
+            loan = Loan.__new__(Loan)
+            for (field, _, kind), value in zip(FIELDS, row):
+                if kind == "date":
+                    value = date.fromordinal(value) if value != NO_DATE else None
+                setattr(loan, field, value)
+            if loan.created_at is None:
+                loan.created_at = today
+            loan.adjusted_min_payment = loan.monthly_min_payment
+            loans.append(loan)
+        return loans
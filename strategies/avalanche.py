@@ -1,7 +1,10 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+import numpy as np
 from models.loan import Loan
+from models.portfolio import Portfolio
 from strategies.base_strategy import PayoffStrategy
-from utils import generate_payment_plan  # Import the shared function
+from utils.plan_frame import PlanFrame
+from utils.plan_events import PlanEvent
 
 class AvalancheStrategy(PayoffStrategy):
     """
@@ -11,21 +14,30 @@ class AvalancheStrategy(PayoffStrategy):
 
     def prioritize(self, loans):
         # Sort by interest_rate descending (highest first)
+        if isinstance(loans, Portfolio):
+            # Negated so the stable argsort keeps ties in table order, as sorted(reverse=True) does
+            return loans.take(np.argsort(-loans.interest_rates, kind="stable"))
         return sorted(loans, key=lambda loan: loan.interest_rate, reverse=True)
 
-    def generate_payment_plan(self, loans: List[Loan], extra_cash: float = 0.0) -> List[Dict]:
+    def generate_payment_plan(self, loans: List[Loan], extra_cash: float = 0.0,
+                              extra_cash_schedule: Optional[Dict[int, float]] = None,
+                              events: Optional[List[PlanEvent]] = None, max_months: int = 1000) -> PlanFrame:
         """
         Generate a payment plan using the Avalanche strategy.
 
         Args:
             loans (List[Loan]): A list of Loan objects.
             extra_cash (float): Additional monthly cash available for loan payments.
+            extra_cash_schedule (Dict[int, float], optional): Per-period overrides of extra_cash.
+            events (List[PlanEvent], optional): Rate changes, forbearance and lump sums beyond the loans' own.
+            max_months (int): Horizon of the events engine, see utils.generate_payment_plan.
 
         Returns:
-            List[Dict]: Each dict has keys: "date", "payments" (dict), "total_balance"
+            PlanFrame: Rows are dicts with keys: "date", "payments" (dict), "total_balance"
         """
         prioritized_loans = self.prioritize(loans)  # Prioritize loans by highest interest rate
-        return generate_payment_plan(prioritized_loans, user_extra_cash=extra_cash)  # Use the shared function
+        # Use the shared function
+        return self._generate(prioritized_loans, extra_cash, extra_cash_schedule, events, max_months)
 
 if __name__ == "__main__":
     # Example usage
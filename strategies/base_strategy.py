@@ -1,13 +1,36 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional
 from models import Loan
+from utils.plan_events import PlanEvent
 
 class PayoffStrategy(ABC):
     """
     Abstract base class for loan payoff strategies.
     All concrete strategies should inherit from this class and implement the generate_payment_plan method.
+
+    rank_by tells the payoff engine whether the order from prioritize() holds for the
+    whole plan ("priority") or loans are re-ranked by balance as they are paid down
+    ("balance"), see utils.priority_index.RANKINGS.
     """
 
+    rank_by = "priority"
+
+    def __init__(self, engine: str = "python", plan_cache=None):
+        """
+        Args:
+            engine (str): Payoff engine used by generate_payment_plan, see utils.ENGINES.
+            plan_cache (utils.plan_cache.PlanCache, optional): Memoizes generated plans
+                across calls, keyed on the portfolio and scenario inputs.
+        """
+        self.engine = engine
+        self.plan_cache = plan_cache
+
+    def __getstate__(self):
+        # The plan cache is local to this process; copies sent to worker processes run uncached
+        state = self.__dict__.copy()
+        state["plan_cache"] = None
+        return state
+
     @abstractmethod
     def generate_payment_plan(self, loans: List[Loan]) -> List[Dict]:
         """
@@ -17,7 +40,8 @@ class PayoffStrategy(ABC):
             loans (List[Loan]): A list of Loan objects to include in the payment plan.
 
         Returns:
-            List[Dict]: A list of dictionaries representing the payment plan.
+            List[Dict]: The payment plan, one dictionary per period (the built-in
+                        strategies return a PlanFrame, which reads the same way).
                         Each dictionary should contain:
                         - 'date': Date of the payment period (str)
                         - 'payments': Dict mapping loan names to payment amounts for this period
@@ -25,6 +49,96 @@ class PayoffStrategy(ABC):
         """
         pass
 
+    def _generate(self, prioritized_loans: List[Loan], extra_cash: float,
+                  extra_cash_schedule: Optional[Dict[int, float]] = None,
+                  events: Optional[List[PlanEvent]] = None, max_months: int = 1000):
+        """
+        Run the shared payoff engine on already prioritized loans, through plan_cache if set.
+        """
+        from utils.generate_payment_plan import generate_payment_plan
+
+        def generate():
+            return generate_payment_plan(prioritized_loans, user_extra_cash=extra_cash, engine=self.engine,
+                                         extra_cash_schedule=extra_cash_schedule, rank_by=self.rank_by,
+                                         events=events, max_months=max_months)
+        if self.plan_cache is None:
+            return generate()
+        from utils.plan_cache import plan_key
+        key = plan_key(self, prioritized_loans, extra_cash, extra_cash_schedule, events, max_months)
+        return self.plan_cache.get_or_generate(key, [loan.id for loan in prioritized_loans], generate)
+
+    def iter_payment_plan(self, loans: List[Loan], extra_cash: float = 0.0,
+                          extra_cash_schedule: Optional[Dict[int, float]] = None,
+                          events: Optional[List[PlanEvent]] = None, max_months: int = 1000) -> Iterator[Dict]:
+        """
+        Yield this strategy's payment plan one period at a time.
+
+        Args:
+            loans (List[Loan]): A list of Loan objects.
+            extra_cash (float): Additional monthly cash available for loan payments.
+            extra_cash_schedule (Dict[int, float], optional): Per-period overrides of extra_cash.
+            events (List[PlanEvent], optional): Rate changes, forbearance and lump sums.
+            max_months (int): Horizon of the events engine, see utils.generate_payment_plan.
+
+        Returns:
+            Iterator[Dict]: The periods generate_payment_plan would return, computed lazily.
+                            With a plan_cache, a cached plan is replayed and a fully
+                            consumed stream is stored for the next call.
+        """
+        from utils.generate_payment_plan import iter_payment_plan
+        prioritized_loans = self.prioritize(loans)
+        periods = iter_payment_plan(prioritized_loans, extra_cash, engine=self.engine,
+                                    extra_cash_schedule=extra_cash_schedule, rank_by=self.rank_by, events=events,
+                                    max_months=max_months)
+        if self.plan_cache is None:
+            return periods
+        from utils.plan_cache import plan_key
+        key = plan_key(self, prioritized_loans, extra_cash, extra_cash_schedule, events, max_months)
+        cached = self.plan_cache.get(key)
+        if cached is not None:
+            return iter(cached)
+        names = list(dict.fromkeys(loan.name for loan in prioritized_loans))
+        return self.plan_cache.record(key, [loan.id for loan in prioritized_loans], periods, names)
+
+    def summarize_plan(self, loans: List[Loan], extra_cash: float = 0.0,
+                       extra_cash_schedule: Optional[Dict[int, float]] = None,
+                       events: Optional[List[PlanEvent]] = None, max_months: int = 1000) -> Dict:
+        """
+        Payoff date, totals and per-loan payoff months without building the plan rows.
+
+        Args:
+            loans (List[Loan]): A list of Loan objects.
+            extra_cash (float): Additional monthly cash available for loan payments.
+            extra_cash_schedule (Dict[int, float], optional): Per-period overrides of extra_cash.
+            events (List[PlanEvent], optional): Rate changes, forbearance and lump sums.
+            max_months (int): Horizon of the events engine, see utils.generate_payment_plan.
+
+        Returns:
+            Dict: "payoff_month", "payoff_date", "paid_off", "total_paid", "total_interest"
+                  and "loan_payoff_months", see utils.summarize_payment_plan.
+        """
+        from utils.generate_payment_plan import summarize_payment_plan
+        return summarize_payment_plan(self.prioritize(loans), extra_cash, engine=self.engine,
+                                      extra_cash_schedule=extra_cash_schedule, rank_by=self.rank_by, events=events,
+                                      max_months=max_months)
+
+    def sweep_extra_cash(self, loans: List[Loan], extra_cash_values,
+                         events: Optional[List[PlanEvent]] = None, max_months: int = 1000) -> Dict:
+        """
+        Simulate this strategy for many extra-cash amounts in one vectorized pass.
+
+        Args:
+            loans (List[Loan]): A list of Loan objects.
+            extra_cash_values (Iterable[float]): Extra cash per month, one entry per scenario.
+            events (List[PlanEvent], optional): Rate changes, forbearance and lump sums.
+
+        Returns:
+            Dict: Arrays of "extra_cash", "payoff_month", "total_interest", "total_paid"
+                  and "paid_off", one entry per scenario.
+        """
+        from utils.vectorized_payment_plan import sweep_extra_cash
+        return sweep_extra_cash(self.prioritize(loans), extra_cash_values, rank_by=self.rank_by, events=events)
+
 if __name__ == "__main__":
     # Example usage
     class DummyStrategy(PayoffStrategy):
@@ -1,7 +1,10 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+import numpy as np
 from models.loan import Loan
+from models.portfolio import Portfolio
 from strategies.base_strategy import PayoffStrategy
-from utils import generate_payment_plan  # Import the shared function
+from utils.plan_frame import PlanFrame
+from utils.plan_events import PlanEvent
 
 class CustomStrategy(PayoffStrategy):
     """
@@ -9,13 +12,16 @@ class CustomStrategy(PayoffStrategy):
     Allows users to define their own loan repayment order.
     """
 
-    def __init__(self, loan_priority=None):
+    def __init__(self, loan_priority=None, engine="python", plan_cache=None):
         """
         Initialize the custom strategy with a specific loan priority order.
 
         Args:
             loan_priority (List[int]): A list of loan IDs in the desired payoff order.
+            engine (str): Payoff engine used by generate_payment_plan, see utils.ENGINES.
+            plan_cache (utils.plan_cache.PlanCache, optional): Memoizes generated plans.
         """
+        super().__init__(engine=engine, plan_cache=plan_cache)
         self.loan_priority = loan_priority
 
     def prioritize(self, loans):
@@ -23,11 +29,15 @@ class CustomStrategy(PayoffStrategy):
         Prioritize loans based on a custom sorting logic.
 
         Args:
-            loans (List[Loan]): A list of Loan objects.
+            loans (List[Loan] | Portfolio): A list of Loan objects, or a Portfolio.
 
         Returns:
-            List[Loan]: A sorted list of Loan objects.
+            List[Loan] | Portfolio: The loans in payoff order, in the same container type.
         """
+        if isinstance(loans, Portfolio):
+            if not self.loan_priority:
+                return loans.take(np.argsort(loans.names.astype(str), kind="stable"))
+            return loans.take(loans.positions(self.loan_priority))
         # Example: sort by name alphabetically if no priority is set
         if not self.loan_priority:
             return sorted(loans, key=lambda loan: loan.name)
@@ -35,19 +45,25 @@ class CustomStrategy(PayoffStrategy):
         loan_map = {loan.id: loan for loan in loans}
         return [loan_map[loan_id] for loan_id in self.loan_priority if loan_id in loan_map]
 
-    def generate_payment_plan(self, loans: List[Loan], extra_cash: float = 0.0) -> List[Dict]:
+    def generate_payment_plan(self, loans: List[Loan], extra_cash: float = 0.0,
+                              extra_cash_schedule: Optional[Dict[int, float]] = None,
+                              events: Optional[List[PlanEvent]] = None, max_months: int = 1000) -> PlanFrame:
         """
         Generate a payment plan using the custom strategy.
 
         Args:
             loans (List[Loan]): A list of Loan objects.
             extra_cash (float): Additional monthly cash available for loan payments.
+            extra_cash_schedule (Dict[int, float], optional): Per-period overrides of extra_cash.
+            events (List[PlanEvent], optional): Rate changes, forbearance and lump sums beyond the loans' own.
+            max_months (int): Horizon of the events engine, see utils.generate_payment_plan.
 
         Returns:
-            List[Dict]: Each dict has keys: "date", "payments" (dict), "total_balance"
+            PlanFrame: Rows are dicts with keys: "date", "payments" (dict), "total_balance"
         """
         prioritized_loans = self.prioritize(loans)  # Prioritize loans by custom criteria
-        return generate_payment_plan(prioritized_loans, user_extra_cash=extra_cash)  # Use the shared function
+        # Use the shared function
+        return self._generate(prioritized_loans, extra_cash, extra_cash_schedule, events, max_months)
 
 if __name__ == "__main__":
     # Example usage
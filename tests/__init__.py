@@ -1,5 +1,6 @@
-from .test_database import TestDatabase
-from .test_models import TestLoanModel
-from .test_strategies import TestStrategies
+from .test_database import TestDatabase, TestDatabaseProfiles, TestConnectionPool, TestCsvImport
+from .test_models import TestLoanModel, TestPortfolio, TestAccrual
+from .test_strategies import TestStrategies, TestStrategyComparison, TestCustomOrderOptimizer
+from .test_payment_plan import TestVectorizedEngine, TestExtraCashSweep, TestExtraCashSchedule, TestPriorityIndex, TestStreamingPlan, TestPlanSummary, TestPlanFrame, TestCheckpointedPlan, TestEventEngine, TestPlanCache, TestAmortization, TestLoanAnalytics, TestPlanEvents, TestScheduleCalendar, TestCentsEngine
 
-__all__ = ["TestDatabase", "TestLoanModel", "TestStrategies"]
\ No newline at end of file
+__all__ = ["TestDatabase", "TestDatabaseProfiles", "TestConnectionPool", "TestCsvImport", "TestLoanModel", "TestPortfolio", "TestAccrual", "TestStrategies", "TestStrategyComparison", "TestCustomOrderOptimizer", "TestVectorizedEngine", "TestExtraCashSweep", "TestExtraCashSchedule", "TestPriorityIndex", "TestStreamingPlan", "TestPlanSummary", "TestPlanFrame", "TestCheckpointedPlan", "TestEventEngine", "TestPlanCache", "TestAmortization", "TestLoanAnalytics", "TestPlanEvents", "TestScheduleCalendar", "TestCentsEngine"]
\ No newline at end of file
@@ -1,7 +1,13 @@
 import unittest
 import sqlite3
-from database import Database
+import os
+import tempfile
+import threading
+from database import ConnectionPool, Database
+from database.csv_import import import_loans_csv, import_report
 from models import Loan
+from utils.plan_cache import PlanCache
+from utils.plan_frame import PlanFrame
 
 class TestDatabase(unittest.TestCase):
     def setUp(self):
@@ -72,5 +78,319 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(len(loans), 1)
         self.assertEqual(loans[0].name, "Priority Loan")
 
+    def insert_loan(self, name):
+        return self.db.execute("""
+            INSERT INTO loans (name, principal, current_balance, interest_rate, monthly_min_payment, first_due_date)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (name, 1000.0, 1000.0, 5.0, 25.0, "2025-06-01")).lastrowid
+
+    def trace_commits(self):
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        return lambda: sum(statement.strip().upper() == "COMMIT" for statement in statements)
+
+    def test_reads_do_not_commit(self):
+        self.insert_loan("Read Loan")
+        commits = self.trace_commits()
+        self.db.fetchall("SELECT * FROM loans")
+        self.db.fetchone("SELECT id FROM loans WHERE name = ?", ("Read Loan",))
+        self.db.get_loans_by_strategy(1)
+        self.assertEqual(commits(), 0)
+        self.assertFalse(self.db.conn.in_transaction)
+
+    def test_transaction_commits_writes_once_and_notifies_after_commit(self):
+        writes = []
+        self.db.add_write_listener(lambda table, row_id: writes.append((table, row_id, self.db.conn.in_transaction)))
+        commits = self.trace_commits()
+        with self.db.transaction():
+            ids = [self.insert_loan(f"Loan {i}") for i in range(3)]
+            for priority, loan_id in enumerate(ids, start=1):
+                self.db.add_loan_priority(1, loan_id, priority)
+            self.assertEqual(writes, [])
+        self.assertEqual(commits(), 1)
+        self.assertEqual(writes[:3], [("loans", loan_id, False) for loan_id in ids])
+        self.assertEqual({(table, in_transaction) for table, _, in_transaction in writes[3:]}, {("loan_priority", False)})
+        self.assertEqual(len(self.db.get_loans_by_strategy(1)), 3)
+
+    def test_transaction_rolls_back_on_error(self):
+        writes = []
+        self.db.add_write_listener(lambda table, row_id: writes.append(table))
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.insert_loan("Doomed")
+                raise RuntimeError("abort")
+        self.assertEqual(self.db.fetchall("SELECT * FROM loans"), [])
+        self.assertEqual(writes, [])
+        # The connection is usable, and commits on its own, afterwards
+        self.insert_loan("After")
+        self.assertFalse(self.db.conn.in_transaction)
+
+    def test_failed_write_does_not_leave_a_transaction_open(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.execute("INSERT INTO loans (name) VALUES (NULL)")
+        self.assertFalse(self.db.conn.in_transaction)
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.executemany("INSERT INTO loans (name) VALUES (?)", [("Missing Columns",)])
+        self.assertFalse(self.db.conn.in_transaction)
+        with self.db.transaction():
+            self.insert_loan("After")
+        self.assertEqual([row["name"] for row in self.db.fetchall("SELECT name FROM loans")], ["After"])
+
+    def test_nested_transaction_rolls_back_inner_writes_only(self):
+        writes = []
+        self.db.add_write_listener(lambda table, row_id: writes.append(row_id))
+        with self.db.transaction():
+            outer = self.insert_loan("Outer")
+            with self.assertRaises(sqlite3.IntegrityError):
+                with self.db.transaction():
+                    self.insert_loan("Inner")
+                    self.db.execute("INSERT INTO loans (name) VALUES (?)", ("Missing Columns",))
+        names = [row["name"] for row in self.db.fetchall("SELECT name FROM loans")]
+        self.assertEqual(names, ["Outer"])
+        self.assertEqual(writes, [outer])
+
+    def test_delete_loan_inside_transaction(self):
+        keep, drop = self.insert_loan("Keep"), self.insert_loan("Drop")
+        writes = []
+        self.db.add_write_listener(lambda table, row_id: writes.append(row_id))
+        commits = self.trace_commits()
+        with self.db.transaction():
+            self.db.delete_loan(drop)
+            self.db.execute("UPDATE loans SET extra_payment = 10 WHERE id = ?", (keep,))
+        self.assertEqual(commits(), 1)
+        self.assertEqual(writes, [drop, None])
+        self.assertEqual([row["id"] for row in self.db.fetchall("SELECT id FROM loans")], [keep])
+
+
+class TestDatabaseProfiles(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "loans.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def connect(self, profile):
+        db = Database(self.path, profile)
+        db.connect()
+        self.addCleanup(db.close)
+        return db
+
+    def test_named_profile_is_applied_on_connect(self):
+        settings = self.connect("batch").pragma_settings()
+        self.assertEqual(settings["journal_mode"], "wal")
+        self.assertEqual(settings["synchronous"], 1)  # NORMAL
+        self.assertEqual(settings["temp_store"], 2)   # MEMORY
+        self.assertEqual(settings["cache_size"], -256 * 1024)
+        self.assertEqual(settings["mmap_size"], 1024 * 1024 * 1024)
+        self.assertEqual(settings["busy_timeout"], 30000)
+
+    def test_default_profile_keeps_sqlite_settings(self):
+        settings = self.connect("default").pragma_settings()
+        self.assertEqual(settings["journal_mode"], "delete")
+        self.assertEqual(settings["synchronous"], 2)  # FULL
+
+    def test_custom_settings(self):
+        db = self.connect({"journal_mode": "wal", "synchronous": "off", "cache_size": 500})
+        self.assertEqual(db.pragmas, {"journal_mode": "WAL", "synchronous": "OFF", "cache_size": 500})
+        settings = db.pragma_settings()
+        self.assertEqual((settings["journal_mode"], settings["synchronous"], settings["cache_size"]), ("wal", 0, 500))
+
+    def test_profile_applies_to_in_memory_databases(self):
+        db = Database(":memory:", "desktop")
+        db.connect()
+        self.addCleanup(db.close)
+        db.init_schema()
+        settings = db.pragma_settings()
+        self.assertEqual(settings["journal_mode"], "memory")
+        self.assertIsNone(settings["mmap_size"])
+
+    def test_invalid_profiles_are_rejected(self):
+        with self.assertRaisesRegex(ValueError, "Unknown database profile 'fast'"):
+            Database(self.path, "fast")
+        with self.assertRaisesRegex(ValueError, "Unsupported PRAGMA 'foreign_keys'"):
+            Database(self.path, {"foreign_keys": "ON"})
+        with self.assertRaisesRegex(ValueError, "PRAGMA synchronous must be one of"):
+            Database(self.path, {"synchronous": "NORMAL; DROP TABLE loans"})
+        with self.assertRaisesRegex(ValueError, "PRAGMA cache_size takes an integer"):
+            Database(self.path, {"cache_size": "-2000"})
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmpdir.name, "loans.db"), "desktop")
+        self.db.connect()
+        self.db.init_schema()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def run_in_thread(self, func, count=1):
+        results, errors = [], []
+
+        def work():
+            try:
+                results.append(func())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return results
+
+    def test_connect_again_reuses_the_connection(self):
+        conn = self.db.conn
+        self.db.connect()
+        self.db.fetchall("SELECT * FROM loans")
+        self.assertIs(self.db.conn, conn)
+        stats = self.db.pool.stats()
+        self.assertEqual((stats.opened, stats.open), (1, 1))
+        self.assertGreater(stats.requests, stats.opened)
+
+    def test_threads_get_their_own_connection(self):
+        self.db.execute("INSERT INTO loans (name, principal, current_balance, interest_rate, monthly_min_payment, "
+                        "first_due_date) VALUES ('Shared', 1000, 1000, 5, 25, '2025-06-01')")
+        barrier = threading.Barrier(3)
+
+        def read():
+            conn = self.db.conn
+            barrier.wait()  # All three connections are open at once
+            names = [row["name"] for row in self.db.fetchall("SELECT name FROM loans")]
+            self.assertIs(self.db.conn, conn)
+            return id(conn), names
+
+        results = self.run_in_thread(read, count=3)
+        self.assertEqual([names for _, names in results], [["Shared"]] * 3)
+        self.assertEqual(len({conn for conn, _ in results} | {id(self.db.conn)}), 4)
+        self.assertEqual(self.db.pool.stats().opened, 4)
+
+    def test_connections_of_finished_threads_are_closed(self):
+        barrier = threading.Barrier(2)
+        self.run_in_thread(lambda: (self.db.fetchall("SELECT * FROM loans"), barrier.wait()), count=2)
+        self.assertEqual(self.db.pool.stats().open, 3)
+        # The next connection opened prunes the exited threads'
+        self.run_in_thread(lambda: self.db.fetchone("SELECT COUNT(*) FROM loans"))
+        stats = self.db.pool.stats()
+        self.assertEqual((stats.opened, stats.closed, stats.open), (4, 2, 2))
+
+    def test_release_and_close(self):
+        self.run_in_thread(lambda: (self.db.fetchall("SELECT * FROM loans"), self.db.release()))
+        self.assertEqual(self.db.pool.stats().closed, 1)
+        self.db.close()
+        self.assertEqual(self.db.pool.stats().open, 0)
+        # A closed database reconnects on the next query
+        self.assertEqual(self.db.fetchall("SELECT * FROM loans"), [])
+        self.assertEqual(self.db.pool.stats().opened, 3)
+
+    def test_transactions_are_per_thread(self):
+        writes = []
+        self.db.add_write_listener(lambda table, row_id: writes.append(threading.current_thread().name))
+        insert = ("INSERT INTO loans (name, principal, current_balance, interest_rate, monthly_min_payment, "
+                  "first_due_date) VALUES (?, 1000, 1000, 5, 25, '2025-06-01')")
+        with self.db.transaction():
+            # A worker writing while the main thread's transaction is open commits on its own connection
+            self.run_in_thread(lambda: self.db.execute(insert, ("Worker",)))
+            self.assertEqual(len(writes), 1)
+            self.db.execute(insert, ("Main",))
+            self.assertEqual(len(writes), 1)
+        self.assertEqual(writes[-1], threading.current_thread().name)
+        self.assertEqual(self.db.fetchone("SELECT COUNT(*) FROM loans")[0], 2)
+
+    def test_databases_can_share_a_pool(self):
+        pool = ConnectionPool(self.db.db_path, "desktop")
+        first, second = Database(pool=pool), Database(pool=pool)
+        self.assertIs(first.conn, second.conn)
+        self.assertEqual(pool.stats().opened, 1)
+        first.close()
+        self.assertEqual(pool.stats().open, 0)
+
+
+class TestCsvImport(unittest.TestCase):
+    HEADER = "name,principal,current_balance,interest_rate,monthly_min_payment,extra_payment,first_due_date,lender,loan_term_months,notes\n"
+
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.db.connect()
+        self.db.init_schema()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def write_csv(self, lines, header=HEADER):
+        path = os.path.join(self.tmpdir.name, "loans.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            f.write(header + "".join(line + "\n" for line in lines))
+        return path
+
+    def test_imports_all_rows_in_chunks(self):
+        lines = [f"Loan {i},1000,{900 + i},5.0,25,0,2025-01-{i % 28 + 1:02d},Bank,,note {i}" for i in range(23)]
+        result = import_loans_csv(self.db, self.write_csv(lines), chunk_size=5)
+        self.assertEqual(result.imported, 23)
+        self.assertEqual(result.errors, [])
+        rows = self.db.fetchall("SELECT * FROM loans ORDER BY id")
+        self.assertEqual([row["name"] for row in rows], [f"Loan {i}" for i in range(23)])
+        self.assertEqual(rows[3]["current_balance"], 903.0)
+        self.assertIsNone(rows[0]["loan_term_months"])
+        self.assertEqual(rows[0]["lender"], "Bank")
+
+    def test_reports_bad_rows_like_the_row_by_row_import(self):
+        lines = [
+            "Good,1000,900,5,25,0,2025-01-15,,12,",
+            ",1000,900,5,25,0,2025-01-15,,,",             # row 3: no name
+            "Bad Number,abc,900,5,25,0,2025-01-15,,,",    # row 4
+            "Bad Date,1000,900,5,25,0,01/15/2025,,,",     # row 5
+            "No Date,1000,900,5,25,0,,,,",                # row 6
+            "Negative,-5,900,5,25,0,2025-01-15,,,",       # row 7: rejected by the CHECK constraint
+            "Also Good,2000,1800,4,50,10,2025-02-01,Bank,,",
+        ]
+        result = import_loans_csv(self.db, self.write_csv(lines), chunk_size=3)
+        self.assertEqual(result.imported, 2)
+        self.assertEqual([error.split(":")[0] for error in result.errors],
+                         ["Row 3", "Row 4", "Row 5", "Row 6", "Row 7"])
+        self.assertEqual(result.errors[0], "Row 3: Loan name is required")
+        self.assertTrue(result.errors[1].startswith("Row 4: Invalid numeric value - "))
+        self.assertEqual(result.errors[2], "Row 5: Invalid date format. Use YYYY-MM-DD")
+        self.assertEqual(result.errors[3], "Row 6: First due date is required")
+        self.assertIn("CHECK constraint failed", result.errors[4])
+        # The rest of the failed chunk is still imported
+        self.assertEqual([row["name"] for row in self.db.fetchall("SELECT name FROM loans ORDER BY id")],
+                         ["Good", "Also Good"])
+
+    def test_missing_columns_import_nothing(self):
+        path = self.write_csv(["Loan,1000,900"], header="name,principal,current_balance\n")
+        with self.assertRaisesRegex(ValueError, "Missing required columns: interest_rate, monthly_min_payment"):
+            import_loans_csv(self.db, path)
+        self.assertEqual(self.db.fetchall("SELECT * FROM loans"), [])
+
+    def test_import_commits_once_and_invalidates_plans(self):
+        cache = PlanCache()
+        cache.watch(self.db)
+        cache.put(("plan",), PlanFrame.from_rows([], []), [1])
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        result = import_loans_csv(self.db, self.write_csv([f"Loan {i},1000,900,5,25,0,2025-01-15,,," for i in range(10)]),
+                                  chunk_size=4)
+        self.db.conn.set_trace_callback(None)
+        self.assertEqual(result.imported, 10)
+        self.assertEqual(sum(statement.strip().upper() == "COMMIT" for statement in statements), 1)
+        self.assertEqual(cache.cache_info().currsize, 0)
+
+    def test_import_report_truncates_errors(self):
+        lines = [f",1000,900,5,25,0,2025-01-15,,," for _ in range(12)]
+        report = import_report(import_loans_csv(self.db, self.write_csv(lines)))
+        self.assertTrue(report.startswith("Successfully imported 0 loans."))
+        self.assertIn("Row 11: Loan name is required", report)
+        self.assertNotIn("Row 12:", report)
+        self.assertTrue(report.endswith("... and 2 more errors"))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,6 +1,12 @@
 import unittest
 from datetime import date
 from models.loan import Loan
+from models.portfolio import Portfolio
+from strategies.snowball import SnowballStrategy
+from strategies.avalanche import AvalancheStrategy
+from strategies.custom_strategy import CustomStrategy
+from database import Database
+from utils.accrual import ForbearanceIndex, accrued_interest
 
 class TestLoanModel(unittest.TestCase):
     def setUp(self):
@@ -52,5 +58,107 @@ class TestLoanModel(unittest.TestCase):
             self.assertIn("interest", entry)
             self.assertIn("balance", entry)
 
+    def test_copy(self):
+        self.loan.adjusted_min_payment = 0.0
+        clone = self.loan.copy()
+        self.assertIsInstance(clone, Loan)
+        self.assertEqual(clone.to_dict(), self.loan.to_dict())
+        clone.current_balance -= 500.0
+        clone.adjusted_min_payment = 200.0
+        self.assertEqual(self.loan.current_balance, 10000.0)
+        self.assertEqual(self.loan.adjusted_min_payment, 0.0)
+
+    def test_slots(self):
+        self.assertFalse(hasattr(self.loan, "__dict__"))
+        self.assertEqual(self.loan.adjusted_min_payment, self.loan.monthly_min_payment)
+        with self.assertRaises(AttributeError):
+            self.loan.unknown_field = 1
+
+    def test_parse_date(self):
+        self.assertIsNone(Loan._parse_date(None))
+        self.assertEqual(Loan._parse_date("2025-06-01"), date(2025, 6, 1))
+        self.assertEqual(Loan._parse_date("2025-06-01 13:45:10"), date(2025, 6, 1))
+        self.assertEqual(Loan._parse_date("2025-6-1"), date(2025, 6, 1))
+        self.assertEqual(Loan._parse_date(date(2024, 2, 29)), date(2024, 2, 29))
+        for value in ("2023-02-29", "2025-06-01T13:45:10", "2025-06-01 24:00:00", " 2025-06-01", "06/01/2025", 20250601):
+            with self.assertRaises(ValueError):
+                Loan._parse_date(value)
+
+class TestAccrual(unittest.TestCase):
+    def setUp(self):
+        common = dict(principal=10000.0, current_balance=10000.0, interest_rate=7.3, monthly_min_payment=200.0,
+                      extra_payment=0.0, first_due_date="2025-01-01", last_payment_date="2025-06-01")
+        self.loans = [
+            Loan(id=1, name="Plain", **common),
+            Loan(id=2, name="Ends inside", forbearance_start_date="2025-06-21", forbearance_end_date="2025-07-31",
+                 **common),
+            Loan(id=3, name="Covers window", forbearance_start_date="2025-05-01", forbearance_end_date="2025-08-01",
+                 **common),
+            Loan(id=4, name="Inside window", forbearance_start_date="2025-06-10", forbearance_end_date="2025-06-14",
+                 **common),
+            Loan(id=5, name="Open ended", forbearance_start_date="2025-06-10", **common),
+        ]
+        self.as_of = date(2025, 7, 1)
+
+    def test_only_forbearance_days_are_skipped(self):
+        daily = 10000.0 * (7.3 / 100 / 365)
+        # June 1-30 accrue, less the forbearance days in that window
+        expected = [round(daily * days, 2) for days in (30, 20, 0, 25, 30)]
+        self.assertEqual([loan.calculate_accrued_interest(to_date=self.as_of) for loan in self.loans], expected)
+
+    def test_bulk_matches_each_loan(self):
+        portfolio = Portfolio.from_loans(self.loans)
+        index = ForbearanceIndex.from_portfolio(portfolio)
+        self.assertEqual(len(index), 3)
+        for as_of in (date(2025, 5, 1), self.as_of, date(2025, 12, 31)):
+            self.assertEqual(accrued_interest(portfolio, as_of, forbearance=index).tolist(),
+                             [loan.calculate_accrued_interest(to_date=as_of) for loan in self.loans])
+            self.assertEqual(index.active_on(as_of).tolist(), [loan.is_in_forbearance(as_of) for loan in self.loans])
+        since = date(2025, 6, 12)
+        self.assertEqual(accrued_interest(self.loans, self.as_of, since=since).tolist(),
+                         [loan.calculate_accrued_interest(since, self.as_of) for loan in self.loans])
+
+class TestPortfolio(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.db.connect()
+        self.db.init_schema()
+        rows = [
+            ("Loan C", 10000.0, 5000.0, 7.0, 200.0, "2025-06-01", None, "Bank", "2025-07-01", "2025-09-30"),
+            ("Loan A", 5000.0, 3000.0, 5.0, 100.0, "2025-06-01 00:00:00", 24, None, None, None),
+            ("Loan B", 8000.0, 3000.0, 7.0, 150.0, "2025-6-15", None, None, None, None),
+            ("Loan D", 2000.0, 1500.0, 3.0, 50.0, "2025-07-01", None, None, None, None),
+        ]
+        for row in rows:
+            self.db.execute("INSERT INTO loans (name, principal, current_balance, interest_rate, monthly_min_payment, "
+                            "first_due_date, loan_term_months, lender, forbearance_start_date, forbearance_end_date) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+        self.loans = [Loan.from_row(row) for row in self.db.fetchall("SELECT * FROM loans")]
+        self.portfolio = Portfolio.from_database(self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_columns(self):
+        self.assertEqual(len(self.portfolio), 4)
+        self.assertEqual(self.portfolio.ids.tolist(), [1, 2, 3, 4])
+        self.assertEqual(self.portfolio.balances.tolist(), [5000.0, 3000.0, 3000.0, 1500.0])
+        self.assertEqual(self.portfolio.first_due_dates[1], date(2025, 6, 1).toordinal())
+        self.assertEqual(self.portfolio.forbearance_end_dates[0], date(2025, 9, 30).toordinal())
+
+    def test_loans_round_trip(self):
+        self.assertEqual([loan.to_dict() for loan in self.portfolio], [loan.to_dict() for loan in self.loans])
+        self.assertEqual(self.portfolio[2].to_dict(), self.loans[2].to_dict())
+        self.assertEqual([loan.to_dict() for loan in Portfolio.from_loans(self.loans)],
+                         [loan.to_dict() for loan in self.loans])
+
+    def test_prioritize_matches_loan_lists(self):
+        for strategy in (SnowballStrategy(), AvalancheStrategy(), CustomStrategy(), CustomStrategy([4, 2, 99, 1])):
+            prioritized = strategy.prioritize(self.portfolio)
+            self.assertIsInstance(prioritized, Portfolio)
+            self.assertEqual([loan.id for loan in prioritized], [loan.id for loan in strategy.prioritize(self.loans)])
+            self.assertEqual(strategy.generate_payment_plan(self.portfolio, 100.0).to_rows(),
+                             strategy.generate_payment_plan(self.loans, 100.0).to_rows())
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,764 @@
+import unittest
+import random
+import itertools
+import numpy as np
+from models.loan import Loan
+from strategies.snowball import SnowballStrategy
+from strategies.avalanche import AvalancheStrategy
+from strategies.custom_strategy import CustomStrategy
+from utils.generate_payment_plan import generate_payment_plan, iter_payment_plan, summarize_payment_plan, ENGINES
+from utils.event_payment_plan import EventPlan
+from utils.priority_index import PriorityIndex, RANKINGS
+from utils.checkpointed_plan import CheckpointedPlan
+from utils.plan_frame import PlanFrame
+from utils.plan_cache import PlanCache, plan_key
+from utils.amortization import amortize, payoff_periods, SCHEDULE_DTYPE
+from utils.calculators import generate_amortization_schedule, calculate_weighted_average_life
+from utils.analytics import loan_analytics, NEVER
+from utils.plan_events import PlanEvent, EventQueue, build_event_queue, RATE, LUMP_SUM
+from utils.schedule_calendar import ScheduleCalendar, due_dates, period_of
+from utils.cents_payment_plan import accrue, monthly_rate_units, to_cents
+from models.portfolio import Portfolio
+from datetime import date, timedelta
+from database import Database
+
+
+def make_portfolio(seed, count):
+    rng = random.Random(seed)
+    return [
+        Loan(id=i, name=f"Loan {i}", principal=30000, current_balance=round(rng.uniform(0, 30000), 2),
+             interest_rate=rng.choice([0.0, 3.75, round(rng.uniform(0, 25), 2)]),
+             monthly_min_payment=rng.choice([50, 100, round(rng.uniform(20, 600), 2)]),
+             extra_payment=0, first_due_date="2025-06-01")
+        for i in range(count)
+    ]
+
+
+class TestVectorizedEngine(unittest.TestCase):
+    def setUp(self):
+        self.loans = [
+            Loan(id=1, name="Loan A", principal=5000, current_balance=3000, interest_rate=5.0,
+                 monthly_min_payment=100, extra_payment=0, first_due_date="2025-06-01"),
+            Loan(id=2, name="Loan B", principal=8000, current_balance=8000, interest_rate=3.0,
+                 monthly_min_payment=150, extra_payment=0, first_due_date="2025-06-01"),
+            Loan(id=3, name="Loan C", principal=10000, current_balance=5000, interest_rate=7.0,
+                 monthly_min_payment=200, extra_payment=0, first_due_date="2025-06-01"),
+        ]
+
+    def test_matches_python_engine(self):
+        for extra_cash in (0.0, 75.5, 1000):
+            expected = generate_payment_plan(self.loans, extra_cash)
+            actual = generate_payment_plan(self.loans, extra_cash, engine="numpy")
+            self.assertEqual(actual, expected)
+
+    def test_matches_python_engine_on_random_portfolios(self):
+        for seed in range(10):
+            loans = make_portfolio(seed, random.Random(seed).randint(1, 12))
+            expected = generate_payment_plan(loans, 150.0)
+            actual = generate_payment_plan(loans, 150.0, engine="numpy")
+            self.assertEqual(actual, expected, f"plans differ for seed {seed}")
+
+    def test_duplicate_names_fall_back_to_python_engine(self):
+        loans = self.loans + [Loan(id=4, name="Loan A", principal=900, current_balance=900, interest_rate=9.0,
+                                   monthly_min_payment=40, extra_payment=0, first_due_date="2025-06-01")]
+        self.assertEqual(generate_payment_plan(loans, 50.0, engine="numpy"), generate_payment_plan(loans, 50.0))
+
+    def test_strategies_select_engine(self):
+        for python_strategy, numpy_strategy in (
+            (SnowballStrategy(), SnowballStrategy(engine="numpy")),
+            (AvalancheStrategy(), AvalancheStrategy(engine="numpy")),
+            (CustomStrategy(loan_priority=[3, 1, 2]), CustomStrategy(loan_priority=[3, 1, 2], engine="numpy")),
+        ):
+            self.assertEqual(numpy_strategy.generate_payment_plan(self.loans, extra_cash=200.0),
+                             python_strategy.generate_payment_plan(self.loans, extra_cash=200.0))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            generate_payment_plan(self.loans, 0.0, engine="fortran")
+
+
+class TestExtraCashSweep(unittest.TestCase):
+    def setUp(self):
+        self.loans = make_portfolio(3, 8)
+
+    def test_sweep_matches_individual_plans(self):
+        extra_values = [0, 50, 100, 250.25, 2000]
+        for strategy in (SnowballStrategy(), AvalancheStrategy(), CustomStrategy()):
+            sweep = strategy.sweep_extra_cash(self.loans, extra_values)
+            for idx, extra_cash in enumerate(extra_values):
+                plan = strategy.generate_payment_plan(self.loans, extra_cash=extra_cash)
+                total_paid = sum(sum(period["payments"].values()) for period in plan)
+                self.assertEqual(sweep["payoff_month"][idx], len(plan))
+                self.assertAlmostEqual(sweep["total_paid"][idx], total_paid, places=2)
+                self.assertTrue(sweep["paid_off"][idx])
+                self.assertAlmostEqual(sweep["total_interest"][idx],
+                                       total_paid - sum(loan.current_balance for loan in self.loans), places=2)
+
+    def test_more_extra_cash_never_slows_payoff(self):
+        sweep = SnowballStrategy().sweep_extra_cash(self.loans, range(0, 2001, 50))
+        self.assertTrue((sweep["payoff_month"][1:] <= sweep["payoff_month"][:-1]).all())
+        self.assertTrue((sweep["total_interest"][1:] <= sweep["total_interest"][:-1] + 0.01).all())
+
+    def test_empty_sweep(self):
+        sweep = SnowballStrategy().sweep_extra_cash(self.loans, [])
+        self.assertEqual(len(sweep["payoff_month"]), 0)
+
+
+class TestExtraCashSchedule(unittest.TestCase):
+    def setUp(self):
+        self.loans = make_portfolio(5, 6)
+        self.schedule = {0: 0.0, 3: 1500.0, 4: 1500.0, 10: 25.0}
+
+    def test_schedule_overrides_period_budget(self):
+        plan = generate_payment_plan(self.loans, 200.0, extra_cash_schedule=self.schedule)
+        minimum_total_payment = sum(loan.monthly_min_payment for loan in self.loans)
+        for period, row in enumerate(plan):
+            extra_cash = self.schedule.get(period, 200.0)
+            self.assertAlmostEqual(row["adjusted_total_payment"], minimum_total_payment + extra_cash, places=2)
+            self.assertAlmostEqual(row["total_payment"], row["adjusted_total_payment"], places=2)
+
+    def test_empty_schedule_matches_flat_extra_cash(self):
+        self.assertEqual(generate_payment_plan(self.loans, 200.0, extra_cash_schedule={}),
+                         generate_payment_plan(self.loans, 200.0))
+
+    def test_engines_agree_on_schedule(self):
+        expected = generate_payment_plan(self.loans, 200.0, extra_cash_schedule=self.schedule)
+        self.assertEqual(generate_payment_plan(self.loans, 200.0, engine="numpy",
+                                               extra_cash_schedule=self.schedule), expected)
+        TestEventEngine.assertPlansClose(self, generate_payment_plan(self.loans, 200.0, engine="events",
+                                                                     extra_cash_schedule=self.schedule), expected)
+
+    def test_strategy_passes_schedule(self):
+        strategy = AvalancheStrategy()
+        expected = generate_payment_plan(strategy.prioritize(self.loans), 200.0, extra_cash_schedule=self.schedule,
+                                         rank_by="priority")
+        self.assertEqual(strategy.generate_payment_plan(self.loans, 200.0, extra_cash_schedule=self.schedule),
+                         expected)
+
+
+class TestPriorityIndex(unittest.TestCase):
+    def test_update_matches_stable_sort(self):
+        rng = random.Random(7)
+        loans = make_portfolio(7, 40)
+        ranking = PriorityIndex(loans)
+        expected = sorted(loans, key=lambda loan: loan.current_balance)
+        for _ in range(50):
+            for loan in ranking.active:
+                loan.current_balance = max(0.0, loan.current_balance - rng.choice([0.0, 10.0, rng.uniform(0, 900)]))
+            ranking.update()
+            expected.sort(key=lambda loan: loan.current_balance)
+            self.assertEqual([loan.id for loan in ranking], [loan.id for loan in expected])
+            self.assertTrue(all(loan.current_balance > 0 for loan in ranking.active))
+
+    def test_priority_ranking_keeps_order(self):
+        loans = make_portfolio(8, 10)
+        ranking = PriorityIndex(loans, "priority")
+        loans[0].current_balance = 0.0
+        loans[3].current_balance = 1.0
+        ranking.update()
+        self.assertEqual([loan.id for loan in ranking.settled], [0])
+        self.assertEqual([loan.id for loan in ranking.active], [loan.id for loan in loans[1:] if loan.current_balance > 0])
+
+    def test_unknown_ranking(self):
+        with self.assertRaises(ValueError):
+            generate_payment_plan(make_portfolio(1, 3), 0.0, rank_by="alphabetical")
+
+    def test_avalanche_keeps_targeting_highest_rate(self):
+        loans = [
+            Loan(id=1, name="Card", principal=9000, current_balance=9000, interest_rate=22.0,
+                 monthly_min_payment=200, extra_payment=0, first_due_date="2025-06-01"),
+            Loan(id=2, name="Car", principal=4000, current_balance=4000, interest_rate=4.0,
+                 monthly_min_payment=150, extra_payment=0, first_due_date="2025-06-01"),
+        ]
+        plan = AvalancheStrategy().generate_payment_plan(loans, extra_cash=500.0)
+        self.assertEqual(plan[3]["payments"]["Card"], 700.0)
+        self.assertEqual(plan[3]["payments"]["Car"], 150.0)
+
+    def test_engines_agree_on_priority_ranking(self):
+        for seed in range(6):
+            loans = make_portfolio(seed, random.Random(seed).randint(1, 12))
+            expected = generate_payment_plan(loans, 150.0, rank_by="priority")
+            self.assertEqual(generate_payment_plan(loans, 150.0, engine="numpy", rank_by="priority"), expected)
+            TestEventEngine.assertPlansClose(self, generate_payment_plan(loans, 150.0, engine="events",
+                                                                         rank_by="priority"), expected)
+
+
+class TestStreamingPlan(unittest.TestCase):
+    def setUp(self):
+        self.loans = make_portfolio(11, 7)
+
+    def test_matches_generated_plan(self):
+        for engine in ENGINES:
+            expected = generate_payment_plan(self.loans, 120.0, engine=engine)
+            self.assertEqual(list(iter_payment_plan(self.loans, 120.0, engine=engine)), expected)
+
+    def test_stops_early(self):
+        periods = iter_payment_plan(self.loans, 120.0)
+        first = list(itertools.islice(periods, 3))
+        self.assertEqual(first, generate_payment_plan(self.loans, 120.0)[:3])
+        # The source loans are never touched, even by a half-consumed plan
+        self.assertEqual([loan.current_balance for loan in self.loans],
+                         [loan.current_balance for loan in make_portfolio(11, 7)])
+
+    def test_validates_before_iterating(self):
+        with self.assertRaises(ValueError):
+            iter_payment_plan(self.loans, 0.0, engine="fortran")
+
+    def test_strategy_streams_plan(self):
+        for strategy in (SnowballStrategy(), AvalancheStrategy(engine="numpy"), CustomStrategy(engine="events")):
+            self.assertEqual(list(strategy.iter_payment_plan(self.loans, extra_cash=80.0)),
+                             strategy.generate_payment_plan(self.loans, extra_cash=80.0))
+
+
+class TestPlanSummary(unittest.TestCase):
+    def test_matches_full_plan(self):
+        for seed in range(8):
+            loans = make_portfolio(seed, random.Random(seed).randint(1, 10))
+            for strategy in (SnowballStrategy(), AvalancheStrategy()):
+                plan = strategy.generate_payment_plan(loans, extra_cash=150.0)
+                summary = strategy.summarize_plan(loans, extra_cash=150.0)
+                total_paid = sum(sum(period["payments"].values()) for period in plan)
+                self.assertEqual(summary["payoff_month"], len(plan))
+                self.assertAlmostEqual(summary["total_paid"], total_paid, places=2)
+                self.assertAlmostEqual(summary["total_interest"],
+                                       total_paid - sum(max(loan.current_balance, 0) for loan in loans)
+                                       + plan[-1]["total_balance"], delta=0.011)
+                self.assertEqual(summary["paid_off"], not any(plan[-1]["balances"].values()))
+                if summary["paid_off"]:
+                    self.assertEqual(summary["payoff_date"], plan[-1]["date"])
+                for name, month in summary["loan_payoff_months"].items():
+                    if month is not None:
+                        self.assertEqual(plan[month - 1]["balances"][name], 0)
+
+    def test_engines_agree(self):
+        for seed in range(6):
+            loans = make_portfolio(seed, random.Random(seed).randint(1, 12))
+            expected = summarize_payment_plan(loans, 75.0)
+            self.assertEqual(summarize_payment_plan(loans, 75.0, engine="numpy"), expected)
+            events = summarize_payment_plan(loans, 75.0, engine="events")
+            self.assertEqual(events["payoff_month"], expected["payoff_month"])
+            self.assertEqual(events["loan_payoff_months"], expected["loan_payoff_months"])
+            self.assertAlmostEqual(events["total_paid"], expected["total_paid"],
+                                   delta=max(0.05, expected["total_paid"] * 1e-11))
+
+    def test_unpaid_plan_has_no_payoff_date(self):
+        loans = [Loan(id=1, name="Slow Loan", principal=250000, current_balance=250000.0, interest_rate=1.0,
+                      monthly_min_payment=420.0, extra_payment=0, first_due_date="2025-06-01")]
+        summary = summarize_payment_plan(loans, 0.0)
+        self.assertFalse(summary["paid_off"])
+        self.assertIsNone(summary["payoff_date"])
+        self.assertEqual(summary["loan_payoff_months"], {"Slow Loan": None})
+
+
+class TestPlanFrame(unittest.TestCase):
+    def setUp(self):
+        self.loans = make_portfolio(4, 6)
+        self.rows = list(iter_payment_plan(self.loans, 100.0))
+
+    def test_row_view_matches_rows(self):
+        for engine in ENGINES:
+            frame = generate_payment_plan(self.loans, 100.0, engine=engine)
+            self.assertIsInstance(frame, PlanFrame)
+            self.assertEqual(frame.names, [loan.name for loan in self.loans])
+        frame = generate_payment_plan(self.loans, 100.0, engine="numpy")
+        self.assertEqual(len(frame), len(self.rows))
+        self.assertEqual(frame, self.rows)
+        self.assertEqual(frame[-1], self.rows[-1])
+        self.assertEqual(frame.to_rows(), self.rows)
+
+    def test_columns(self):
+        frame = PlanFrame.from_rows(self.rows)
+        for loan in self.loans:
+            self.assertEqual(frame.payments_for(loan.name).tolist(),
+                             [row["payments"][loan.name] for row in self.rows])
+            self.assertEqual(frame.balances_for(loan.name)[-1], self.rows[-1]["balances"][loan.name])
+        self.assertEqual(str(frame.dates[0]), self.rows[0]["date"])
+        self.assertEqual(frame.total_balance.tolist(), [row["total_balance"] for row in self.rows])
+
+    def test_slice_and_assign(self):
+        frame = PlanFrame.from_rows(self.rows)
+        self.assertEqual(frame[2:5], self.rows[2:5])
+        row = dict(self.rows[3], payments={name: 1.0 for name in frame.names}, total_payment=6.0)
+        frame[3] = row
+        self.assertEqual(frame[3], row)
+        self.assertEqual(frame.payments[3].sum(), 6.0)
+
+    def test_empty_plan(self):
+        frame = generate_payment_plan([], 100.0, engine="numpy")
+        self.assertEqual(len(frame), 0)
+        self.assertEqual(frame, [])
+
+
+class TestCheckpointedPlan(unittest.TestCase):
+    def test_edits_match_full_recompute(self):
+        rng = random.Random(21)
+        for seed in range(3):
+            loans = make_portfolio(seed, rng.randint(2, 10))
+            for rank_by in RANKINGS:
+                plan = CheckpointedPlan(loans, 100.0, rank_by=rank_by)
+                schedule = {}
+                self.assertEqual(plan.frame, generate_payment_plan(loans, 100.0, rank_by=rank_by))
+                for _ in range(4):
+                    period, extra_cash = rng.randrange(len(plan)), rng.choice([None, 0.0, 400.0, 2500.0])
+                    if extra_cash is None:
+                        schedule.pop(period, None)
+                    else:
+                        schedule[period] = extra_cash
+                    plan.set_extra_cash(period, extra_cash)
+                    self.assertEqual(plan.frame, generate_payment_plan(loans, 100.0, extra_cash_schedule=schedule,
+                                                                       rank_by=rank_by))
+
+    def test_unchanged_edit_rejoins_immediately(self):
+        plan = CheckpointedPlan(make_portfolio(2, 6), 100.0)
+        before = plan.frame
+        self.assertEqual(plan.set_extra_cash(5, 100.0), range(5, 6))
+        self.assertEqual(plan.frame, before)
+
+    def test_edit_recomputes_only_from_its_row(self):
+        loans = make_portfolio(2, 6)
+        plan = CheckpointedPlan(loans, 100.0)
+        head = plan.frame[:10]
+        changed = plan.set_extra_cash(10, 900.0)
+        self.assertEqual(changed.start, 10)
+        self.assertEqual(plan.frame[:10], head)
+        self.assertEqual(changed.stop, len(plan))
+
+    def test_rejoins_once_paid_off(self):
+        # Extra cash in the final period has nothing left to pay, so the plan ends exactly as before
+        loans = [Loan(id=i, name=f"Loan {i}", principal=1200, current_balance=1200.0, interest_rate=0.0,
+                      monthly_min_payment=100.0, extra_payment=0, first_due_date="2025-06-01") for i in range(3)]
+        plan = CheckpointedPlan(loans, 0.0)
+        before = plan.frame
+        self.assertEqual(len(plan), 12)
+        self.assertEqual(plan.set_extra_cash(11, 5000.0), range(11, 12))
+        self.assertEqual(len(plan), 12)
+        self.assertEqual(plan.frame.payments.tolist(), before.payments.tolist())
+        self.assertEqual(plan.frame.total_payment[11], 5300.0)
+
+    def test_period_out_of_range(self):
+        plan = CheckpointedPlan(make_portfolio(2, 3), 100.0)
+        with self.assertRaises(IndexError):
+            plan.set_extra_cash(len(plan), 50.0)
+
+
+class TestEventEngine(unittest.TestCase):
+    def assertPlansClose(self, actual, expected):
+        self.assertEqual(len(actual), len(expected))
+        for row, reference in zip(actual, expected):
+            self.assertEqual(row["date"], reference["date"])
+            for key in ("payments", "balances"):
+                for name, value in reference[key].items():
+                    self.assertAlmostEqual(row[key][name], value, delta=max(0.011, abs(value) * 1e-11))
+            self.assertAlmostEqual(row["total_balance"], reference["total_balance"],
+                                   delta=max(0.011 * len(reference["balances"]), reference["total_balance"] * 1e-11))
+
+    def test_matches_monthly_engine(self):
+        for seed in range(15):
+            loans = make_portfolio(seed, random.Random(seed).randint(1, 15))
+            for extra_cash in (0.0, 250.0):
+                expected = generate_payment_plan(loans, extra_cash, engine="numpy")
+                self.assertPlansClose(generate_payment_plan(loans, extra_cash, engine="events"), expected)
+
+    def test_jumps_between_payoffs(self):
+        loans = [
+            Loan(id=i, name=f"Loan {i}", principal=20000, current_balance=5000.0 * (i + 1), interest_rate=4.0,
+                 monthly_min_payment=150.0 + 20 * i, extra_payment=0, first_due_date="2025-06-01")
+            for i in range(6)
+        ]
+        plan = EventPlan(loans, 100.0)
+        self.assertTrue(plan.paid_off)
+        self.assertLess(len(plan.segments), plan.months / 4)
+        rows = plan.to_rows()
+        self.assertEqual(len(rows), plan.months)
+        for loan in loans:
+            month = plan.loan_payoff_months[loan.name]
+            self.assertGreater(rows[month - 2]["balances"][loan.name], 0)
+            self.assertEqual(rows[month - 1]["balances"][loan.name], 0)
+        self.assertAlmostEqual(plan.total_paid, sum(sum(row["payments"].values()) for row in rows), places=2)
+
+    def test_runs_past_monthly_cap(self):
+        loans = [Loan(id=1, name="Slow Loan", principal=250000, current_balance=250000.0, interest_rate=1.0,
+                      monthly_min_payment=420.0, extra_payment=0, first_due_date="2025-06-01")]
+        capped = EventPlan(loans, 0.0)
+        self.assertEqual(capped.months, 1000)
+        self.assertFalse(capped.paid_off)
+        full = EventPlan(loans, 0.0, max_months=5000)
+        self.assertTrue(full.paid_off)
+        self.assertGreater(full.months, 1000)
+        self.assertLess(len(full.segments), 10)
+
+    def test_max_months_reaches_entry_points(self):
+        loans = [Loan(id=1, name="Slow Loan", principal=250000, current_balance=250000.0, interest_rate=1.0,
+                      monthly_min_payment=420.0, extra_payment=0, first_due_date="2025-06-01")]
+        months = EventPlan(loans, 0.0, max_months=5000).months
+        plan = generate_payment_plan(loans, 0.0, engine="events", max_months=5000)
+        self.assertEqual(len(plan), months)
+        self.assertGreater(len(plan), 1000)
+        self.assertEqual(plan[-1]["total_balance"], 0)
+        self.assertEqual(list(iter_payment_plan(loans, 0.0, engine="events", max_months=5000)), plan)
+        summary = summarize_payment_plan(loans, 0.0, engine="events", max_months=5000)
+        self.assertTrue(summary["paid_off"])
+        self.assertEqual(summary["payoff_month"], months)
+        self.assertEqual(len(generate_payment_plan(loans, 0.0, engine="events")), 1000)
+
+        cache = PlanCache()
+        strategy = SnowballStrategy(engine="events", plan_cache=cache)
+        self.assertEqual(len(strategy.generate_payment_plan(loans, 0.0)), 1000)
+        self.assertEqual(strategy.generate_payment_plan(loans, 0.0, max_months=5000), plan)
+        self.assertEqual(strategy.summarize_plan(loans, 0.0, max_months=5000), summary)
+        self.assertEqual(len(list(strategy.iter_payment_plan(loans, 0.0, max_months=5000))), months)
+        self.assertEqual(cache.cache_info()[:2], (1, 2))
+
+class TestPlanCache(unittest.TestCase):
+    def setUp(self):
+        self.loans = make_portfolio(4, 5)
+        self.cache = PlanCache(maxsize=2)
+        self.strategy = SnowballStrategy(plan_cache=self.cache)
+
+    def test_hit_returns_same_plan(self):
+        first = self.strategy.generate_payment_plan(self.loans, 300.0)
+        second = self.strategy.generate_payment_plan(self.loans, 300.0)
+        self.assertEqual(second, first)
+        self.assertEqual(first, SnowballStrategy().generate_payment_plan(self.loans, 300.0))
+        self.assertEqual(self.cache.cache_info()[:2], (1, 1))
+
+    def test_cached_plan_is_a_copy(self):
+        first = self.strategy.generate_payment_plan(self.loans, 300.0)
+        first.payments[:] = 0
+        self.assertEqual(self.strategy.generate_payment_plan(self.loans, 300.0),
+                         SnowballStrategy().generate_payment_plan(self.loans, 300.0))
+
+    def test_key_covers_scenario_inputs(self):
+        base = plan_key(self.strategy, self.loans, 300.0)
+        changed = make_portfolio(4, 5)
+        changed[2].current_balance += 0.01
+        self.assertNotEqual(plan_key(self.strategy, changed, 300.0), base)
+        self.assertNotEqual(plan_key(self.strategy, self.loans[::-1], 300.0), base)
+        self.assertNotEqual(plan_key(self.strategy, self.loans, 300.5), base)
+        self.assertNotEqual(plan_key(self.strategy, self.loans, 300.0, {3: 0.0}), base)
+        self.assertNotEqual(plan_key(AvalancheStrategy(), self.loans, 300.0), base)
+        self.assertNotEqual(plan_key(SnowballStrategy(engine="numpy"), self.loans, 300.0), base)
+        self.assertEqual(plan_key(self.strategy, make_portfolio(4, 5), 300, {}), base)
+
+    def test_lru_eviction(self):
+        for extra_cash in (100.0, 200.0, 100.0, 300.0):
+            self.strategy.generate_payment_plan(self.loans, extra_cash)
+        self.assertEqual(len(self.cache), 2)
+        self.assertIn(plan_key(self.strategy, self.strategy.prioritize(self.loans), 100.0), self.cache)
+        self.assertNotIn(plan_key(self.strategy, self.strategy.prioritize(self.loans), 200.0), self.cache)
+
+    def test_streamed_plan_is_cached_once_consumed(self):
+        streamed = list(self.strategy.iter_payment_plan(self.loans, 250.0))
+        self.assertEqual(self.strategy.generate_payment_plan(self.loans, 250.0), streamed)
+        self.assertEqual(list(self.strategy.iter_payment_plan(self.loans, 250.0)), streamed)
+        self.assertEqual(self.cache.cache_info()[:2], (2, 1))
+
+    def test_streamed_periods_are_copied(self):
+        expected = SnowballStrategy().generate_payment_plan(self.loans, 250.0)
+        for period in self.strategy.iter_payment_plan(self.loans, 250.0):
+            period["payments"].clear()
+            period["balances"].clear()
+            period["total_paid"] = 0.0
+        self.assertEqual(self.strategy.generate_payment_plan(self.loans, 250.0), expected)
+
+    def test_database_writes_invalidate(self):
+        db = Database(":memory:")
+        db.connect()
+        db.execute("CREATE TABLE loans (id INTEGER PRIMARY KEY, name TEXT, current_balance REAL)")
+        db.execute("CREATE TABLE loan_priority (strategy_id INTEGER, loan_id INTEGER, priority INTEGER)")
+        self.cache.watch(db)
+        other = CustomStrategy(loan_priority=[4, 3], plan_cache=self.cache)
+        self.strategy.generate_payment_plan(self.loans, 100.0)
+        other.generate_payment_plan(self.loans, 100.0)
+
+        db.execute("SELECT * FROM loans")
+        db.execute("INSERT INTO loan_priority VALUES (?, ?, ?)", (1, 0, 1))
+        db.execute("INSERT INTO loans (id, name, current_balance) VALUES (?, ?, ?)", (99, "New", 1.0))
+        self.assertEqual(len(self.cache), 2)
+        db.delete_loan(0)
+        self.assertEqual(len(self.cache), 1)
+        db.execute("UPDATE loans SET current_balance = 0")
+        self.assertEqual(len(self.cache), 0)
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+class TestAmortization(unittest.TestCase):
+    def iterate(self, balance, monthly_rate, payment):
+        # Month-by-month reference for the closed form
+        rows = []
+        while balance > 1e-9:
+            interest = balance * monthly_rate
+            principal = min(payment - interest, balance)
+            balance -= principal
+            rows.append((principal + interest, principal, interest, balance))
+        return rows
+
+    def test_matches_monthly_iteration(self):
+        for balance, annual_rate, payment in [(10000.0, 5.0, 250.0), (2500.0, 0.0, 75.0), (48000.0, 22.9, 1000.0),
+                                              (300.0, 12.0, 1000.0)]:
+            schedule = amortize(balance, annual_rate / 100 / 12, payment, date(2025, 6, 1))
+            self.assertEqual(schedule.dtype, SCHEDULE_DTYPE)
+            expected = self.iterate(balance, annual_rate / 100 / 12, payment)
+            self.assertEqual(len(schedule), len(expected))
+            for row, (paid, principal, interest, remaining) in zip(schedule, expected):
+                self.assertAlmostEqual(row["payment"], paid, places=6)
+                self.assertAlmostEqual(row["principal"], principal, places=6)
+                self.assertAlmostEqual(row["interest"], interest, places=6)
+                self.assertAlmostEqual(row["balance"], remaining, places=6)
+            self.assertEqual(schedule["balance"][-1], 0.0)
+            year, month = divmod(5 + len(schedule) - 1, 12)
+            self.assertEqual(schedule["date"][-1].item(), date(2025 + year, month + 1, 1))
+
+    def test_negative_amortization_raises(self):
+        loan = Loan(id=1, name="Underwater", principal=20000, current_balance=20000, interest_rate=12.0,
+                    monthly_min_payment=150.0, extra_payment=50.0, first_due_date="2025-06-01")
+        with self.assertRaises(ValueError):
+            loan.generate_amortization_schedule()
+        with self.assertRaises(ValueError):
+            payoff_periods(1000.0, 0.0, 0.0)
+        self.assertEqual(len(amortize(0.0, 0.01, 0.0, date(2025, 6, 1))), 0)
+
+    def test_calculator_schedule(self):
+        self.assertEqual(len(generate_amortization_schedule(10000, 5, 12, date(2025, 1, 1))), 12)
+        schedule = generate_amortization_schedule(10000, 5, 12, date(2025, 1, 1), extra_payment=200)
+        self.assertLess(len(schedule), 12)
+        last = schedule[-1]
+        self.assertEqual(last["balance"], 0.0)
+        self.assertAlmostEqual(last["payment"], last["principal"] + last["interest"], places=2)
+        self.assertAlmostEqual(sum(row["principal"] for row in schedule), 10000, delta=0.01 * len(schedule))
+
+
+class TestLoanAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.loans = [
+            Loan(id=1, name="Car", principal=18000, current_balance=15200.75, interest_rate=6.5,
+                 monthly_min_payment=425.0, extra_payment=50.0, first_due_date="2025-06-01"),
+            Loan(id=2, name="Medical", principal=900, current_balance=900.0, interest_rate=0.0,
+                 monthly_min_payment=40.0, extra_payment=0.0, first_due_date="2025-06-01"),
+            Loan(id=3, name="Card", principal=6000, current_balance=5400.0, interest_rate=24.99,
+                 monthly_min_payment=112.5, extra_payment=0.0, first_due_date="2025-06-01"),
+            Loan(id=4, name="Underwater", principal=20000, current_balance=20000.0, interest_rate=12.0,
+                 monthly_min_payment=150.0, extra_payment=0.0, first_due_date="2025-06-01"),
+            Loan(id=5, name="Settled", principal=1000, current_balance=0.0, interest_rate=5.0,
+                 monthly_min_payment=25.0, extra_payment=0.0, first_due_date="2025-06-01"),
+        ]
+
+    def test_matches_schedule_sums(self):
+        analytics = loan_analytics(self.loans)
+        for index, loan in enumerate(self.loans[:3]):
+            monthly_rate = loan.interest_rate / 100 / 12
+            schedule = amortize(loan.current_balance, monthly_rate, loan.monthly_min_payment + loan.extra_payment,
+                                loan.first_due_date)
+            months = range(1, len(schedule) + 1)
+            discounted = [payment / (1 + monthly_rate) ** month for month, payment in zip(months, schedule["payment"])]
+            self.assertEqual(analytics["payoff_month"][index], len(schedule))
+            self.assertAlmostEqual(analytics["total_paid"][index], schedule["payment"].sum(), places=6)
+            self.assertAlmostEqual(analytics["total_interest"][index], schedule["interest"].sum(), places=6)
+            self.assertAlmostEqual(analytics["interest_ratio"][index],
+                                   schedule["interest"].sum() / loan.current_balance, places=9)
+            self.assertAlmostEqual(analytics["wal"][index], sum(month * principal for month, principal in
+                                                                zip(months, schedule["principal"])) / loan.current_balance,
+                                   places=6)
+            self.assertAlmostEqual(analytics["duration"][index],
+                                   sum(month * value for month, value in zip(months, discounted)) / sum(discounted),
+                                   places=6)
+            self.assertAlmostEqual(analytics["wal"][index],
+                                   calculate_weighted_average_life(loan.generate_amortization_schedule()), delta=0.01)
+
+    def test_unpaid_and_settled_loans(self):
+        analytics = loan_analytics(self.loans)
+        self.assertEqual(analytics["payoff_month"][3], NEVER)
+        self.assertFalse(analytics["paid_off"][3])
+        self.assertTrue(np.isnan(analytics["total_interest"][3]))
+        self.assertEqual(analytics["payoff_month"][4], 0)
+        self.assertEqual((analytics["total_paid"][4], analytics["wal"][4], analytics["duration"][4]), (0.0, 0.0, 0.0))
+
+    def test_portfolio_matches_loan_list(self):
+        from_list = loan_analytics(self.loans)
+        from_portfolio = loan_analytics(Portfolio.from_loans(self.loans))
+        for key, values in from_list.items():
+            np.testing.assert_array_equal(values, from_portfolio[key])
+
+
+class TestPlanEvents(unittest.TestCase):
+    def setUp(self):
+        today = date.today()
+        self.loans = [
+            Loan(id=1, name="Loan A", principal=5000, current_balance=3000, interest_rate=5.0,
+                 monthly_min_payment=100, extra_payment=0, first_due_date="2025-06-01"),
+            # Payment dates fall every 30 days, so periods 2 and 3 are inside the forbearance
+            Loan(id=2, name="Loan B", principal=8000, current_balance=8000, interest_rate=3.0,
+                 monthly_min_payment=150, extra_payment=0, first_due_date="2025-06-01",
+                 forbearance_start_date=today + timedelta(days=40), forbearance_end_date=today + timedelta(days=100)),
+        ]
+
+    def test_queue_orders_and_repeats(self):
+        queue = EventQueue()
+        queue.push(5, LUMP_SUM, None, 1.0)
+        queue.push(2, RATE, 0, 3.0, every=12)
+        queue.push(2, LUMP_SUM, None, 2.0)
+        self.assertEqual(list(queue.pop_due(1)), [])
+        self.assertEqual(list(queue.pop_due(5)), [(RATE, 0, 3.0), (LUMP_SUM, None, 2.0), (LUMP_SUM, None, 1.0)])
+        self.assertEqual(list(queue.pop_due(13)), [])
+        self.assertEqual(list(queue.pop_due(14)), [(RATE, 0, 3.0)])
+        self.assertEqual(len(queue), 1)
+
+    def test_forbearance_pauses_loan(self):
+        plan = generate_payment_plan(self.loans, 0.0)
+        for period in (2, 3):
+            self.assertEqual(plan[period]["payments"]["Loan B"], 0.0)
+            self.assertEqual(plan[period]["balances"]["Loan B"], plan[1]["balances"]["Loan B"])
+            # The paused minimum goes to the other loan through the fixed budget
+            self.assertEqual(plan[period]["payments"]["Loan A"], 250.0)
+        self.assertGreater(plan[4]["payments"]["Loan B"], 0.0)
+
+    def test_forbearance_of_only_remaining_loan_does_not_stop_plan(self):
+        loan = self.loans[1]
+        plan = generate_payment_plan([loan], 0.0)
+        unpaused = loan.copy()
+        unpaused.forbearance_end_date = None
+        unpaused = generate_payment_plan([unpaused], 0.0)
+        self.assertEqual(plan[-1]["total_balance"], 0.0)
+        # Nothing accrues while paused, so the plan runs exactly two periods longer
+        self.assertEqual(len(plan), len(unpaused) + 2)
+
+    def test_rate_changes(self):
+        promo = Loan(id=3, name="Card", principal=2000, current_balance=2000, interest_rate=0.0,
+                     monthly_min_payment=100, extra_payment=0, first_due_date="2025-06-01")
+        plan = generate_payment_plan([promo], 0.0, events=[PlanEvent(3, RATE, 3, 24.0)])
+        self.assertEqual([row["balances"]["Card"] for row in plan[:3]], [1900.0, 1800.0, 1700.0])
+        self.assertEqual(plan[3]["balances"]["Card"], 1668.0)
+
+        today = date.today()
+        variable = Loan(id=4, name="Variable", principal=20000, current_balance=20000, interest_rate=4.0,
+                        monthly_min_payment=250, extra_payment=0, first_due_date=today - timedelta(days=300),
+                        interest_change_rate=1.5)
+        queue = build_event_queue([variable])
+        self.assertEqual([month for month in range(40) for _ in queue.pop_due(month)], [3, 15, 27, 39])
+        fixed = variable.copy()
+        fixed.interest_change_rate = 0.0
+        self.assertGreater(summarize_payment_plan([variable], 0.0)["total_interest"],
+                           summarize_payment_plan([fixed], 0.0)["total_interest"])
+
+    def test_lump_sum(self):
+        base = generate_payment_plan(self.loans, 50.0)
+        plan = generate_payment_plan(self.loans, 50.0, events=[PlanEvent(1, LUMP_SUM, value=500.0)])
+        self.assertEqual(plan[0], base[0])
+        self.assertEqual(plan[1]["total_payment"], base[1]["total_payment"] + 500.0)
+        self.assertLess(len(plan), len(base))
+
+    def test_engines_agree(self):
+        today = date.today()
+        for seed in range(6):
+            rng = random.Random(seed)
+            loans = make_portfolio(seed, rng.randint(2, 8))
+            for loan in loans:
+                loan.interest_change_rate = rng.choice([0.0, 0.5, -1.0])
+                if rng.random() < 0.5:
+                    loan.forbearance_start_date = today + timedelta(days=rng.randint(-60, 300))
+                    loan.forbearance_end_date = loan.forbearance_start_date + timedelta(days=rng.randint(0, 200))
+            events = [PlanEvent(4, RATE, loans[0].id, 19.99), PlanEvent(7, LUMP_SUM, value=1500.0)]
+            for rank_by in RANKINGS:
+                expected = generate_payment_plan(loans, 100.0, rank_by=rank_by, events=events)
+                for engine in ("numpy", "events"):
+                    self.assertEqual(generate_payment_plan(loans, 100.0, engine=engine, rank_by=rank_by,
+                                                           events=events), expected)
+                    self.assertEqual(generate_payment_plan(Portfolio.from_loans(loans), 100.0, engine=engine,
+                                                           rank_by=rank_by, events=events), expected)
+                self.assertEqual(summarize_payment_plan(loans, 100.0, engine="numpy", rank_by=rank_by, events=events),
+                                 summarize_payment_plan(loans, 100.0, rank_by=rank_by, events=events))
+                checkpoints = CheckpointedPlan(loans, 100.0, rank_by=rank_by, events=events)
+                self.assertEqual(checkpoints.frame, expected)
+                checkpoints.set_extra_cash(5, 800.0)
+                self.assertEqual(checkpoints.frame, generate_payment_plan(loans, 100.0, extra_cash_schedule={5: 800.0},
+                                                                          rank_by=rank_by, events=events))
+
+    def test_invalid_events(self):
+        with self.assertRaises(ValueError):
+            generate_payment_plan(self.loans, 0.0, events=[PlanEvent(2, RATE, 99, 5.0)])
+        with self.assertRaises(ValueError):
+            generate_payment_plan(self.loans, 0.0, events=[PlanEvent(2, "holiday", 1)])
+
+
+class TestScheduleCalendar(unittest.TestCase):
+    def test_month_end_due_dates(self):
+        calendar = ScheduleCalendar(date(2024, 1, 31), periods=5)
+        self.assertEqual(calendar.iso, ["2024-01-31", "2024-02-29", "2024-03-31", "2024-04-30", "2024-05-31"])
+        self.assertEqual(calendar.due_date(1), date(2024, 2, 29))
+        self.assertEqual(calendar.ordinals[2], date(2024, 3, 31).toordinal())
+        self.assertEqual(due_dates(date(2023, 1, 29), 2).tolist(), [date(2023, 1, 29), date(2023, 2, 28)])
+
+    def test_no_drift_over_thirty_years(self):
+        calendar = ScheduleCalendar(date(2025, 6, 15), periods=360)
+        self.assertEqual(calendar.due_date(359), date(2055, 5, 15))
+
+    def test_extend_keeps_existing_entries(self):
+        calendar = ScheduleCalendar(date(2025, 6, 15), periods=3)
+        head = calendar.iso[:3]
+        calendar.extend(10)
+        self.assertGreaterEqual(len(calendar), 10)
+        self.assertEqual(calendar.iso[:3], head)
+        self.assertEqual(len(calendar.iso), len(calendar))
+
+    def test_period_of_matches_table(self):
+        rng = random.Random(5)
+        for _ in range(500):
+            start = date(2020, 1, 1) + timedelta(days=rng.randrange(3000))
+            calendar = ScheduleCalendar(start, periods=40)
+            on_date = start + timedelta(days=rng.randint(-60, 1100))
+            expected = next(period for period in range(40) if calendar.due_date(period) >= on_date)
+            self.assertEqual(period_of(start, on_date), expected)
+
+    def test_shared_by_plans(self):
+        self.assertIs(ScheduleCalendar.starting(), ScheduleCalendar.starting(date.today()))
+        plan = generate_payment_plan(make_portfolio(3, 4), 100.0)
+        self.assertEqual([row["date"] for row in plan], ScheduleCalendar.starting().iso[:len(plan)])
+
+
+class TestCentsEngine(unittest.TestCase):
+    def setUp(self):
+        self.loans = make_portfolio(7, 9)
+
+    def test_amounts_are_whole_cents(self):
+        plan = generate_payment_plan(self.loans, 150.0, engine="cents")
+        for values in (plan.payments, plan.balances, plan.total_balance):
+            np.testing.assert_array_equal(to_cents(values) / 100, values)
+        # With exact sums every period but the last spends the fixed budget to the cent
+        spent = to_cents(plan.payments).sum(axis=1)
+        np.testing.assert_array_equal(spent[:-1], to_cents(plan.total_payment[:-1]))
+        self.assertLessEqual(spent[-1], to_cents(plan.total_payment[-1]))
+
+    def test_close_to_float_engine(self):
+        for rank_by in RANKINGS:
+            expected = generate_payment_plan(self.loans, 150.0, rank_by=rank_by)
+            actual = generate_payment_plan(self.loans, 150.0, engine="cents", rank_by=rank_by)
+            self.assertEqual(len(actual), len(expected))
+            self.assertLess(np.abs(actual.balances - expected.balances).max(), 1.0)
+
+    def test_summary_is_exact(self):
+        summary = summarize_payment_plan(self.loans, 150.0, engine="cents")
+        plan = generate_payment_plan(self.loans, 150.0, engine="cents")
+        self.assertTrue(summary["paid_off"])
+        self.assertEqual(summary["payoff_month"], len(plan))
+        self.assertEqual(to_cents(summary["total_paid"]), to_cents(plan.payments).sum())
+        self.assertEqual(to_cents(summary["total_paid"]) - to_cents(summary["total_interest"]),
+                         to_cents([loan.current_balance for loan in self.loans]).sum())
+        self.assertEqual(summarize_payment_plan(Portfolio.from_loans(self.loans), 150.0, engine="cents"), summary)
+
+    def test_accrual_rounds_half_up(self):
+        rate = monthly_rate_units(np.array([12.0]))  # 1% a month
+        np.testing.assert_array_equal(accrue(np.array([50, 149, 150, 250]), rate[0]), [1, 1, 2, 3])
+
+    def test_applies_events(self):
+        today = date.today()
+        loans = [loan.copy() for loan in self.loans[:3]]
+        loans[1].forbearance_start_date = today + timedelta(days=40)
+        loans[1].forbearance_end_date = today + timedelta(days=100)
+        plan = generate_payment_plan(loans, 0.0, engine="cents", events=[PlanEvent(1, LUMP_SUM, value=300.0)])
+        self.assertEqual(plan[1]["total_payment"], plan[0]["total_payment"] + 300.0)
+        for period in (2, 3):
+            self.assertEqual(plan[period]["payments"][loans[1].name], 0.0)
+            self.assertEqual(plan[period]["balances"][loans[1].name], plan[1]["balances"][loans[1].name])
@@ -3,6 +3,15 @@ from strategies.snowball import SnowballStrategy
 from strategies.avalanche import AvalancheStrategy
 from strategies.custom_strategy import CustomStrategy
 from models.loan import Loan
+from utils.plan_frame import PlanFrame
+from utils.plan_cache import PlanCache
+from utils.strategy_comparison import compare_strategies, default_strategies, format_comparison
+from utils.order_optimizer import optimize_custom_order, save_custom_order
+from database import Database
+import itertools
+import random
+import threading
+from datetime import datetime, timedelta
 
 class TestStrategies(unittest.TestCase):
     def setUp(self):
@@ -25,7 +34,7 @@ class TestStrategies(unittest.TestCase):
 
         # Test payment plan structure
         plan = strategy.generate_payment_plan(self.loans)
-        self.assertTrue(isinstance(plan, list))
+        self.assertTrue(isinstance(plan, PlanFrame))
         self.assertLessEqual(len(plan), 1000, "Plan should not exceed 1000 periods (infinite loop guard).")
         for period in plan:
             self.assertIn("date", period)
@@ -47,7 +56,7 @@ class TestStrategies(unittest.TestCase):
 
         # Test payment plan structure
         plan = strategy.generate_payment_plan(self.loans)
-        self.assertTrue(isinstance(plan, list))
+        self.assertTrue(isinstance(plan, PlanFrame))
         self.assertLessEqual(len(plan), 1000, "Plan should not exceed 1000 periods (infinite loop guard).")
         for period in plan:
             self.assertIn("date", period)
@@ -69,7 +78,7 @@ class TestStrategies(unittest.TestCase):
 
         # Test payment plan structure
         plan = strategy.generate_payment_plan(self.loans)
-        self.assertTrue(isinstance(plan, list))
+        self.assertTrue(isinstance(plan, PlanFrame))
         self.assertLessEqual(len(plan), 1000, "Plan should not exceed 1000 periods (infinite loop guard).")
         for period in plan:
             self.assertIn("date", period)
@@ -81,5 +90,121 @@ class TestStrategies(unittest.TestCase):
         if plan:
             self.assertLessEqual(plan[-1]["total_balance"], plan[0]["total_balance"] + 1e-2)
 
+class TestStrategyComparison(unittest.TestCase):
+    def setUp(self):
+        self.loans = [
+            Loan(id=1, name="Loan A", principal=5000, current_balance=3000, interest_rate=5.0,
+                 monthly_min_payment=100, extra_payment=0, first_due_date="2025-06-01"),
+            Loan(id=2, name="Loan B", principal=8000, current_balance=8000, interest_rate=3.0,
+                 monthly_min_payment=150, extra_payment=0, first_due_date="2025-06-01"),
+            Loan(id=3, name="Loan C", principal=10000, current_balance=5000, interest_rate=7.0,
+                 monthly_min_payment=200, extra_payment=0, first_due_date="2025-06-01"),
+        ]
+        self.strategies = default_strategies([[2, 1, 3], [3, 2, 1]], engine="python")
+
+    def test_rows_match_each_strategy(self):
+        rows = compare_strategies(self.loans, self.strategies, extra_cash=100.0, processes=1)
+        self.assertEqual([row["strategy"] for row in rows], ["Snowball", "Avalanche", "Custom 1", "Custom 2"])
+        for row, strategy in zip(rows, self.strategies.values()):
+            summary = strategy.summarize_plan(self.loans, 100.0)
+            self.assertEqual(row["payoff_month"], summary["payoff_month"])
+            self.assertEqual(row["total_interest"], summary["total_interest"])
+        slowest = max(row["payoff_month"] for row in rows)
+        self.assertEqual([row["months_saved"] for row in rows], [slowest - row["payoff_month"] for row in rows])
+        self.assertIn(0, [row["months_saved"] for row in rows])
+        self.assertEqual(len(format_comparison(rows).splitlines()), len(rows) + 2)
+
+    def test_process_pool_matches_serial(self):
+        self.strategies["Snowball"].plan_cache = PlanCache()
+        self.assertEqual(compare_strategies(self.loans, self.strategies, extra_cash=100.0, processes=2),
+                         compare_strategies(self.loans, self.strategies, extra_cash=100.0, processes=1))
+
+    def test_process_pool_from_worker_thread(self):
+        # As the GUI runs it: a pool started from a thread other than the main one
+        rows = []
+        worker = threading.Thread(target=lambda: rows.extend(
+            compare_strategies(self.loans, self.strategies, extra_cash=100.0, processes=2)))
+        worker.start()
+        worker.join(timeout=60)
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(rows, compare_strategies(self.loans, self.strategies, extra_cash=100.0, processes=1))
+
+class TestCustomOrderOptimizer(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.loans = []
+        for i in range(1, 6):
+            balance = round(rng.uniform(500, 20000), 2)
+            self.loans.append(Loan(id=i, name=f"Loan {i}", principal=balance, current_balance=balance,
+                                   interest_rate=round(rng.uniform(0, 18), 2),
+                                   monthly_min_payment=round(max(25, balance * rng.uniform(0.03, 0.05)), 2),
+                                   extra_payment=0, first_due_date="2025-06-01"))
+
+    def brute_force(self, extra_cash, key):
+        summaries = (CustomStrategy(list(order), engine="numpy").summarize_plan(self.loans, extra_cash)
+                     for order in itertools.permutations([loan.id for loan in self.loans]))
+        return min(summaries, key=key)
+
+    def test_least_interest_matches_brute_force(self):
+        result = optimize_custom_order(self.loans, extra_cash=300.0, processes=1)
+        best = self.brute_force(300.0, lambda summary: summary["total_interest"])
+        self.assertLessEqual(result["summary"]["total_interest"], best["total_interest"] + 1.0)
+        self.assertEqual(sorted(result["order"]), [1, 2, 3, 4, 5])
+
+    def test_earliest_payoff_matches_brute_force(self):
+        result = optimize_custom_order(self.loans, extra_cash=300.0, objective="payoff", processes=1)
+        best = self.brute_force(300.0, lambda summary: (summary["payoff_month"], summary["total_interest"]))
+        self.assertEqual(result["summary"]["payoff_month"], best["payoff_month"])
+
+    def test_rate_steps_and_forbearance_match_brute_force(self):
+        # The search must simulate the same events as CustomStrategy's plans
+        today = datetime.today().date()
+        self.loans[0].interest_rate = 3.0
+        self.loans[0].interest_change_rate = 8.0
+        self.loans[0].first_due_date = today - timedelta(days=300)
+        self.loans[2].forbearance_start_date = today + timedelta(days=60)
+        self.loans[2].forbearance_end_date = today + timedelta(days=240)
+        least_interest = self.brute_force(300.0, lambda summary: summary["total_interest"])
+        earliest = self.brute_force(300.0, lambda summary: (summary["payoff_month"], summary["total_interest"]))
+        for processes in (1, 2):
+            result = optimize_custom_order(self.loans, extra_cash=300.0, processes=processes)
+            self.assertLessEqual(result["summary"]["total_interest"], least_interest["total_interest"] + 1.0)
+            result = optimize_custom_order(self.loans, extra_cash=300.0, objective="payoff", processes=processes)
+            self.assertEqual(result["summary"]["payoff_month"], earliest["payoff_month"])
+
+    def test_constraints(self):
+        result = optimize_custom_order(self.loans, extra_cash=300.0, first=[4], before=[(5, 2), (3, 1)], processes=1)
+        order = result["order"]
+        self.assertEqual(order[0], 4)
+        self.assertLess(order.index(5), order.index(2))
+        self.assertLess(order.index(3), order.index(1))
+        with self.assertRaises(ValueError):
+            optimize_custom_order(self.loans, before=[(1, 2), (2, 1)])
+        with self.assertRaises(ValueError):
+            optimize_custom_order(self.loans, first=[99])
+        with self.assertRaises(ValueError):
+            optimize_custom_order(self.loans, objective="fastest")
+
+    def test_process_pool_matches_serial(self):
+        serial = optimize_custom_order(self.loans, extra_cash=300.0, tolerance=0.0, processes=1)
+        parallel = optimize_custom_order(self.loans, extra_cash=300.0, tolerance=0.0, processes=2)
+        self.assertEqual(parallel["summary"]["total_interest"], serial["summary"]["total_interest"])
+
+    def test_save_custom_order(self):
+        db = Database(":memory:")
+        db.connect()
+        db.init_schema()
+        for loan in self.loans:
+            db.execute("INSERT INTO loans (id, name, principal, current_balance, interest_rate, monthly_min_payment, "
+                       "first_due_date) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (loan.id, loan.name, loan.principal, loan.current_balance, loan.interest_rate,
+                        loan.monthly_min_payment, "2025-06-01"))
+        strategy_id = db.get_or_create_strategy("custom")
+        self.assertEqual(db.get_or_create_strategy("custom"), strategy_id)
+        save_custom_order(db, strategy_id, [3, 1, 5, 2, 4])
+        save_custom_order(db, strategy_id, [2, 4, 1, 3, 5])
+        self.assertEqual([loan.id for loan in db.get_loans_by_strategy(strategy_id)], [2, 4, 1, 3, 5])
+        db.close()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -5,13 +5,24 @@ from .calculators import (
     calculate_weighted_average_life,
 )
 
-from .generate_payment_plan import (generate_payment_plan,)
+from .amortization import amortize, schedule_rows
+from .analytics import loan_analytics
+from .accrual import accrued_interest
+
+from .generate_payment_plan import (generate_payment_plan, iter_payment_plan, summarize_payment_plan, ENGINES)
 
 __all__ = [
     "calculate_accrued_interest",
     "calculate_monthly_payment",
     "generate_amortization_schedule",
     "calculate_weighted_average_life",
+    "amortize",
+    "schedule_rows",
+    "loan_analytics",
+    "accrued_interest",
     "generate_payment_plan",
+    "iter_payment_plan",
+    "summarize_payment_plan",
+    "ENGINES",
 ]
 
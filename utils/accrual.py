@@ -0,0 +1,102 @@
+from datetime import date, datetime
+from typing import List, Optional
+import numpy as np
+from models.loan import Loan
+from models.portfolio import NO_DATE, Portfolio
+from utils.vectorized_payment_plan import round_cents
+
+
+class ForbearanceIndex:
+    """
+    Forbearance intervals of a portfolio, indexed for whole-portfolio date queries.
+
+    Each interval is a closed range of day ordinals [start, end] belonging to the loan
+    at ``positions[i]`` in the portfolio. Intervals are kept sorted by start, so
+    ``active_on`` finds the candidates for a date with one binary search, and
+    ``days_within`` sums the overlap of every interval with per-loan date windows
+    in one vectorized pass. A loan may have any number of non-overlapping
+    intervals; the loans table holds at most one per loan.
+    """
+
+    def __init__(self, loan_count: int, positions, starts, ends):
+        """
+        Args:
+            loan_count (int): Number of loans in the portfolio.
+            positions (array_like): Portfolio position of the loan each interval belongs to.
+            starts (array_like): First day of each interval, as a date ordinal.
+            ends (array_like): Last day of each interval, as a date ordinal.
+        """
+        order = np.argsort(np.asarray(starts, dtype=np.int64), kind="stable")
+        self.loan_count = loan_count
+        self.positions = np.asarray(positions, dtype=np.intp)[order]
+        self.starts = np.asarray(starts, dtype=np.int64)[order]
+        self.ends = np.asarray(ends, dtype=np.int64)[order]
+
+    @classmethod
+    def from_portfolio(cls, portfolio: Portfolio) -> "ForbearanceIndex":
+        """
+        Index the forbearance_start_date/forbearance_end_date columns; loans missing either date have none.
+        """
+        has_interval = (portfolio.forbearance_start_dates != NO_DATE) & (portfolio.forbearance_end_dates != NO_DATE)
+        positions = np.flatnonzero(has_interval)
+        return cls(len(portfolio), positions, portfolio.forbearance_start_dates[positions],
+                   portfolio.forbearance_end_dates[positions])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def active_on(self, on_date: date) -> np.ndarray:
+        """
+        Boolean array marking the loans in forbearance on the given date.
+        """
+        ordinal = on_date.toordinal()
+        started = np.searchsorted(self.starts, ordinal, side="right")
+        active = np.zeros(self.loan_count, dtype=bool)
+        active[self.positions[:started][self.ends[:started] >= ordinal]] = True
+        return active
+
+    def days_within(self, from_ordinals, to_ordinals) -> np.ndarray:
+        """
+        Days in forbearance per loan, counting each loan's days from from_ordinals up to
+        (not including) to_ordinals.
+        """
+        from_ordinals = np.broadcast_to(np.asarray(from_ordinals, dtype=np.int64), (self.loan_count,))
+        to_ordinals = np.broadcast_to(np.asarray(to_ordinals, dtype=np.int64), (self.loan_count,))
+        # The interval covers its end day, so it stops before end + 1
+        overlap = (np.minimum(to_ordinals[self.positions], self.ends + 1)
+                   - np.maximum(from_ordinals[self.positions], self.starts))
+        return np.bincount(self.positions, weights=np.maximum(overlap, 0),
+                           minlength=self.loan_count).astype(np.int64)
+
+
+def accrued_interest(loans: List[Loan], as_of: Optional[date] = None, since: Optional[date] = None,
+                     forbearance: Optional[ForbearanceIndex] = None) -> np.ndarray:
+    """
+    Interest accrued on every loan as of a date, in one vectorized call.
+
+    Follows Loan.calculate_accrued_interest: simple daily interest on the current
+    balance, from each loan's last payment date (or first due date) up to as_of,
+    skipping only the days spent in forbearance, rounded to cents.
+
+    Args:
+        loans (List[Loan] | Portfolio): Loans to accrue.
+        as_of (date, optional): Accrue up to this date; defaults to today.
+        since (date, optional): Accrue from this date for every loan instead of its last payment.
+        forbearance (ForbearanceIndex, optional): Prebuilt index for ``loans``, reused across calls.
+
+    Returns:
+        np.ndarray: Accrued interest per loan, aligned with ``loans``.
+    """
+    portfolio = loans if isinstance(loans, Portfolio) else Portfolio.from_loans(loans)
+    if forbearance is None:
+        forbearance = ForbearanceIndex.from_portfolio(portfolio)
+    to_ordinal = (as_of or datetime.today().date()).toordinal()
+    if since is not None:
+        from_ordinals = np.full(len(portfolio), since.toordinal(), dtype=np.int64)
+    else:
+        last_paid = portfolio.last_payment_dates
+        from_ordinals = np.where(last_paid != NO_DATE, last_paid, portfolio.first_due_dates)
+
+    days = np.maximum(to_ordinal - from_ordinals, 0) - forbearance.days_within(from_ordinals, to_ordinal)
+    daily_rates = portfolio.interest_rates / 100 / 365
+    return round_cents(portfolio.balances * daily_rates * days)
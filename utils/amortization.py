@@ -0,0 +1,95 @@
+from datetime import date
+from typing import Dict, List, Optional
+import math
+import numpy as np
+from utils.vectorized_payment_plan import round_cents
+from utils.schedule_calendar import due_dates
+
+# One row per payment; amounts are unrounded, schedule_rows rounds them to cents
+SCHEDULE_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("payment", np.float64),
+    ("principal", np.float64),
+    ("interest", np.float64),
+    ("balance", np.float64),
+])
+
+
+def payoff_periods(balance: float, monthly_rate: float, payment: float) -> int:
+    """
+    Number of fixed payments that retire balance, from the closed-form annuity formula.
+
+    Raises:
+        ValueError: If the payment does not exceed the first month's interest, so the
+                    balance would never go down (negative amortization).
+    """
+    if balance <= 0:
+        return 0
+    interest = balance * monthly_rate
+    if payment <= interest:
+        raise ValueError(f"Payment of {payment:.2f} does not cover the {interest:.2f} monthly interest on a "
+                         f"balance of {balance:.2f}; the loan would never be paid off")
+    if monthly_rate == 0:
+        periods = balance / payment
+    else:
+        periods = -math.log1p(-interest / payment) / math.log1p(monthly_rate)
+    # The tolerance keeps float noise from adding a final row that pays off a fraction of a cent
+    return max(1, math.ceil(periods - 1e-9))
+
+
+def amortize(balance: float, monthly_rate: float, payment: float, start_date: date,
+             max_periods: Optional[int] = None) -> np.ndarray:
+    """
+    Compute a whole fixed-payment amortization schedule at once.
+
+    Opening balances come from the closed-form annuity formula
+    B_k = B_0 (1 + r)^k - P ((1 + r)^k - 1) / r, so no month depends on the
+    previous one and the schedule's length is known before anything is built.
+
+    Args:
+        balance (float): Balance at the start of the schedule.
+        monthly_rate (float): Interest rate per month, as a fraction.
+        payment (float): Payment made every month; the last payment only covers what is owed.
+        start_date (date): Date of the first payment; later payments fall on the same day of each
+            following month, see utils.schedule_calendar.due_dates.
+        max_periods (int, optional): Stop after this many payments even if a balance remains.
+
+    Returns:
+        np.ndarray: Structured array of SCHEDULE_DTYPE, one row per payment.
+
+    Raises:
+        ValueError: If the payment does not cover the interest, see payoff_periods.
+    """
+    periods = payoff_periods(balance, monthly_rate, payment)
+    paid_off = max_periods is None or periods <= max_periods
+    if not paid_off:
+        periods = max_periods
+    k = np.arange(periods, dtype=np.float64)
+    if monthly_rate == 0:
+        opening = balance - k * payment
+    else:
+        growth = (1 + monthly_rate) ** k
+        opening = balance * growth - payment * (growth - 1) / monthly_rate
+    interest = opening * monthly_rate
+    principal = np.minimum(payment - interest, opening)
+    if paid_off and periods:
+        principal[-1] = opening[-1]
+
+    schedule = np.empty(periods, dtype=SCHEDULE_DTYPE)
+    schedule["date"] = due_dates(start_date, periods)
+    schedule["payment"] = principal + interest
+    schedule["principal"] = principal
+    schedule["interest"] = interest
+    schedule["balance"] = opening - principal
+    return schedule
+
+
+def schedule_rows(schedule: np.ndarray) -> List[Dict]:
+    """
+    Convert an amortize() schedule into row dicts with amounts rounded to cents.
+    """
+    dates = schedule["date"].tolist()
+    amounts = [round_cents(schedule[field]).tolist() for field in ("payment", "principal", "interest", "balance")]
+    return [{"date": payment_date, "payment": payment, "principal": principal, "interest": interest,
+             "balance": balance}
+            for payment_date, payment, principal, interest, balance in zip(dates, *amounts)]
@@ -0,0 +1,106 @@
+from typing import Dict, List
+import numpy as np
+from models.loan import Loan
+from models.portfolio import Portfolio
+
+# payoff_month of a loan whose payment never covers its interest
+NEVER = -1
+
+
+def loan_analytics(loans: List[Loan]) -> Dict[str, np.ndarray]:
+    """
+    Per-loan amortization analytics for a whole portfolio, in one vectorized pass.
+
+    Each loan pays its minimum plus its extra payment every month, as in
+    Loan.generate_amortization_schedule. See amortization_analytics.
+
+    Args:
+        loans (List[Loan] | Portfolio): Loans to analyze.
+
+    Returns:
+        Dict[str, np.ndarray]: amortization_analytics arrays, aligned with ``loans``.
+    """
+    if isinstance(loans, Portfolio):
+        balances, annual_rates = loans.balances, loans.interest_rates
+        payments = loans.min_payments + loans.extra_payments
+    else:
+        balances = np.array([loan.current_balance for loan in loans], dtype=float)
+        annual_rates = np.array([loan.interest_rate for loan in loans], dtype=float)
+        payments = np.array([loan.monthly_min_payment + loan.extra_payment for loan in loans], dtype=float)
+    return amortization_analytics(balances, annual_rates / 100 / 12, payments)
+
+
+def amortization_analytics(balance, monthly_rate, payment) -> Dict[str, np.ndarray]:
+    """
+    Summary figures of fixed-payment amortization schedules without building them.
+
+    Every figure is a closed-form sum over the schedule amortize() would return:
+    principal repaid grows geometrically at (1 + r) until the final, partial
+    payment, so the weighted sums behind WAL and duration are arithmetico-geometric
+    series. Powers of (1 + r) go through expm1/log1p to stay accurate for small rates.
+
+    Args:
+        balance (array_like): Balances at the start of the schedules.
+        monthly_rate (array_like): Interest rate per month, as a fraction.
+        payment (array_like): Fixed monthly payments.
+
+    Returns:
+        Dict[str, np.ndarray]: Arrays broadcast from the inputs:
+            - "payoff_month": Number of payments, NEVER if the payment does not cover the interest
+            - "total_paid": Sum of all payments
+            - "total_interest": Paid minus the starting balance
+            - "interest_ratio": Total interest per dollar of starting balance
+            - "wal": Weighted-average life of the principal, in months
+            - "duration": Macaulay duration of the payments at the loan's own rate, in months
+            - "paid_off": False where the payment does not cover the interest
+        Loans with no balance have zeros throughout; loans that never pay off have NaN.
+    """
+    balance, rate, payment = np.broadcast_arrays(*(np.asarray(value, dtype=float)
+                                                   for value in (balance, monthly_rate, payment)))
+    owed = balance > 0
+    paid_off = ~owed | (payment > balance * rate)
+    live = owed & paid_off
+    flat = rate == 0
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        log_growth = np.log1p(rate)
+        # Same payoff count as utils.amortization.payoff_periods
+        exact_periods = np.where(flat, balance / payment, -np.log1p(-balance * rate / payment) / log_growth)
+        periods = np.where(live, np.maximum(1, np.ceil(exact_periods - 1e-9)), 0)
+        full = periods - 1  # payments of the full amount before the final one
+
+        # Opening balance of the final month, and the final payment that clears it
+        grown = np.expm1(full * log_growth)  # (1 + r)^m - 1
+        last_opening = np.where(flat, balance - full * payment, balance * (1 + grown) - payment * grown / rate)
+        final_payment = last_opening * (1 + rate)
+        total_paid = full * payment + final_payment
+
+        # Sum of k * principal_k: principal_k = (P - rB)(1 + r)^(k-1) for the full payments
+        triangle = full * (full + 1) / 2
+        principal_moment = np.where(flat, payment * triangle,
+                                    (payment - balance * rate) * ((full * rate - 1) * grown + full * rate) / rate ** 2)
+        wal = (principal_moment + periods * last_opening) / balance
+
+        # Sum of t * payment_t * v^t with v = 1 / (1 + r); the payments' present value is the balance
+        discount = 1 / (1 + rate)
+        step = rate * discount  # 1 - v
+        unpaid = -np.expm1(-full * log_growth)  # 1 - v^m
+        cash_moment = np.where(flat, payment * triangle,
+                               payment * discount * (unpaid - full * (1 - unpaid) * step) / step ** 2)
+        duration = (cash_moment + periods * final_payment * (1 - unpaid) * discount) / balance
+
+    def settle(values):
+        # Nothing owed: every figure is zero; never paid off: undefined
+        return np.where(live, values, np.where(owed, np.nan, 0.0))
+
+    total_paid = settle(total_paid)
+    total_interest = settle(total_paid - balance)
+    return {
+        "payoff_month": np.where(paid_off, periods, NEVER).astype(int),
+        "total_paid": total_paid,
+        "total_interest": total_interest,
+        "interest_ratio": np.divide(total_interest, balance, out=np.zeros_like(balance), where=owed),
+        "wal": settle(wal),
+        "duration": settle(duration),
+        "paid_off": paid_off,
+    }
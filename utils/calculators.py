@@ -1,7 +1,8 @@
 # utils/calculators.py
 
-from datetime import date, timedelta
+from datetime import date
 from typing import List, Dict
+from utils.amortization import amortize, schedule_rows
 
 def calculate_accrued_interest(principal: float, annual_rate: float, days: int) -> float:
     """
@@ -28,44 +29,30 @@ def generate_amortization_schedule(
     extra_payment: float = 0.0
 ) -> List[Dict]:
     """
-    Generate an amortization schedule for a loan.
+    Generate an amortization schedule for a loan, at most term_months rows long.
+
+    Raises:
+        ValueError: If the payment does not cover the monthly interest.
     """
-    schedule = []
-    balance = principal
     monthly_payment = calculate_monthly_payment(principal, annual_rate, term_months)
-    monthly_rate = annual_rate / 100 / 12
-    payment_date = start_date
-
-    for _ in range(term_months):
-        interest = round(balance * monthly_rate, 2)
-        principal_payment = round(monthly_payment - interest + extra_payment, 2)
-        if principal_payment > balance:
-            principal_payment = balance
-            monthly_payment = interest + principal_payment
-        balance = round(balance - principal_payment, 2)
-        schedule.append({
-            "date": payment_date,
-            "payment": round(monthly_payment + extra_payment, 2),
-            "principal": principal_payment,
-            "interest": interest,
-            "balance": balance
-        })
-        if balance <= 0:
-            break
-        payment_date += timedelta(days=30)  # Approximate next month
-
-    return schedule
+    schedule = amortize(principal, annual_rate / 100 / 12, monthly_payment + extra_payment, start_date,
+                        max_periods=term_months)
+    return schedule_rows(schedule)
 
 def calculate_weighted_average_life(schedule: List[Dict]) -> float:
     """
-    Calculate the weighted-average life (WAL) of a loan.
+    Calculate the weighted-average life (WAL) of a loan, in payment periods.
+
+    See utils.analytics.loan_analytics for WAL, duration and totals of whole portfolios
+    without building their schedules.
     """
-    total_principal = sum(entry["principal"] for entry in schedule)
-    if total_principal == 0:
-        return 0.0
+    total_principal = 0.0
     weighted_sum = 0.0
     for i, entry in enumerate(schedule, start=1):
+        total_principal += entry["principal"]
         weighted_sum += entry["principal"] * i
+    if total_principal == 0:
+        return 0.0
     return round(weighted_sum / total_principal, 2)
 
 if __name__ == "__main__":
@@ -0,0 +1,294 @@
+from typing import List, Dict, Iterator, Optional
+import numpy as np
+from models.loan import Loan
+from models.portfolio import Portfolio
+from utils.plan_frame import PlanFrame
+from utils.plan_events import (PlanEvent, EventQueue, build_event_queue, FORBEARANCE_START, FORBEARANCE_END, RATE,
+                               RATE_STEP, LUMP_SUM)
+from utils.schedule_calendar import ScheduleCalendar
+
+# Monthly interest rates are held as integer parts per billion
+RATE_SCALE = 10 ** 9
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def to_cents(values) -> np.ndarray:
+    """
+    Dollar amounts as int64 cents, rounded to the nearest cent.
+    """
+    return np.rint(np.asarray(values, dtype=float) * 100).astype(np.int64)
+
+
+def monthly_rate_units(annual_rates) -> np.ndarray:
+    """
+    Annual percentage rates as monthly rates in parts per billion (RATE_SCALE).
+    """
+    return np.rint(np.asarray(annual_rates, dtype=float) * (RATE_SCALE / 1200)).astype(np.int64)
+
+
+def accrue(balances: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    """
+    One month of interest in cents: balance times rate, rounded half up to the cent.
+
+    This is the engine's only rounding step; everything else is integer addition.
+    """
+    return (balances * rates + RATE_SCALE // 2) // RATE_SCALE
+
+
+def _balance_limit(rates: np.ndarray) -> int:
+    # Largest balance whose interest at the highest rate still fits in an int64
+    return _INT64_MAX // max(int(rates.max(initial=0)), 1) - RATE_SCALE
+
+
+def cascade_cents(pool: int, balances: np.ndarray) -> np.ndarray:
+    """
+    Pour ``pool`` cents into ``balances`` front to back, returning what each loan receives.
+
+    Entries that should be skipped must be passed as 0.
+    """
+    before = pool - (np.cumsum(balances) - balances)
+    return np.minimum(np.maximum(before, 0), balances)
+
+
+class CentsArrays:
+    """
+    Integer-cents view of a prioritized list of loans used by the cents engine.
+    """
+
+    def __init__(self, prioritized_loans: List[Loan]):
+        if isinstance(prioritized_loans, Portfolio):
+            self.names = prioritized_loans.names.tolist()
+            balances, annual_rates = prioritized_loans.balances, prioritized_loans.interest_rates
+            min_payments = prioritized_loans.min_payments
+        else:
+            self.names = [loan.name for loan in prioritized_loans]
+            balances = [loan.current_balance for loan in prioritized_loans]
+            annual_rates = [loan.interest_rate for loan in prioritized_loans]
+            min_payments = [loan.monthly_min_payment for loan in prioritized_loans]
+        self.balances = to_cents(balances)
+        self.interest_rates = np.array(annual_rates, dtype=float)
+        self.rates = monthly_rate_units(self.interest_rates)
+        self.min_payments = to_cents(min_payments)
+        self.minimum_total_payment = int(self.min_payments.sum())
+
+    def __len__(self):
+        return len(self.names)
+
+
+def _apply_events(events: EventQueue, iteration: int, annual_rates: np.ndarray, rates: np.ndarray,
+                  frozen: np.ndarray) -> int:
+    """
+    Apply the events due by this period to the rate and forbearance arrays, returning the lump sums in cents.
+    """
+    lump_sum = 0
+    for kind, position, value in events.pop_due(iteration):
+        if kind == LUMP_SUM:
+            lump_sum += int(to_cents(value))
+        elif kind in (FORBEARANCE_START, FORBEARANCE_END):
+            frozen[position] = kind == FORBEARANCE_START
+        elif kind in (RATE, RATE_STEP):
+            annual_rates[position] = value if kind == RATE else max(0.0, float(annual_rates[position]) + value)
+            rates[position] = monthly_rate_units(annual_rates[position])
+    return lump_sum
+
+
+def _iter_cent_months(state: CentsArrays, user_extra_cash: float, extra_cash_schedule: Optional[Dict[int, float]],
+                      rank_by: str, events: EventQueue):
+    """
+    Run the monthly loop in integer cents, yielding each committed month.
+
+    Follows the monthly rules of utils.generate_payment_plan: interest accrues on
+    every active loan, minimums are paid, and the rest of the fixed budget cascades
+    down the ranking. With exact sums the extra pool and the top-up to the fixed
+    budget are one cascade of the budget minus the minimums paid, and a plan
+    stagnates only when the total balance does not change by a single cent.
+
+    A plan whose balances grow until the next accrual could overflow int64 stops
+    there, unpaid, like a plan that reaches the 1000-period cap.
+
+    Yields:
+        Tuple: (order, bal, payments, fixed_budget, total_balance) in cents, with bal
+        and payments in ranking order.
+    """
+    balances = state.balances.copy()
+    annual_rates, rates = state.interest_rates.copy(), state.rates.copy()
+    frozen = np.zeros(len(state), dtype=bool) if events else None
+    user_extra_cents = int(to_cents(user_extra_cash))
+    schedule = {period: int(to_cents(extra_cash)) for period, extra_cash in (extra_cash_schedule or {}).items()}
+    limit = _balance_limit(rates)
+    order = np.arange(len(state))
+    prev_total_balance = None
+    max_iterations = 1000
+    iteration = 0
+
+    while np.any(balances > 0):
+        ranked = balances[order]
+        if rank_by == "balance" and np.any(ranked[1:] < ranked[:-1]):
+            order = order[np.argsort(ranked, kind="stable")]
+        if iteration >= max_iterations:
+            break
+
+        extra_cash = schedule.get(iteration, user_extra_cents)
+        if frozen is not None:
+            extra_cash += _apply_events(events, iteration, annual_rates, rates, frozen)
+            limit = _balance_limit(rates)
+        if np.any(balances > limit):
+            break
+        fixed_budget = state.minimum_total_payment + extra_cash
+
+        bal, month_rates = balances[order], rates[order]
+        active = bal > 0 if frozen is None else (bal > 0) & ~frozen[order]
+
+        # 1) Accrue interest and pay minimums
+        interest = np.where(active, accrue(bal, month_rates), 0)
+        bal = bal + interest
+        paid = np.where(active, np.minimum(state.min_payments[order], bal), 0)
+        bal = bal - (paid - np.minimum(paid, interest))
+
+        # 2) Cascade the rest of the fixed budget down the ranking
+        owed = np.where(active & (bal > 0), bal, 0)
+        bonus = cascade_cents(fixed_budget - int(paid.sum()), owed)
+        bal = bal - bonus
+        payments = paid + bonus
+
+        total_balance = int(np.maximum(bal, 0).sum())
+        if prev_total_balance == total_balance and (frozen is None or not frozen.any()):
+            break
+        prev_total_balance = total_balance
+
+        balances[order] = bal
+        yield order, bal, payments, fixed_budget, total_balance
+        iteration += 1
+
+
+def _fallback(prioritized_loans) -> bool:
+    # Plans are keyed by loan name; leave the collision semantics to the reference engine
+    names = prioritized_loans.names.tolist() if isinstance(prioritized_loans, Portfolio) else [
+        loan.name for loan in prioritized_loans]
+    return len(set(names)) != len(names)
+
+
+def generate_payment_plan_cents(prioritized_loans: List[Loan], user_extra_cash: float,
+                                extra_cash_schedule: Optional[Dict[int, float]] = None,
+                                rank_by: str = "balance",
+                                events: Optional[List[PlanEvent]] = None) -> PlanFrame:
+    """
+    Generate a payment plan in integer cents, written straight into a PlanFrame.
+
+    Takes the same arguments as iter_payment_plan_cents.
+
+    Returns:
+        PlanFrame: The plan in columnar form, amounts converted back to dollars.
+    """
+    if _fallback(prioritized_loans):
+        from utils.generate_payment_plan import generate_payment_plan
+        return generate_payment_plan(prioritized_loans, user_extra_cash, extra_cash_schedule=extra_cash_schedule,
+                                     rank_by=rank_by, events=events)
+
+    state = CentsArrays(prioritized_loans)
+    payments, balances, fixed_budgets, total_balances = [], [], [], []
+    for order, bal, paid, fixed_budget, total_balance in _iter_cent_months(
+            state, user_extra_cash, extra_cash_schedule, rank_by, build_event_queue(prioritized_loans, events)):
+        row = np.empty(len(state), dtype=np.int64)
+        row[order] = paid
+        payments.append(row)
+        row = np.empty(len(state), dtype=np.int64)
+        row[order] = bal
+        balances.append(row)
+        fixed_budgets.append(fixed_budget)
+        total_balances.append(total_balance)
+
+    periods = len(payments)
+    fixed_budgets = np.array(fixed_budgets, dtype=np.int64) / 100
+    return PlanFrame(state.names, ScheduleCalendar.starting().extend(periods).days[:periods],
+                     np.array(payments, dtype=np.int64).reshape(periods, len(state)) / 100,
+                     np.array(balances, dtype=np.int64).reshape(periods, len(state)) / 100,
+                     fixed_budgets, np.array(total_balances, dtype=np.int64) / 100,
+                     np.full(periods, state.minimum_total_payment / 100), fixed_budgets)
+
+
+def iter_payment_plan_cents(prioritized_loans: List[Loan], user_extra_cash: float,
+                            extra_cash_schedule: Optional[Dict[int, float]] = None,
+                            rank_by: str = "balance",
+                            events: Optional[List[PlanEvent]] = None) -> Iterator[Dict]:
+    """
+    Yield payment plan periods simulated exactly in integer cents.
+
+    Balances, minimums and extra cash are rounded to the cent once on the way in;
+    after that every amount is an int64 and interest is the only rounding step (see
+    accrue), so plans are exact and identical on every platform. They can differ by
+    cents from the float engines, which round payments and balances for display only.
+
+    Args:
+        prioritized_loans (List[Loan]): Loans in priority order.
+        user_extra_cash (float): Extra cash available each month.
+        extra_cash_schedule (Dict[int, float], optional): Sparse map of period index to
+            the extra cash for that period, used in place of user_extra_cash.
+        rank_by (str): "balance" or "priority", see utils.priority_index.RANKINGS.
+        events (List[PlanEvent], optional): Extra plan events, see utils.plan_events.build_event_queue.
+
+    Returns:
+        Iterator[Dict]: Each entry includes payment details, balances, and fixed totals.
+    """
+    if _fallback(prioritized_loans):
+        from utils.generate_payment_plan import iter_payment_plan
+        yield from iter_payment_plan(prioritized_loans, user_extra_cash, extra_cash_schedule=extra_cash_schedule,
+                                     rank_by=rank_by, events=events)
+        return
+
+    state = CentsArrays(prioritized_loans)
+    names = np.array(state.names, dtype=object)
+    minimum_total_payment = state.minimum_total_payment / 100
+    dates = ScheduleCalendar.starting().extend(1000).iso  # _iter_cent_months stops after 1000 periods
+    months = _iter_cent_months(state, user_extra_cash, extra_cash_schedule, rank_by,
+                               build_event_queue(prioritized_loans, events))
+    for month, (order, bal, payments, fixed_budget, total_balance) in enumerate(months):
+        sorted_names = names[order].tolist()
+        yield {
+            "date": dates[month],
+            "payments": dict(zip(sorted_names, (payments / 100).tolist())),
+            "balances": dict(zip(sorted_names, (bal / 100).tolist())),
+            "total_payment": fixed_budget / 100,
+            "total_balance": total_balance / 100,
+            "minimum_total_payment": minimum_total_payment,
+            "adjusted_total_payment": fixed_budget / 100,
+        }
+
+
+def summarize_plan_cents(prioritized_loans: List[Loan], user_extra_cash: float,
+                         extra_cash_schedule: Optional[Dict[int, float]] = None,
+                         rank_by: str = "balance",
+                         events: Optional[List[PlanEvent]] = None) -> Dict:
+    """
+    Aggregates of generate_payment_plan_cents without building any period rows.
+
+    Returns:
+        Dict: See utils.generate_payment_plan.summarize_payment_plan.
+    """
+    if _fallback(prioritized_loans):
+        from utils.generate_payment_plan import summarize_payment_plan
+        return summarize_payment_plan(prioritized_loans, user_extra_cash, extra_cash_schedule=extra_cash_schedule,
+                                      rank_by=rank_by, events=events)
+
+    state = CentsArrays(prioritized_loans)
+    balances = state.balances.copy()
+    payoff_month = np.zeros(len(state), dtype=int)
+    months = 0
+    total_paid = 0
+    for months, (order, bal, payments, _, _) in enumerate(
+            _iter_cent_months(state, user_extra_cash, extra_cash_schedule, rank_by,
+                              build_event_queue(prioritized_loans, events)), start=1):
+        total_paid += int(payments.sum())
+        payoff_month[order[(balances[order] > 0) & (bal <= 0)]] = months
+        balances[order] = bal
+
+    paid_off = not np.any(balances > 0)
+    retired = int(np.maximum(state.balances, 0).sum() - np.maximum(balances, 0).sum())
+    return {
+        "payoff_month": months,
+        "payoff_date": ScheduleCalendar.starting().iso[months - 1] if months and paid_off else None,
+        "paid_off": paid_off,
+        "total_paid": total_paid / 100,
+        "total_interest": (total_paid - retired) / 100,
+        "loan_payoff_months": {name: int(month) or None for name, month in zip(state.names, payoff_month)},
+    }
@@ -0,0 +1,132 @@
+from typing import List, Dict, Optional
+import numpy as np
+from models.loan import Loan
+from utils.plan_frame import PlanFrame
+from utils.vectorized_payment_plan import LoanArrays, round_cents, _iter_months
+from utils.plan_events import PlanEvent, build_event_queue
+from utils.schedule_calendar import ScheduleCalendar
+
+
+class CheckpointedPlan:
+    """
+    Payoff plan that keeps the exact engine state at the start of every period.
+
+    A checkpoint is the raw balances, the ranking order and the previous total
+    balance (for the stagnation check) before a period is simulated. Changing one
+    period's extra cash resumes the simulation from that period's checkpoint and
+    stops as soon as the new state matches the cached checkpoint of the same period:
+    from there on every later period is unchanged and the cached rows are reused.
+
+    Produces the same periods as generate_payment_plan with engine="numpy".
+    """
+
+    def __init__(self, prioritized_loans: List[Loan], user_extra_cash: float,
+                 extra_cash_schedule: Optional[Dict[int, float]] = None, rank_by: str = "balance",
+                 events: Optional[List[PlanEvent]] = None):
+        """
+        Args:
+            prioritized_loans (List[Loan]): Loans in priority order.
+            user_extra_cash (float): Extra cash available each month.
+            extra_cash_schedule (Dict[int, float], optional): Sparse map of period index to
+                the extra cash for that period, used in place of user_extra_cash.
+            rank_by (str): "balance" or "priority", see utils.priority_index.RANKINGS.
+            events (List[PlanEvent], optional): Extra plan events, see utils.plan_events.build_event_queue.
+        """
+        self.state = LoanArrays(prioritized_loans)
+        # Events depend only on the month, so a resumed run replays its own copy of the queue
+        self._events = build_event_queue(prioritized_loans, events)
+        self.user_extra_cash = user_extra_cash
+        self.extra_cash_schedule = dict(extra_cash_schedule or {})
+        self.rank_by = rank_by
+        self.calendar = ScheduleCalendar.starting()
+
+        count = len(self.state)
+        # Checkpoint i is the state before period i; there is one more checkpoint than periods
+        self._balances = self.state.balances.reshape(1, count)
+        self._orders = np.arange(count).reshape(1, count)
+        self._prev_totals = np.array([np.nan])
+        self._payments = np.empty((0, count))
+        self._budgets = np.empty(0)
+        self._totals = np.empty(0)
+        self._frame = None
+        self._resume(0)
+
+    def __len__(self):
+        return len(self._totals)
+
+    @property
+    def frame(self) -> PlanFrame:
+        """The current plan in columnar form."""
+        if self._frame is None:
+            periods = len(self)
+            self._frame = PlanFrame(self.state.names, self.calendar.extend(periods).days[:periods], self._payments,
+                                    round_cents(self._balances[1:]), self._budgets, self._totals,
+                                    np.full(periods, round(self.state.minimum_total_payment, 2)), self._budgets)
+        return self._frame
+
+    def set_extra_cash(self, period: int, extra_cash: Optional[float]) -> range:
+        """
+        Override the extra cash for one period and re-simulate only what it changes.
+
+        Args:
+            period (int): Period index to change.
+            extra_cash (float, optional): New extra cash for the period, or None to go
+                back to user_extra_cash.
+
+        Returns:
+            range: Periods whose rows were recomputed. Periods past the end of the range
+            are unchanged unless the plan's length changed.
+        """
+        if not 0 <= period < len(self):
+            raise IndexError(f"Period {period} is outside the plan's {len(self)} periods")
+        if extra_cash is None:
+            self.extra_cash_schedule.pop(period, None)
+        else:
+            self.extra_cash_schedule[period] = extra_cash
+        return self._resume(period)
+
+    def _checkpoint(self, period: int):
+        prev_total = self._prev_totals[period]
+        return (period, self._balances[period], self._orders[period],
+                None if np.isnan(prev_total) else float(prev_total))
+
+    def _converged(self, period: int, balances, order, total_balance) -> bool:
+        # Only called while self still holds the cached run
+        return (period < len(self._prev_totals)
+                and self._prev_totals[period] == total_balance
+                and np.array_equal(self._balances[period], balances)
+                and np.array_equal(self._orders[period], order))
+
+    def _resume(self, start: int) -> range:
+        balances, orders, prev_totals, payments, budgets, totals = [], [], [], [], [], []
+        period, rejoined = start, False
+        months = _iter_months(self.state, self.user_extra_cash, self.extra_cash_schedule, self.rank_by,
+                              self._checkpoint(start), self._events.copy())
+        for order, _, paid, fixed_budget, total_balance, live_balances in months:
+            period += 1
+            row = np.empty(len(self.state))
+            row[order] = paid
+            payments.append(row)
+            budgets.append(round(fixed_budget, 2))
+            totals.append(round(total_balance, 2))
+            if self._converged(period, live_balances, order, total_balance):
+                rejoined = True
+                break
+            balances.append(live_balances.copy())
+            orders.append(order)
+            prev_totals.append(total_balance)
+
+        # Splice the recomputed periods between the untouched head and, once rejoined, the cached tail
+        count = len(self.state)
+        kept = slice(period, None) if rejoined else slice(0, 0)
+        self._balances = np.concatenate((self._balances[:start + 1],
+                                         np.array(balances).reshape(len(balances), count), self._balances[kept]))
+        self._orders = np.concatenate((self._orders[:start + 1],
+                                       np.array(orders, dtype=int).reshape(len(orders), count), self._orders[kept]))
+        self._prev_totals = np.concatenate((self._prev_totals[:start + 1], prev_totals, self._prev_totals[kept]))
+        self._payments = np.concatenate((self._payments[:start],
+                                         np.array(payments).reshape(len(payments), count), self._payments[kept]))
+        self._budgets = np.concatenate((self._budgets[:start], budgets, self._budgets[kept]))
+        self._totals = np.concatenate((self._totals[:start], totals, self._totals[kept]))
+        self._frame = None
+        return range(start, period if rejoined else len(self))
@@ -0,0 +1,282 @@
+from typing import List, Dict, Iterator, Optional
+from bisect import bisect_right
+import numpy as np
+from models.loan import Loan
+from utils.vectorized_payment_plan import LoanArrays, round_cents, simulate_month
+from utils.schedule_calendar import ScheduleCalendar
+
+# Relative slack on every threshold so float noise in the closed form never
+# carries a jump into a month the monthly engine would treat differently.
+_MARGIN = 1e-9
+
+
+def balance_after(b0, growth, pay_down, months):
+    """
+    Closed-form balance after ``months`` of ``b -> b * (1 + growth) - pay_down``.
+    """
+    months = np.asarray(months, dtype=float)
+    factor = np.exp(months * np.log1p(growth))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(growth > 0, np.expm1(months * np.log1p(growth)) / growth, months)
+    return factor * b0 - pay_down * annuity
+
+
+def months_until(b0, growth, pay_down, low, high):
+    """
+    First month index j >= 0 at which the balance is <= ``low`` or > ``high``.
+
+    Returns np.inf for trajectories that never cross either threshold.
+    """
+    b0, growth, pay_down, low, high = np.broadcast_arrays(*(np.asarray(v, dtype=float)
+                                                            for v in (b0, growth, pay_down, low, high)))
+    result = np.full(b0.shape, np.inf)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        log_growth = np.log1p(growth)
+        fixed_point = np.where(growth > 0, pay_down / growth, np.inf)
+
+        # Falling balances: compounding towards the fixed point from below, or linear pay-down
+        falling = np.where(growth > 0, b0 < fixed_point, pay_down > 0)
+        down = np.where(growth > 0,
+                        np.ceil(np.log((fixed_point - low) / (fixed_point - b0)) / log_growth),
+                        np.ceil((b0 - low) / pay_down))
+        result = np.where(falling & np.isfinite(low) & (down >= 0), down, result)
+
+        # Rising balances: compounding away from the fixed point, or negative pay-down
+        rising = np.where(growth > 0, b0 > fixed_point, pay_down < 0)
+        up = np.where(growth > 0,
+                      np.floor(np.log((high - fixed_point) / (b0 - fixed_point)) / log_growth) + 1,
+                      np.floor((high - b0) / -pay_down) + 1)
+        result = np.where(rising & np.isfinite(high) & (up >= 0), np.minimum(result, up), result)
+
+    result = np.where((b0 <= low) | (b0 > high), 0.0, result)
+    return np.where(np.isnan(result), 0.0, result)
+
+
+class EventPlan:
+    """
+    Payoff plan simulated from one payoff event to the next.
+
+    Between events every loan follows a fixed linear recurrence, so its balance has a
+    closed form: non-targets pay their minimum and the loan at the front of the ranking
+    also absorbs the extra pool and the top-up to the fixed budget. The simulation
+    jumps analytically to the month before the next payoff, regime change or ranking
+    change and steps those months exactly with simulate_month. Cost therefore scales
+    with the number of events rather than loans x months.
+
+    Per-month rows are only built on demand by iter_rows / to_rows. For plans that pay
+    off they match generate_payment_plan to the cent; a plan that never pays off runs
+    to max_months, where the monthly engines stop early once balances stagnate.
+    """
+
+    def __init__(self, prioritized_loans: List[Loan], user_extra_cash: float, max_months: int = 1000,
+                 extra_cash_schedule: Optional[Dict[int, float]] = None, rank_by: str = "balance"):
+        """
+        Args:
+            prioritized_loans (List[Loan]): Loans in priority order.
+            user_extra_cash (float): Extra cash available each month.
+            max_months (int): Length at which the simulation stops, like the
+                monthly engine's iteration cap.
+            extra_cash_schedule (Dict[int, float], optional): Sparse map of period index
+                to the extra cash for that period, used in place of user_extra_cash.
+            rank_by (str): "balance" or "priority", see utils.priority_index.RANKINGS.
+        """
+        self.loans = LoanArrays(prioritized_loans)
+        self.rank_by = rank_by
+        self.user_extra_cash = user_extra_cash
+        self.minimum_total_payment = self.loans.minimum_total_payment
+        self.extra_cash_schedule = extra_cash_schedule or {}
+        self._scheduled_months = sorted(self.extra_cash_schedule)
+        self.max_months = max_months
+        self.calendar = ScheduleCalendar.starting()
+
+        self.segments: List[Dict] = []
+        self.months = 0
+        self.total_paid = 0.0
+        self.loan_payoff_months: Dict[str, Optional[int]] = {name: None for name in self.loans.names}
+        self._simulate()
+
+    @property
+    def paid_off(self) -> bool:
+        return not np.any(self.final_balances > 0)
+
+    @property
+    def total_interest(self) -> float:
+        retired = np.maximum(self.loans.balances, 0.0).sum() - np.maximum(self.final_balances, 0.0).sum()
+        return round(self.total_paid - retired, 2)
+
+    def summary(self) -> Dict:
+        """
+        Aggregates of the plan in the shape of utils.generate_payment_plan.summarize_payment_plan.
+        """
+        paid_off = self.paid_off
+        return {
+            "payoff_month": self.months,
+            "payoff_date": self.calendar.extend(self.months).iso[self.months - 1] if self.months and paid_off else None,
+            "paid_off": paid_off,
+            "total_paid": round(self.total_paid, 2),
+            "total_interest": self.total_interest,
+            "loan_payoff_months": dict(self.loan_payoff_months),
+        }
+
+    def _simulate(self):
+        rates, mins = self.loans.monthly_rates, self.loans.min_payments
+        balances = self.loans.balances.copy()
+        order = np.arange(len(self.loans))
+        prev_total_balance = None
+
+        while np.any(balances > 0) and self.months < self.max_months:
+            if self.rank_by == "balance":
+                order = order[np.argsort(balances[order], kind="stable")]
+            extra_cash = self.extra_cash_schedule.get(self.months, self.user_extra_cash)
+            fixed_budget = self.minimum_total_payment + extra_cash
+
+            jump = self._plan_jump(balances, order, prev_total_balance, extra_cash, fixed_budget)
+            if jump is not None:
+                months, growth, pay_down, payments, month_total = jump
+                end = balance_after(balances, growth, pay_down, months)
+                self.segments.append({"start": self.months, "months": months, "order": order,
+                                      "balances": balances, "growth": growth, "pay_down": pay_down,
+                                      "payments": payments, "fixed_budget": fixed_budget})
+                self.months += months
+                self.total_paid += month_total * months
+                balances = end
+                prev_total_balance = sum(np.maximum(balances[order], 0.0).tolist())
+                continue
+
+            bal, payments = simulate_month(balances[order], rates[order], mins[order],
+                                           extra_cash, fixed_budget)
+            total_balance = sum(np.maximum(bal, 0.0).tolist())
+            if prev_total_balance is not None and abs(total_balance - prev_total_balance) < 0.01:
+                break
+            prev_total_balance = total_balance
+
+            updated = balances.copy()
+            updated[order] = bal
+            for idx in np.flatnonzero((balances > 0) & (updated <= 0)):
+                self.loan_payoff_months[self.loans.names[idx]] = self.months + 1
+            self.segments.append({"start": self.months, "months": 1, "order": order,
+                                  "end_balances": bal, "payments": payments, "fixed_budget": fixed_budget})
+            self.months += 1
+            self.total_paid += sum(payments.tolist())
+            balances = updated
+
+        self.final_balances = balances
+
+    def _plan_jump(self, balances, order, prev_total_balance, extra_cash, fixed_budget):
+        """
+        Work out how many quiet months can be skipped from the current state.
+
+        Returns (months, growth, pay_down, payments, month_total) with per-loan arrays in
+        original loan order, or None when the next month has to be stepped exactly.
+        """
+        bal = balances[order]
+        active = bal > 0
+        if not active.any() or self.months in self.extra_cash_schedule:
+            return None
+        rates = self.loans.monthly_rates[order]
+        mins = np.where(active, self.loans.min_payments[order], 0.0)
+        target = int(np.argmax(active))
+
+        # Payments in a quiet month: minimums, with the extra pool and top-up landing on the target
+        payments = round_cents(mins)
+        payments[target] += round(extra_cash, 2)
+        top_up = fixed_budget - sum(payments.tolist())
+        if top_up > 0:
+            payments[target] += round(top_up, 2)
+        target_extra = extra_cash + max(top_up, 0.0)
+
+        # Amortizing loans compound at 2r and retire their minimum; the rest only accrue at r
+        amortizing = mins >= bal * rates
+        growth = np.where(active, np.where(amortizing, 2 * rates, rates), 0.0)
+        pay_down = np.where(active & amortizing, mins, 0.0)
+        pay_down[target] += target_extra
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            capped = mins / (1 + rates)
+            regime_edge = np.where(rates > 0, mins / rates, np.inf)
+        low = np.where(amortizing, capped, -np.inf)
+        high = np.where(amortizing, regime_edge, np.inf)
+        low[target] = max(low[target], pay_down[target] / (1 + growth[target]))
+        if not amortizing[target]:
+            low[target] = max(pay_down[target] / (1 + growth[target]), regime_edge[target])
+        low = low * (1 + _MARGIN) + _MARGIN
+        high = high * (1 - _MARGIN) - _MARGIN
+
+        horizon = months_until(bal[active], growth[active], pay_down[active], low[active], high[active])
+        next_scheduled = bisect_right(self._scheduled_months, self.months)
+        limit = self.max_months - self.months
+        if next_scheduled < len(self._scheduled_months):
+            limit = min(limit, self._scheduled_months[next_scheduled] - self.months)
+        months = int(min(horizon.min() - 1, limit))
+        if months < 2:
+            return None
+
+        # Under balance ranking the target has to stay at the front for the whole jump
+        others = active.copy()
+        others[target] = False
+        if self.rank_by == "balance" and others.any():
+            def overtaken(month):
+                trajectory = balance_after(bal, growth, pay_down, month)
+                return np.any(trajectory[others] < trajectory[target])
+
+            if overtaken(months - 1):
+                lo, hi = 0, months - 1
+                while hi - lo > 1:
+                    mid = (lo + hi) // 2
+                    if overtaken(mid):
+                        hi = mid
+                    else:
+                        lo = mid
+                months = hi
+                if months < 2:
+                    return None
+
+        # Never jump across the stagnation check; each step's change must stay >= 1 cent
+        step_change = np.where(active, growth * bal - pay_down, 0.0)
+        first = 0 if prev_total_balance is not None else 1
+        for month in sorted({first, months - 1}):
+            change = np.sum(np.exp(month * np.log1p(growth)) * step_change)
+            if abs(change) < 0.01 * (1 + 1e-6):
+                return None
+        signs = np.sign(step_change[step_change != 0])
+        if len(signs) and signs.min() != signs.max():
+            last = np.sum(np.exp((months - 1) * np.log1p(growth)) * step_change)
+            if np.sign(last) != np.sign(np.sum(step_change)):
+                return None
+
+        unsorted = np.empty_like(order)
+        unsorted[order] = np.arange(len(order))
+        return (months, growth[unsorted], pay_down[unsorted], payments,
+                sum(payments.tolist()))
+
+    def iter_rows(self) -> Iterator[Dict]:
+        """
+        Yield per-month rows in the same shape as generate_payment_plan.
+        """
+        names = np.array(self.loans.names, dtype=object)
+        minimum_total_payment = round(self.minimum_total_payment, 2)
+        dates = self.calendar.extend(self.months).iso
+        for segment in self.segments:
+            adjusted_total_payment = round(segment["fixed_budget"], 2)
+            order = segment["order"]
+            sorted_names = names[order].tolist()
+            payments = dict(zip(sorted_names, segment["payments"].tolist()))
+            for offset in range(segment["months"]):
+                if "end_balances" in segment:
+                    bal = segment["end_balances"]
+                else:
+                    bal = balance_after(segment["balances"], segment["growth"], segment["pay_down"],
+                                        offset + 1)[order]
+                month = segment["start"] + offset
+                yield {
+                    "date": dates[month],
+                    "payments": dict(payments),
+                    "balances": dict(zip(sorted_names, round_cents(bal).tolist())),
+                    "total_payment": adjusted_total_payment,
+                    "total_balance": round(sum(np.maximum(bal, 0.0).tolist()), 2),
+                    "minimum_total_payment": minimum_total_payment,
+                    "adjusted_total_payment": adjusted_total_payment,
+                }
+
+    def to_rows(self) -> List[Dict]:
+        return list(self.iter_rows())
@@ -1,135 +1,336 @@
-from typing import List, Dict
-from datetime import datetime, timedelta
+from typing import List, Dict, Iterator, Optional
+from datetime import datetime
 from models.loan import Loan
+from utils.priority_index import PriorityIndex, RANKINGS
+from utils.plan_events import (PlanEvent, EventQueue, build_event_queue, FORBEARANCE_START, FORBEARANCE_END, RATE,
+                               RATE_STEP, LUMP_SUM)
+from utils.plan_frame import PlanFrame
+from utils.schedule_calendar import ScheduleCalendar
 from tkinter import ttk
 
-def generate_payment_plan(prioritized_loans: List[Loan], user_extra_cash: float) -> List[Dict]:
+ENGINES = ("python", "numpy", "events", "cents")
+
+def generate_payment_plan(prioritized_loans: List[Loan], user_extra_cash: float, engine: str = "python",
+                          extra_cash_schedule: Optional[Dict[int, float]] = None,
+                          rank_by: str = "balance", events: Optional[List[PlanEvent]] = None,
+                          max_months: int = 1000) -> PlanFrame:
     """
     Generate a payment plan for the given prioritized loans using the Snowball method.
 
     Args:
         prioritized_loans (List[Loan]): Loans sorted by balance ascending.
         user_extra_cash (float): Extra cash available each month.
+        engine (str): "python" for this reference loop, "numpy" for the
+            array-backed engine in utils.vectorized_payment_plan, "events" for
+            the event-driven engine in utils.event_payment_plan, "cents" for the
+            exact integer-cents engine in utils.cents_payment_plan.
+        extra_cash_schedule (Dict[int, float], optional): Sparse map of period index to
+            the extra cash for that period, used in place of user_extra_cash.
+        rank_by (str): "balance" re-ranks loans smallest balance first every month,
+            "priority" keeps the given order, see utils.priority_index.RANKINGS.
+        events (List[PlanEvent], optional): Rate changes, forbearance windows and lump
+            sums on top of the loans' own forbearance dates and interest_change_rate,
+            see utils.plan_events.build_event_queue.
+        max_months (int): Number of periods after which the events engine stops, so
+            slow payoffs can run past the monthly engines' fixed 1000-period cap.
+            Other engines, and events plans that fall back to numpy, keep that cap.
+
+    Returns:
+        PlanFrame: Columnar plan; each row includes payment details, balances, and fixed totals.
+    """
+    if rank_by not in RANKINGS:
+        raise ValueError(f"Unknown ranking '{rank_by}', expected one of {RANKINGS}")
+    if engine == "numpy":
+        from utils.vectorized_payment_plan import generate_payment_plan_vectorized
+        return generate_payment_plan_vectorized(prioritized_loans, user_extra_cash, extra_cash_schedule, rank_by,
+                                                events)
+    if engine == "cents":
+        from utils.cents_payment_plan import generate_payment_plan_cents
+        return generate_payment_plan_cents(prioritized_loans, user_extra_cash, extra_cash_schedule, rank_by, events)
+    names = list(dict.fromkeys(loan.name for loan in prioritized_loans))
+    return PlanFrame.from_rows(iter_payment_plan(prioritized_loans, user_extra_cash, engine=engine,
+                                                 extra_cash_schedule=extra_cash_schedule, rank_by=rank_by,
+                                                 events=events, max_months=max_months), names)
+
+
+def iter_payment_plan(prioritized_loans: List[Loan], user_extra_cash: float, engine: str = "python",
+                      extra_cash_schedule: Optional[Dict[int, float]] = None,
+                      rank_by: str = "balance", events: Optional[List[PlanEvent]] = None,
+                      max_months: int = 1000) -> Iterator[Dict]:
+    """
+    Yield the periods of generate_payment_plan one at a time as they are computed.
+
+    Takes the same arguments as generate_payment_plan. They are validated
+    immediately, while the python and numpy engines only advance the simulation as
+    periods are consumed, so callers can stop early without building the whole plan.
+    The events engine simulates up front and builds its rows lazily; plans with
+    rate changes, forbearance or lump sums run on the numpy engine instead, since its
+    closed-form jumps assume every loan's terms stay fixed.
+
+    Returns:
+        Iterator[Dict]: The same period dicts generate_payment_plan returns.
+    """
+    if rank_by not in RANKINGS:
+        raise ValueError(f"Unknown ranking '{rank_by}', expected one of {RANKINGS}")
+    engine = _event_engine(prioritized_loans, engine, events)
+    if engine == "numpy":
+        from utils.vectorized_payment_plan import iter_payment_plan_vectorized
+        return iter_payment_plan_vectorized(prioritized_loans, user_extra_cash, extra_cash_schedule, rank_by, events)
+    if engine == "cents":
+        from utils.cents_payment_plan import iter_payment_plan_cents
+        return iter_payment_plan_cents(prioritized_loans, user_extra_cash, extra_cash_schedule, rank_by, events)
+    if engine == "events":
+        from utils.event_payment_plan import EventPlan
+        return EventPlan(prioritized_loans, user_extra_cash, max_months, extra_cash_schedule=extra_cash_schedule,
+                         rank_by=rank_by).iter_rows()
+    if engine != "python":
+        raise ValueError(f"Unknown payoff engine '{engine}', expected one of {ENGINES}")
+    return _iter_reference_plan(prioritized_loans, user_extra_cash, extra_cash_schedule, rank_by,
+                                build_event_queue(prioritized_loans, events))
+
+
+def summarize_payment_plan(prioritized_loans: List[Loan], user_extra_cash: float, engine: str = "python",
+                           extra_cash_schedule: Optional[Dict[int, float]] = None,
+                           rank_by: str = "balance", events: Optional[List[PlanEvent]] = None,
+                           max_months: int = 1000) -> Dict:
+    """
+    Run the same simulation as generate_payment_plan but keep only its aggregates.
+
+    No per-period rows or nested payment and balance dicts are built, which makes
+    this the cheap path for callers that only need the outcome of a plan.
+
+    Args:
+        Same as generate_payment_plan.
 
     Returns:
-        List[Dict]: Each entry includes payment details, balances, and fixed totals.
+        Dict: Keys are:
+            - "payoff_month": Number of periods in the plan
+            - "payoff_date": Date of the final period, or None if the plan stopped with balances left
+            - "paid_off": Whether every loan was paid off
+            - "total_paid": Sum of all payments
+            - "total_interest": Paid minus principal retired
+            - "loan_payoff_months": Loan name to the period number it was paid off in, or None
     """
+    if rank_by not in RANKINGS:
+        raise ValueError(f"Unknown ranking '{rank_by}', expected one of {RANKINGS}")
+    engine = _event_engine(prioritized_loans, engine, events)
+    if engine == "numpy":
+        from utils.vectorized_payment_plan import summarize_plan_vectorized
+        return summarize_plan_vectorized(prioritized_loans, user_extra_cash, extra_cash_schedule, rank_by, events)
+    if engine == "cents":
+        from utils.cents_payment_plan import summarize_plan_cents
+        return summarize_plan_cents(prioritized_loans, user_extra_cash, extra_cash_schedule, rank_by, events)
+    if engine == "events":
+        from utils.event_payment_plan import EventPlan
+        return EventPlan(prioritized_loans, user_extra_cash, max_months, extra_cash_schedule=extra_cash_schedule,
+                         rank_by=rank_by).summary()
+    if engine != "python":
+        raise ValueError(f"Unknown payoff engine '{engine}', expected one of {ENGINES}")
+    return _summarize_reference_plan(prioritized_loans, user_extra_cash, extra_cash_schedule, rank_by,
+                                     build_event_queue(prioritized_loans, events))
+
+
+def _event_engine(prioritized_loans: List[Loan], engine: str, events: Optional[List[PlanEvent]]) -> str:
+    # The events engine jumps between payoffs assuming fixed terms; plans whose terms change run month by month
+    if engine == "events" and build_event_queue(prioritized_loans, events):
+        return "numpy"
+    return engine
+
+
+def _clone_loans(prioritized_loans: List[Loan]) -> List[Loan]:
     # Clone loans and initialize state
-    loans = [Loan(**loan.__dict__) for loan in prioritized_loans]
+    loans = [loan.copy() for loan in prioritized_loans]
     for loan in loans:
         loan.adjusted_min_payment = loan.monthly_min_payment
         loan.total_paid = 0.0
         loan.last_payment_date = datetime.today().date()
+    return loans
+
+
+def _apply_events(events: EventQueue, iteration: int, loans: List[Loan], frozen: set) -> float:
+    """
+    Apply the events due this period to the cloned loans, returning the lump sums it adds.
+    """
+    lump_sum = 0.0
+    for kind, position, value in events.pop_due(iteration):
+        if kind == LUMP_SUM:
+            lump_sum += value
+        elif kind == FORBEARANCE_START:
+            frozen.add(loans[position])
+        elif kind == FORBEARANCE_END:
+            frozen.discard(loans[position])
+        elif kind == RATE:
+            loans[position].interest_rate = value
+        elif kind == RATE_STEP:
+            loans[position].interest_rate = max(0.0, loans[position].interest_rate + value)
+    return lump_sum
+
+
+def _pay_period(ranking: PriorityIndex, period_extra_cash: float, fixed_budget: float, payment_date,
+                period_payments: Dict[str, float], frozen: frozenset = frozenset()):
+    """
+    Apply one month of payments to the active loans, recording them in period_payments.
+
+    Loans in frozen are in forbearance: they neither accrue interest nor take payments,
+    so their minimums reach the other loans through the fixed budget.
+    """
+    freed = 0.0
+
+    # 1) Pay minimums and collect freed amounts
+    for loan in ranking.active:
+        if loan in frozen:
+            period_payments[loan.name] = 0.0
+            continue
+        # Accrue interest
+        interest = loan.current_balance * (loan.interest_rate / 100 / 12)
+        loan.current_balance += interest
+
+        # Determine payment (cap at balance)
+        min_pay = loan.adjusted_min_payment
+        payment_amt = min(min_pay, loan.current_balance)
+        principal = max(0.0, payment_amt - min(payment_amt, interest))
+
+        # Apply payment
+        loan.current_balance -= principal
+        loan.total_paid += payment_amt
+        loan.last_payment_date = payment_date
+        period_payments[loan.name] = round(payment_amt, 2)
+
+        # Freed from min_pay
+        freed += (min_pay - payment_amt)
+        if loan.current_balance <= 0:
+            loan.adjusted_min_payment = 0.0
+
+    # 2) Build extra pool and redistribute immediately
+    extra_pool = period_extra_cash + freed
+    for loan in ranking.active:
+        if loan.current_balance <= 0 or extra_pool <= 0 or loan in frozen:
+            continue
+        bonus = min(extra_pool, loan.current_balance)
+        loan.current_balance -= bonus
+        loan.total_paid += bonus
+        period_payments[loan.name] = period_payments.get(loan.name, 0.0) + round(bonus, 2)
+        extra_pool -= bonus
+
+    # 2a) Ensure total_payment equals fixed_budget
+    actual_total = sum(period_payments.values())
+    if actual_total < fixed_budget:
+        diff = fixed_budget - actual_total
+        for loan in ranking.active:
+            if loan.current_balance <= 0 or diff <= 0 or loan in frozen:
+                continue
+            bonus = min(diff, loan.current_balance)
+            loan.current_balance -= bonus
+            loan.total_paid += bonus
+            period_payments[loan.name] = period_payments.get(loan.name, 0.0) + round(bonus, 2)
+            diff -= bonus
+
+
+def _iter_reference_plan(prioritized_loans: List[Loan], user_extra_cash: float,
+                         extra_cash_schedule: Optional[Dict[int, float]], rank_by: str,
+                         events: EventQueue) -> Iterator[Dict]:
+    loans = _clone_loans(prioritized_loans)
+    frozen = set()
 
     # Compute fixed budgets
     minimum_total_payment = sum(loan.monthly_min_payment for loan in loans)
-    adjusted_total_payment = minimum_total_payment + user_extra_cash
-    fixed_budget = adjusted_total_payment
+    extra_cash_schedule = extra_cash_schedule or {}
 
-    payment_plan = []
-    payment_date = datetime.today().date()
+    calendar = ScheduleCalendar.starting()
     prev_total_balance = None
     max_iterations = 1000
     iteration = 0
+    ranking = PriorityIndex(loans, rank_by)
+    dates = calendar.extend(max_iterations).iso
 
     # Main loop
-    while any(loan.current_balance > 0 for loan in loans):
-        loans.sort(key=lambda l: l.current_balance)
+    while ranking.active:
         if iteration >= max_iterations:
             break
 
-        period_payments: Dict[str, float] = {}
-        freed = 0.0
-
-        # 1) Pay minimums and collect freed amounts
-        for loan in loans:
-            if loan.current_balance <= 0:
-                period_payments[loan.name] = 0.0
-                continue
+        # Budget for this period, from the schedule when it has an entry
+        period_extra_cash = extra_cash_schedule.get(iteration, user_extra_cash)
+        if events:
+            period_extra_cash += _apply_events(events, iteration, loans, frozen)
+        adjusted_total_payment = minimum_total_payment + period_extra_cash
+        fixed_budget = adjusted_total_payment
 
-            # Accrue interest
-            interest = loan.current_balance * (loan.interest_rate / 100 / 12)
-            loan.current_balance += interest
-
-            # Determine payment (cap at balance)
-            min_pay = loan.adjusted_min_payment
-            payment_amt = min(min_pay, loan.current_balance)
-            principal = max(0.0, payment_amt - min(payment_amt, interest))
-
-            # Apply payment
-            loan.current_balance -= principal
-            loan.total_paid += payment_amt
-            loan.last_payment_date = payment_date
-            period_payments[loan.name] = round(payment_amt, 2)
-
-            # Freed from min_pay
-            freed += (min_pay - payment_amt)
-            if loan.current_balance <= 0:
-                loan.adjusted_min_payment = 0.0
-
-        # 2) Build extra pool and redistribute immediately
-        extra_pool = user_extra_cash + freed
-        for loan in loans:
-            if loan.current_balance <= 0 or extra_pool <= 0:
-                continue
-            bonus = min(extra_pool, loan.current_balance)
-            loan.current_balance -= bonus
-            loan.total_paid += bonus
-            period_payments[loan.name] = period_payments.get(loan.name, 0.0) + round(bonus, 2)
-            extra_pool -= bonus
-
-        # Apply extra cash for each period
-        for idx, period in enumerate(payment_plan):
-            extra_cash = period.get("extra_cash", 0)  # Get extra cash for this period
-            extra_pool += extra_cash  # Add it to the extra pool
-
-            # Add extra cash to the total payment for the current period
-            period["total_payment"] += extra_cash
-
-            for loan in loans:
-                if loan.current_balance <= 0 or extra_pool <= 0:
-                    continue
-                bonus = min(extra_pool, loan.current_balance)
-                loan.current_balance -= bonus
-                loan.total_paid += bonus
-                period_payments[loan.name] = period_payments.get(loan.name, 0.0) + round(bonus, 2)
-                extra_pool -= bonus
-
-        # 2a) Ensure total_payment equals fixed_budget
-        actual_total = sum(period_payments.values())
-        if actual_total < fixed_budget:
-            diff = fixed_budget - actual_total
-            for loan in loans:
-                if loan.current_balance <= 0 or diff <= 0:
-                    continue
-                bonus = min(diff, loan.current_balance)
-                loan.current_balance -= bonus
-                loan.total_paid += bonus
-                period_payments[loan.name] = period_payments.get(loan.name, 0.0) + round(bonus, 2)
-                diff -= bonus
+        period_payments: Dict[str, float] = {loan.name: 0.0 for loan in ranking.settled}
+        _pay_period(ranking, period_extra_cash, fixed_budget, calendar.due_date(iteration), period_payments, frozen)
 
         # 3) Summarize
-        total_balance = sum(max(l.current_balance, 0) for l in loans)
-        balances = {l.name: round(l.current_balance, 2) for l in loans}
+        total_balance = sum(max(l.current_balance, 0) for l in ranking)
+        balances = {l.name: round(l.current_balance, 2) for l in ranking}
 
-        # Detect stagnation
-        if prev_total_balance is not None and abs(total_balance - prev_total_balance) < 0.01:
+        # Detect stagnation; balances in forbearance stand still on purpose
+        if prev_total_balance is not None and not frozen and abs(total_balance - prev_total_balance) < 0.01:
             break
         prev_total_balance = total_balance
 
-        # 4) Append period data
-        payment_plan.append({
-            "date": payment_date.strftime("%Y-%m-%d"),
+        # 4) Emit period data
+        yield {
+            "date": dates[iteration],
             "payments": period_payments,
             "balances": balances,
             "total_payment": round(fixed_budget, 2),
             "total_balance": round(total_balance, 2),
             "minimum_total_payment": round(minimum_total_payment, 2),
             "adjusted_total_payment": round(adjusted_total_payment, 2),
-        })
+        }
+
+        # Advance to next month, moving only the loans whose rank changed
+        ranking.update()
+        iteration += 1
+
+
+def _summarize_reference_plan(prioritized_loans: List[Loan], user_extra_cash: float,
+                              extra_cash_schedule: Optional[Dict[int, float]], rank_by: str,
+                              events: EventQueue) -> Dict:
+    loans = _clone_loans(prioritized_loans)
+    frozen = set()
+    minimum_total_payment = sum(loan.monthly_min_payment for loan in loans)
+    extra_cash_schedule = extra_cash_schedule or {}
+    starting_balance = sum(max(loan.current_balance, 0) for loan in loans)
+
+    calendar = ScheduleCalendar.starting()
+    prev_total_balance = None
+    max_iterations = 1000
+    iteration = 0
+    ranking = PriorityIndex(loans, rank_by)
+    loan_payoff_months = {loan.name: None for loan in loans}
+    total_paid = 0.0
+    # One scratch dict reused every month; no per-period rows are built
+    period_payments: Dict[str, float] = {}
+
+    while ranking.active:
+        if iteration >= max_iterations:
+            break
+
+        period_extra_cash = extra_cash_schedule.get(iteration, user_extra_cash)
+        if events:
+            period_extra_cash += _apply_events(events, iteration, loans, frozen)
+        fixed_budget = minimum_total_payment + period_extra_cash
+        period_payments.clear()
+        _pay_period(ranking, period_extra_cash, fixed_budget, calendar.due_date(iteration), period_payments, frozen)
+
+        total_balance = sum(max(l.current_balance, 0) for l in ranking)
+        if prev_total_balance is not None and not frozen and abs(total_balance - prev_total_balance) < 0.01:
+            break
+        prev_total_balance = total_balance
+        total_paid += sum(period_payments.values())
 
-        # Advance to next month
-        payment_date += timedelta(days=30)
+        settled = len(ranking.settled)
+        ranking.update()
+        for loan in ranking.settled[settled:]:
+            loan_payoff_months[loan.name] = iteration + 1
         iteration += 1
 
-    return payment_plan
+    retired = starting_balance - (prev_total_balance if prev_total_balance is not None else starting_balance)
+    return {
+        "payoff_month": iteration,
+        "payoff_date": calendar.iso[iteration - 1] if iteration and not ranking.active else None,
+        "paid_off": not ranking.active,
+        "total_paid": round(total_paid, 2),
+        "total_interest": round(total_paid - retired, 2),
+        "loan_payoff_months": loan_payoff_months,
+    }
@@ -0,0 +1,361 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import math
+import os
+import numpy as np
+from models.loan import Loan
+from utils.generate_payment_plan import _apply_events, _pay_period
+from utils.parallel import process_map
+from utils.plan_events import FORBEARANCE_END, RATE, RATE_STEP, build_event_queue
+from utils.priority_index import PriorityIndex
+from utils.vectorized_payment_plan import LoanArrays
+
+OBJECTIVES = ("interest", "payoff")
+MAX_ITERATIONS = 1000
+
+
+def optimize_custom_order(loans: List[Loan], extra_cash: float = 0.0, objective: str = "interest",
+                          first: Sequence[int] = (), before: Iterable[Tuple[int, int]] = (),
+                          tolerance: float = 1.0, processes: Optional[int] = None) -> Dict:
+    """
+    Find the CustomStrategy loan ordering with the least total interest or the earliest payoff.
+
+    The search is branch and bound over ordering prefixes. Loans in a prefix receive
+    the extra cash in turn, and until they are all paid off the plan cannot depend on
+    how the remaining loans are ordered, so every child prefix resumes the simulation
+    from its parent's state instead of starting over. Loans paid off by their minimums
+    before the extra cash reaches them never need ordering. A branch is pruned when lower
+    bounds on its payoff month and interest (see _OrderSearch._bound) are already worse
+    than the best complete ordering found, which starts from the Avalanche and Snowball
+    orderings. The loans' forbearance windows and interest rate changes are applied as
+    in CustomStrategy's plans (see utils.plan_events); the bounds are only used while
+    no loan is in forbearance and no pending event can lower a rate. The subtrees under
+    the first free position are searched in parallel on a process pool
+    (utils.parallel.process_map), or in this process with a shared bound when only one
+    worker is available.
+
+    Args:
+        loans (List[Loan]): Loans to order.
+        extra_cash (float): Additional monthly cash available for loan payments.
+        objective (str): "interest" to minimise total interest, "payoff" to minimise the
+            number of months; the other measure breaks ties.
+        first (Sequence[int]): Loan ids that must lead the ordering, in this order.
+        before (Iterable[Tuple[int, int]]): (a, b) pairs of loan ids where extra cash must
+            reach loan a before loan b.
+        tolerance (float): Dollars of total interest within which orderings are not told
+            apart. Payments are recorded in rounded cents, which moves totals by amounts no
+            bound can predict, so tolerance=0 proves the exact optimum but may take far longer.
+        processes (int, optional): Worker processes; defaults to os.cpu_count().
+
+    Returns:
+        Dict: Keys are:
+            - "order": Loan ids in the best ordering, ready for CustomStrategy(loan_priority=...)
+            - "summary": The ordering's plan summary, see utils.summarize_payment_plan
+            - "orderings_evaluated": Complete plans simulated during the search
+            - "branches_pruned": Subtrees discarded by the bounds
+    """
+    from strategies.custom_strategy import CustomStrategy
+
+    search = _OrderSearch(loans, extra_cash, objective, first, before, tolerance)
+    search.seed()
+    children = search.expand(search.root, collect=True)
+    workers = min(processes or os.cpu_count() or 1, len(children))
+    if workers > 1:
+        tasks = [(loans, extra_cash, objective, first, before, tolerance, prefix, snapshot, search.best)
+                 for prefix, snapshot in children]
+        for best, leaves, pruned in process_map(_search_subtree, tasks, workers):
+            search.offer(*best)
+            search.leaves += leaves
+            search.pruned += pruned
+    else:
+        for prefix, snapshot in children:
+            search.expand((prefix, snapshot))
+
+    order = [search.ids[index] for index in search.best[1]]
+    strategy = CustomStrategy(loan_priority=order, engine="numpy")
+    return {
+        "order": order,
+        "summary": strategy.summarize_plan(loans, extra_cash),
+        "orderings_evaluated": search.leaves,
+        "branches_pruned": search.pruned,
+    }
+
+
+def save_custom_order(db, strategy_id: int, order: Sequence[int]):
+    """
+    Store an ordering as loan_priority rows, priority 1 first, in one transaction.
+
+    Args:
+        db (Database): Connected application database.
+        strategy_id (int): payoff_strategies id the ordering belongs to.
+        order (Sequence[int]): Loan ids in payoff order.
+    """
+    with db.transaction():
+        for priority, loan_id in enumerate(order, start=1):
+            db.add_loan_priority(strategy_id, loan_id, priority)
+
+
+def _search_subtree(task):
+    # Module level so worker processes can unpickle it
+    loans, extra_cash, objective, first, before, tolerance, prefix, snapshot, best = task
+    search = _OrderSearch(loans, extra_cash, objective, first, before, tolerance)
+    search.best = best
+    search.expand((prefix, snapshot))
+    return search.best, search.leaves, search.pruned
+
+
+class _OrderSearch:
+    """
+    Branch and bound state. Loans are referred to by their index in ``loans``; a
+    snapshot is (iteration, balances, prev_total_balance, total_paid, interest_rates,
+    frozen, events) at the start of a month, where frozen holds the indices of loans in
+    forbearance and events is the EventQueue still to apply (None when the loans have none).
+    """
+
+    def __init__(self, loans: List[Loan], extra_cash: float, objective: str,
+                 first: Sequence[int], before: Iterable[Tuple[int, int]], tolerance: float = 0.0):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective '{objective}', expected one of {OBJECTIVES}")
+        self.loans = list(loans)
+        self.state = LoanArrays(loans)
+        self.ids = [loan.id for loan in loans]
+        self.extra_cash = extra_cash
+        self.objective = objective
+        self.tolerance = tolerance
+        self.budget = self.state.minimum_total_payment + extra_cash
+        self.starting_balance = sum(max(loan.current_balance, 0) for loan in loans)
+
+        index_of = {loan_id: index for index, loan_id in enumerate(self.ids)}
+        unknown = [loan_id for loan_id in list(first) + [i for pair in before for i in pair] if loan_id not in index_of]
+        if unknown:
+            raise ValueError(f"Unknown loan ids in ordering constraints: {sorted(set(unknown))}")
+        self.required = {index: set() for index in range(len(self.ids))}
+        for a, b in before:
+            self.required[index_of[b]].add(index_of[a])
+        fixed = [index_of[loan_id] for loan_id in first]
+        for position, index in enumerate(fixed):
+            if not self.required[index] <= set(fixed[:position]):
+                raise ValueError(f"Loan {self.ids[index]} is required first but must come after another loan")
+        self._topological([])  # Raises on cyclic constraints
+
+        events = build_event_queue(self.loans)
+        self.root = (fixed, (0, tuple(loan.current_balance for loan in loans), None, 0.0,
+                             tuple(loan.interest_rate for loan in loans), frozenset(), events if events else None))
+        self.best = ((2,), None)
+        self.leaves = 0
+        self.pruned = 0
+
+    def seed(self):
+        """Start the bound from the Avalanche and Snowball orderings that satisfy the constraints."""
+        prefix, snapshot = self.root
+        rates, balances = self.state.monthly_rates, self.state.balances
+        for rank in (lambda i: (-rates[i], balances[i]), lambda i: (balances[i], -rates[i])):
+            self.finish(prefix + self._topological(prefix, rank), snapshot)
+
+    def expand(self, node, collect: bool = False) -> List:
+        """
+        Search every ordering that starts with the node's prefix.
+
+        With collect=True the node's children are returned unexplored instead.
+        """
+        prefix, snapshot = node
+        branch = self._branch_point(prefix, snapshot)
+        if branch is None:
+            return []
+        active = [index for index in range(len(self.ids)) if index not in prefix and branch[1][index] > 0]
+        if len(active) <= 1:
+            self.finish(prefix + self._topological(prefix), branch)
+            return []
+        if self._bounded_out(branch):
+            self.pruned += 1
+            return []
+
+        rates, balances = self._monthly_rates(branch), branch[1]
+        candidates = [index for index in active if not self.required[index] & set(active)]
+        candidates.sort(key=lambda i: (-rates[i], balances[i]))
+        children = [(prefix + [index], branch) for index in candidates]
+        if collect:
+            return children
+        for child in children:
+            self.expand(child)
+        return []
+
+    def finish(self, order: List[int], snapshot):
+        """Simulate a complete ordering to the end and keep it if it beats the best."""
+        for snapshot in self._months(order, snapshot):
+            pass
+        iteration, balances, prev_total, total_paid = snapshot[:4]
+        self.leaves += 1
+
+        paid_off = not any(balance > 0 for balance in balances)
+        retired = self.starting_balance - (prev_total if prev_total is not None else self.starting_balance)
+        interest = round(total_paid - retired, 2)
+        primary = (interest, iteration) if self.objective == "interest" else (iteration, interest)
+        self.offer((int(not paid_off),) + primary, order)
+
+    def offer(self, key: Tuple, order: List[int]):
+        if key < self.best[0]:
+            self.best = (key, order)
+
+    def _months(self, order: List[int], snapshot) -> Iterator[Tuple]:
+        # The reference engine's monthly loop (see _summarize_reference_plan) resumed from a
+        # snapshot; for the handful of loans an ordering covers it beats the array engine
+        iteration, balances, prev_total, total_paid, rates, frozen, events = snapshot
+        has_events = events is not None
+        events = events.copy() if has_events else None
+        loans = []
+        for loan, balance, rate in zip(self.loans, balances, rates):
+            loan = loan.copy()
+            loan.current_balance = balance
+            loan.interest_rate = rate
+            loan.adjusted_min_payment = loan.monthly_min_payment
+            loans.append(loan)
+        index_of = {id(loan): index for index, loan in enumerate(loans)}
+        frozen = {loans[index] for index in frozen}
+        ranking = PriorityIndex([loans[index] for index in order], "priority")
+        period_payments: Dict[str, float] = {}
+
+        while ranking.active and iteration < MAX_ITERATIONS:
+            extra_cash = self.extra_cash
+            if events:
+                extra_cash += _apply_events(events, iteration, loans, frozen)
+            period_payments.clear()
+            _pay_period(ranking, extra_cash, self.budget - self.extra_cash + extra_cash, None, period_payments, frozen)
+            total_balance = sum(max(loan.current_balance, 0) for loan in ranking)
+            if prev_total is not None and not frozen and abs(total_balance - prev_total) < 0.01:
+                return
+            prev_total = total_balance
+            total_paid += sum(period_payments.values())
+            ranking.update()
+            iteration += 1
+            if has_events:
+                rates = tuple(loan.interest_rate for loan in loans)
+            yield (iteration, tuple(loan.current_balance for loan in loans), prev_total, total_paid, rates,
+                   frozenset(index_of[id(loan)] for loan in frozen), events.copy() if has_events else None)
+
+    def _branch_point(self, prefix: List[int], snapshot):
+        # State at the start of the month in which the prefix's last loan is paid off, or one
+        # of its loans enters forbearance and passes the extra cash on, after which the order
+        # of the remaining loans starts to matter. None if the plan ends first.
+        if not any(snapshot[1][index] > 0 for index in prefix):
+            return snapshot
+        order = prefix + [index for index in range(len(self.ids)) if index not in prefix]
+        last = snapshot
+        for month in self._months(order, snapshot):
+            if not any(month[1][index] > 0 for index in prefix) or not month[5].isdisjoint(prefix):
+                return last
+            last = month
+        # The plan ended while the prefix was still being paid; the rest of the order is irrelevant
+        self.finish(order, snapshot)
+        return None
+
+    def _bounded_out(self, snapshot) -> bool:
+        key = self.best[0]
+        if key[0] != 0 or self.budget <= 0 or not self._costs_only_rise(snapshot):
+            return False
+        months, interest = self._bound(snapshot)
+        if self.objective == "interest":
+            return interest > key[1] - self.tolerance
+        return months > key[1] or (months == key[1] and interest > key[2] - self.tolerance)
+
+    @staticmethod
+    def _monthly_rates(snapshot) -> np.ndarray:
+        return np.array(snapshot[4], dtype=float) / 100 / 12
+
+    @staticmethod
+    def _costs_only_rise(snapshot) -> bool:
+        # The bounds price every month at the snapshot's rates, so they hold only while no
+        # loan is in forbearance and no pending event can lower a rate (or add cash)
+        rates, frozen, events = snapshot[4:]
+        if frozen:
+            return False
+        for kind, position, value in (events.pending() if events else ()):
+            if not (kind == RATE_STEP and value >= 0 or kind == RATE and value >= rates[position]
+                    or kind == FORBEARANCE_END):
+                return False
+        return True
+
+    def _bound(self, snapshot) -> Tuple[int, float]:
+        """
+        Lower bounds on the payoff month and total interest of any plan resumed from snapshot.
+
+        A month adds interest r * b to a loan and charges min(minimum payment, r * b) again
+        through the payment's interest portion. Two relaxations of that are simulated and
+        the tighter result of each is used; both pay every minimum and let the remaining
+        budget retire the costliest balances first.
+        """
+        owed = np.maximum(np.array(snapshot[1]), 0.0)
+        trajectory = self._trajectory_bound(snapshot, owed)
+        allocation = self._allocation_bound(snapshot, owed)
+        return max(trajectory[0], allocation[0]), max(trajectory[1], allocation[1])
+
+    def _trajectory_bound(self, snapshot, owed: np.ndarray) -> Tuple[int, float]:
+        # Balances compound at a fixed cost per dollar: twice the rate for loans whose minimum
+        # covers double interest on today's balance (they never grow past it), else the rate.
+        # With linear costs, costliest-first spending is the cheapest schedule there is.
+        iteration, _, _, total_paid = snapshot[:4]
+        rates, minimums = self._monthly_rates(snapshot), self.state.min_payments
+        costs = np.where(minimums >= 2 * rates * owed, 2 * rates, rates).tolist()
+        minimums, balances = minimums.tolist(), owed.tolist()
+        ranked = sorted(np.flatnonzero(owed > 0).tolist(), key=lambda i: -costs[i])
+        rounding = 0.005 * len(ranked)
+
+        months, charges = 0, 0.0
+        while ranked and iteration + months < MAX_ITERATIONS:
+            spare = self.budget + rounding
+            for index in ranked:
+                charge = costs[index] * balances[index]
+                charges += charge
+                paid = min(minimums[index], balances[index] + charge)
+                balances[index] += charge - paid
+                spare -= paid
+            for index in ranked:
+                if spare <= 0:
+                    break
+                paid = min(spare, balances[index])
+                balances[index] -= paid
+                spare -= paid
+            ranked = [index for index in ranked if balances[index] > 1e-9]
+            months += 1
+        interest = total_paid + owed.sum() + charges - self.starting_balance - rounding * months - 0.005
+        return iteration + months, interest
+
+    def _allocation_bound(self, snapshot, owed: np.ndarray) -> Tuple[int, float]:
+        # Month by month, the least a loan can still owe after k budgets: nothing compounds
+        # and each month's cheapest split of k budgets is allowed, whatever came before.
+        # Per dollar of today's balance a month then costs at least rate * (1 + cover).
+        iteration, _, _, total_paid = snapshot[:4]
+        rates, minimums = self._monthly_rates(snapshot), self.state.min_payments
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            cover = np.where(rates * owed > 0, np.minimum(1.0, minimums / (rates * owed)), 0.0)
+        cost = rates * (1.0 + cover)
+
+        months_ahead = np.arange(math.ceil(owed.sum() / self.budget) + 1)[:, None]
+        forced = np.minimum(months_ahead * minimums, owed)
+        spare = months_ahead[:, 0] * self.budget - forced.sum(axis=1)
+        by_cost = np.argsort(-cost, kind="stable")
+        rest = (owed - forced)[:, by_cost]
+        left = np.clip(np.cumsum(rest, axis=1) - spare[:, None], 0.0, rest)
+        charges = (left * cost[by_cost]).sum(axis=1)
+
+        rounding = 0.005 * np.count_nonzero(owed)
+        retired = months_ahead[:, 0] * (self.budget + rounding) - np.concatenate(([0.0], np.cumsum(charges)[:-1]))
+        reachable = np.flatnonzero(retired >= owed.sum())
+        months = iteration + (reachable[0] if len(reachable) else len(retired))
+        interest = (total_paid + owed.sum() + charges.sum() - self.starting_balance
+                    - rounding * (months - iteration) - 0.005)
+        return months, interest
+
+    def _topological(self, prefix: List[int], rank=None) -> List[int]:
+        # Loans not in prefix, in rank order subject to the before constraints
+        placed, order = set(prefix), []
+        pending = [index for index in range(len(self.ids)) if index not in placed]
+        if rank is not None:
+            pending.sort(key=rank)
+        while pending:
+            ready = next((index for index in pending if self.required[index] <= placed), None)
+            if ready is None:
+                raise ValueError("Ordering constraints are cyclic")
+            pending.remove(ready)
+            placed.add(ready)
+            order.append(ready)
+        return order
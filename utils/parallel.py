@@ -0,0 +1,35 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Sequence
+import multiprocessing
+import os
+
+
+def process_map(func: Callable, tasks: Sequence, processes: Optional[int] = None) -> List:
+    """
+    Apply func to every task on a process pool, in task order.
+
+    The pool is sized to the machine's cores. With a single task, processes=1, or a
+    platform where worker processes cannot be started, the tasks run one after
+    another in this process instead, with identical results.
+
+    Workers are started with the "spawn" method. Callers such as the GUI run this from
+    a worker thread of a process holding Tk and SQLite state, and forking such a
+    multithreaded process can deadlock the child.
+
+    Args:
+        func (Callable): Module-level function, so worker processes can unpickle it.
+        tasks (Sequence): One picklable argument per call.
+        processes (int, optional): Worker processes; defaults to os.cpu_count().
+
+    Returns:
+        List: func(task) for each task.
+    """
+    workers = min(processes or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                return list(pool.map(func, tasks))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            pass
+    return [func(task) for task in tasks]
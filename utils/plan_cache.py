@@ -0,0 +1,128 @@
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import hashlib
+from models.loan import Loan
+from utils.plan_frame import PlanFrame
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+# Loan fields the payoff engines read; anything else cannot change a plan
+PLAN_FIELDS = ("id", "name", "current_balance", "interest_rate", "monthly_min_payment", "first_due_date",
+               "interest_change_rate", "forbearance_start_date", "forbearance_end_date")
+
+
+def portfolio_fingerprint(prioritized_loans: Iterable[Loan]) -> str:
+    """
+    Stable hash of the plan-relevant fields of the loans, in priority order.
+
+    Floats are hashed through repr, which round-trips exactly, so two portfolios
+    share a fingerprint only if every engine input is identical.
+    """
+    fields = [tuple(getattr(loan, field) for field in PLAN_FIELDS) for loan in prioritized_loans]
+    return hashlib.blake2b(repr(fields).encode(), digest_size=16).hexdigest()
+
+
+def plan_key(strategy, prioritized_loans: List[Loan], extra_cash: float,
+             extra_cash_schedule: Optional[Dict[int, float]] = None, events: Optional[List] = None,
+             max_months: int = 1000) -> tuple:
+    """
+    Cache key for one strategy run: strategy, engine and ranking, the prioritized
+    portfolio (which captures custom orderings), extra cash, per-period overrides,
+    extra plan events, the events engine's horizon and the start date, which places
+    the loans' dated events.
+    """
+    return (type(strategy).__name__, strategy.engine, strategy.rank_by, portfolio_fingerprint(prioritized_loans),
+            float(extra_cash), tuple(sorted((extra_cash_schedule or {}).items())), tuple(events or ()),
+            int(max_months), datetime.today().date())
+
+
+class PlanCache:
+    """
+    Bounded LRU cache of generated payment plans.
+
+    Entries remember which loan ids they were built from so a Database write to a
+    loan drops exactly the plans that used it (see watch). Plans are stored as
+    PlanFrames and handed out as copies, so callers may modify what they get.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        """
+        Args:
+            maxsize (int): Number of plans kept before the least recently used is evicted.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, PlanFrame]" = OrderedDict()
+        self._loan_ids: Dict[tuple, frozenset] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key) -> Optional[PlanFrame]:
+        """Return a copy of the cached plan for key, or None, counting the hit or miss."""
+        frame = self._entries.get(key)
+        if frame is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return frame.copy()
+
+    def put(self, key, frame: PlanFrame, loan_ids: Iterable[int]):
+        """Store a plan, evicting the least recently used entries beyond maxsize."""
+        self._entries[key] = frame.copy()
+        self._entries.move_to_end(key)
+        self._loan_ids[key] = frozenset(loan_ids)
+        while len(self._entries) > self.maxsize:
+            evicted, _ = self._entries.popitem(last=False)
+            del self._loan_ids[evicted]
+
+    def get_or_generate(self, key, loan_ids: Iterable[int], generate: Callable[[], PlanFrame]) -> PlanFrame:
+        """Return the cached plan for key, generating and storing it on a miss."""
+        frame = self.get(key)
+        if frame is None:
+            frame = generate()
+            self.put(key, frame, loan_ids)
+        return frame
+
+    def record(self, key, loan_ids: Iterable[int], periods: Iterator[Dict], names: List[str]) -> Iterator[Dict]:
+        """
+        Pass streamed periods through, storing the plan once the stream is exhausted.
+
+        A stream that is abandoned part way is not cached. The cache keeps its own
+        copy of each period, so callers may change the periods they are given.
+        """
+        rows = []
+        for period in periods:
+            rows.append(dict(period, payments=dict(period["payments"]), balances=dict(period["balances"])))
+            yield period
+        self.put(key, PlanFrame.from_rows(rows, names), loan_ids)
+
+    def invalidate(self, loan_id: Optional[int] = None):
+        """Drop plans built from loan_id, or every plan when loan_id is None."""
+        if loan_id is None:
+            self.clear()
+            return
+        for key in [key for key, ids in self._loan_ids.items() if loan_id in ids]:
+            del self._entries[key]
+            del self._loan_ids[key]
+
+    def clear(self):
+        self._entries.clear()
+        self._loan_ids.clear()
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def watch(self, db):
+        """Invalidate plans whenever db writes to the loans table."""
+        db.add_write_listener(self.on_database_write)
+
+    def on_database_write(self, table: str, row_id: Optional[int]):
+        if table == "loans":
+            self.invalidate(row_id)
@@ -0,0 +1,189 @@
+from collections import namedtuple
+from datetime import date, datetime
+from typing import Iterator, List, Optional, Tuple
+import heapq
+import itertools
+import numpy as np
+from models.loan import Loan
+from models.portfolio import NO_DATE, Portfolio
+from utils.schedule_calendar import period_of
+
+# Event kinds; loan events name the loan by id, lump sums apply to the whole plan
+FORBEARANCE_START = "forbearance_start"  # Loan stops accruing interest and taking payments
+FORBEARANCE_END = "forbearance_end"      # Loan accrues and takes payments again
+RATE = "rate"                            # Loan's annual rate becomes value (e.g. a promotional APR expiring)
+RATE_STEP = "rate_step"                  # Loan's annual rate moves by value points, floored at 0
+LUMP_SUM = "lump_sum"                    # value is added to the month's extra cash
+EVENT_KINDS = (FORBEARANCE_START, FORBEARANCE_END, RATE, RATE_STEP, LUMP_SUM)
+
+RATE_STEP_MONTHS = 12  # interest_change_rate is an annual change
+
+PlanEvent = namedtuple("PlanEvent", ["month", "kind", "loan_id", "value"], defaults=(None, 0.0))
+PlanEvent.__doc__ = """
+Something that happens to a payoff plan at the start of a period.
+
+month is the period index the event takes effect in (see month_of), kind one of
+EVENT_KINDS, loan_id the loan it applies to (None for LUMP_SUM), and value the
+new rate, rate change or lump sum amount.
+"""
+
+
+def month_of(event_date: date, start_date: Optional[date] = None) -> int:
+    """
+    First period whose payment date falls on or after event_date.
+
+    Args:
+        event_date (date): Date the event takes effect.
+        start_date (date, optional): Date of period 0; defaults to today, like the payoff engines.
+
+    Returns:
+        int: Period index, 0 for dates on or before start_date.
+    """
+    return period_of(start_date or datetime.today().date(), event_date)
+
+
+class EventQueue:
+    """
+    Plan events ordered by month, popped as the simulation reaches them.
+
+    Entries live in a heap keyed on (month, insertion order), so events of the
+    same month apply in the order they were pushed and each month costs only the
+    events due in it, never a scan of the loans. Loans are referred to by their
+    position in the prioritized list. Recurring entries push their next occurrence
+    when popped, so a yearly rate change is one entry however long the plan runs.
+    """
+
+    def __init__(self):
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, month: int, kind: str, position: Optional[int] = None, value: float = 0.0,
+             every: Optional[int] = None):
+        """
+        Schedule an event at the start of the given month, repeating every ``every`` months if set.
+        """
+        heapq.heappush(self._heap, (month, next(self._counter), kind, position, value, every))
+
+    def pop_due(self, month: int) -> Iterator[Tuple[str, Optional[int], float]]:
+        """
+        Yield (kind, position, value) for every event due by the given month, in order.
+        """
+        heap = self._heap
+        while heap and heap[0][0] <= month:
+            due, _, kind, position, value, every = heapq.heappop(heap)
+            if every:
+                self.push(due + every, kind, position, value, every)
+            yield kind, position, value
+
+    def copy(self) -> "EventQueue":
+        queue = EventQueue()
+        queue._heap = list(self._heap)
+        queue._counter = itertools.count(next(self._counter))
+        return queue
+
+    def pending(self) -> Iterator[Tuple[str, Optional[int], float]]:
+        """(kind, position, value) of every queued event, in no particular order."""
+        for _, _, kind, position, value, _ in self._heap:
+            yield kind, position, value
+
+    def __getstate__(self):
+        # Queues travel with search snapshots to worker processes; counters do not pickle everywhere
+        return self._heap, next(self._counter)
+
+    def __setstate__(self, state):
+        heap, counter = state
+        self._heap = list(heap)
+        self._counter = itertools.count(counter)
+
+
+def _next_anniversary(first_due: date, start_date: date) -> date:
+    years = max(1, start_date.year - first_due.year)
+    while True:
+        try:
+            anniversary = first_due.replace(year=first_due.year + years)
+        except ValueError:  # February 29th in a common year
+            anniversary = date(first_due.year + years, 2, 28)
+        if anniversary >= start_date:
+            return anniversary
+        years += 1
+
+
+def _loan_fields(prioritized_loans) -> Iterator[tuple]:
+    # (position, forbearance start, forbearance end, interest change rate, first due date) of loans with events
+    if isinstance(prioritized_loans, Portfolio):
+        has_forbearance = ((prioritized_loans.forbearance_start_dates != NO_DATE)
+                           & (prioritized_loans.forbearance_end_dates != NO_DATE))
+        # A NULL interest_change_rate loads as NaN and means no change
+        change_rates = np.nan_to_num(prioritized_loans.interest_change_rates)
+        has_change = change_rates != 0
+        for position in (has_forbearance | has_change).nonzero()[0].tolist():
+            start, end, first_due = (int(ordinals[position]) for ordinals in (
+                prioritized_loans.forbearance_start_dates, prioritized_loans.forbearance_end_dates,
+                prioritized_loans.first_due_dates))
+            yield (position,
+                   date.fromordinal(start) if has_forbearance[position] else None,
+                   date.fromordinal(end) if has_forbearance[position] else None,
+                   float(change_rates[position]),
+                   date.fromordinal(first_due) if first_due != NO_DATE else None)
+        return
+    for position, loan in enumerate(prioritized_loans):
+        if loan.interest_change_rate or (loan.forbearance_start_date and loan.forbearance_end_date):
+            yield (position, loan.forbearance_start_date, loan.forbearance_end_date,
+                   loan.interest_change_rate or 0.0, loan.first_due_date)
+
+
+def build_event_queue(prioritized_loans: List[Loan], events: Optional[List[PlanEvent]] = None,
+                      start_date: Optional[date] = None) -> EventQueue:
+    """
+    Queue the events a payoff plan applies: the loans' own and any extra ones.
+
+    Each loan with both forbearance dates is frozen for the periods whose payment
+    date falls inside [forbearance_start_date, forbearance_end_date]. A loan with a
+    non-zero interest_change_rate has its rate moved by that many points on each
+    anniversary of its first_due_date, that is every 12 periods. The date fields are
+    read once here; the simulation only pops the queue.
+
+    Args:
+        prioritized_loans (List[Loan] | Portfolio): Loans in priority order.
+        events (List[PlanEvent], optional): Extra events, such as promotional-rate
+            expiries or one-time lump sums.
+        start_date (date, optional): Date of period 0; defaults to today.
+
+    Returns:
+        EventQueue: Events keyed on the loans' positions in prioritized_loans.
+
+    Raises:
+        ValueError: If an event has an unknown kind, a negative month, or a loan_id not in the plan.
+    """
+    start_date = start_date or datetime.today().date()
+    queue = EventQueue()
+    for position, forbearance_start, forbearance_end, change_rate, first_due in _loan_fields(prioritized_loans):
+        if forbearance_start and forbearance_end:
+            queue.push(month_of(forbearance_start, start_date), FORBEARANCE_START, position)
+            # Payments resume in the first period after the last day of forbearance
+            queue.push(month_of(date.fromordinal(forbearance_end.toordinal() + 1), start_date),
+                       FORBEARANCE_END, position)
+        if change_rate:
+            first_step = (month_of(_next_anniversary(first_due, start_date), start_date) if first_due
+                          else RATE_STEP_MONTHS)
+            queue.push(first_step, RATE_STEP, position, change_rate, every=RATE_STEP_MONTHS)
+
+    if events:
+        ids = prioritized_loans.ids.tolist() if isinstance(prioritized_loans, Portfolio) else [
+            loan.id for loan in prioritized_loans]
+        positions = {loan_id: position for position, loan_id in enumerate(ids)}
+        for event in events:
+            if event.kind not in EVENT_KINDS:
+                raise ValueError(f"Unknown plan event '{event.kind}', expected one of {EVENT_KINDS}")
+            if event.month < 0:
+                raise ValueError(f"Plan event month must not be negative, got {event.month}")
+            if event.kind == LUMP_SUM:
+                queue.push(event.month, LUMP_SUM, None, event.value)
+            elif event.loan_id in positions:
+                queue.push(event.month, event.kind, positions[event.loan_id], event.value)
+            else:
+                raise ValueError(f"Plan event {event.kind} refers to loan {event.loan_id}, which is not in the plan")
+    return queue
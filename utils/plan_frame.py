@@ -0,0 +1,118 @@
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Optional
+import numpy as np
+
+
+class PlanFrame(Sequence):
+    """
+    Columnar payoff plan: one contiguous array per field with one row per period.
+
+    payments and balances are (periods x loans) arrays whose columns follow ``names``,
+    dates is a datetime64[D] array and the totals are float arrays. Indexing, iteration
+    and equality go through row dicts in the shape generate_payment_plan has always
+    returned, so code written against list-of-dicts plans keeps working. Row dicts
+    are built on demand; assign a whole row (``frame[i] = row``) to change a period.
+    """
+
+    TOTALS = ("total_payment", "total_balance", "minimum_total_payment", "adjusted_total_payment")
+
+    def __init__(self, names: List[str], dates, payments, balances, total_payment, total_balance,
+                 minimum_total_payment, adjusted_total_payment):
+        """
+        Args:
+            names (List[str]): Loan names, one per payments/balances column.
+            dates (array-like): Period dates as datetime64[D] or "YYYY-MM-DD" strings.
+            payments (array-like): Payment per period and loan.
+            balances (array-like): Balance after each period per loan.
+            total_payment, total_balance, minimum_total_payment, adjusted_total_payment
+                (array-like): One value per period.
+        """
+        self.names = list(names)
+        self._columns = {name: idx for idx, name in enumerate(self.names)}
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        shape = (len(self.dates), len(self.names))
+        self.payments = np.asarray(payments, dtype=float).reshape(shape)
+        self.balances = np.asarray(balances, dtype=float).reshape(shape)
+        self.total_payment = np.asarray(total_payment, dtype=float)
+        self.total_balance = np.asarray(total_balance, dtype=float)
+        self.minimum_total_payment = np.asarray(minimum_total_payment, dtype=float)
+        self.adjusted_total_payment = np.asarray(adjusted_total_payment, dtype=float)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict], names: Optional[List[str]] = None) -> "PlanFrame":
+        """
+        Build a frame from period dicts, consuming them one at a time.
+
+        Args:
+            rows (Iterable[Dict]): Periods in the generate_payment_plan row shape.
+            names (List[str], optional): Column order; defaults to the first row's balances.
+
+        Returns:
+            PlanFrame: The same periods in columnar form.
+        """
+        dates, payments, balances = [], [], []
+        totals = {field: [] for field in cls.TOTALS}
+        for row in rows:
+            if names is None:
+                names = list(row["balances"])
+            dates.append(row["date"])
+            payments.append([row["payments"].get(name, 0.0) for name in names])
+            balances.append([row["balances"].get(name, 0.0) for name in names])
+            for field in cls.TOTALS:
+                totals[field].append(row[field])
+        return cls(names or [], dates, payments, balances, **totals)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PlanFrame(self.names, self.dates[index], self.payments[index], self.balances[index],
+                             *(getattr(self, field)[index] for field in self.TOTALS))
+        return self._row(index, str(self.dates[index]))
+
+    def __setitem__(self, index: int, row: Dict):
+        self.dates[index] = np.datetime64(row["date"], "D")
+        self.payments[index] = [row["payments"].get(name, 0.0) for name in self.names]
+        self.balances[index] = [row["balances"].get(name, 0.0) for name in self.names]
+        for field in self.TOTALS:
+            getattr(self, field)[index] = row[field]
+
+    def __iter__(self) -> Iterator[Dict]:
+        for index, date in enumerate(self.dates.astype(str).tolist()):
+            yield self._row(index, date)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(row == expected for row, expected in zip(self, other))
+
+    def __repr__(self):
+        return f"PlanFrame({len(self)} periods x {len(self.names)} loans)"
+
+    def _row(self, index: int, date: str) -> Dict:
+        return {
+            "date": date,
+            "payments": dict(zip(self.names, self.payments[index].tolist())),
+            "balances": dict(zip(self.names, self.balances[index].tolist())),
+            "total_payment": float(self.total_payment[index]),
+            "total_balance": float(self.total_balance[index]),
+            "minimum_total_payment": float(self.minimum_total_payment[index]),
+            "adjusted_total_payment": float(self.adjusted_total_payment[index]),
+        }
+
+    def payments_for(self, name: str) -> np.ndarray:
+        """Payments made on one loan, one entry per period."""
+        return self.payments[:, self._columns[name]]
+
+    def balances_for(self, name: str) -> np.ndarray:
+        """Balance of one loan after each period."""
+        return self.balances[:, self._columns[name]]
+
+    def copy(self) -> "PlanFrame":
+        """A frame with its own copies of every column."""
+        return PlanFrame(self.names, self.dates.copy(), self.payments.copy(), self.balances.copy(),
+                         *(getattr(self, field).copy() for field in self.TOTALS))
+
+    def to_rows(self) -> List[Dict]:
+        return list(self)
@@ -0,0 +1,64 @@
+from typing import Iterator, List
+from models.loan import Loan
+
+RANKINGS = ("balance", "priority")
+
+
+class PriorityIndex:
+    """
+    Loans held in payoff order across simulated months.
+
+    With rank_by="balance" loans are ranked smallest balance first (stable, so ties
+    keep their previous order), as the Snowball method re-ranks every month. With
+    rank_by="priority" the order the loans were given in is kept for the whole plan,
+    as for Avalanche and custom orderings whose criterion does not change.
+
+    Paid-off loans are retired to a settled list that precedes the active ones, so
+    iterating the index yields the same order as a stable sort by balance. After each
+    month update() only moves loans whose rank actually changed, instead of
+    re-sorting the whole portfolio.
+    """
+
+    def __init__(self, loans: List[Loan], rank_by: str = "balance"):
+        """
+        Args:
+            loans (List[Loan]): Loans in priority order.
+            rank_by (str): "balance" or "priority", see RANKINGS.
+        """
+        if rank_by not in RANKINGS:
+            raise ValueError(f"Unknown ranking '{rank_by}', expected one of {RANKINGS}")
+        self.rank_by = rank_by
+        if rank_by == "balance":
+            loans = sorted(loans, key=lambda loan: loan.current_balance)
+        self.settled = [loan for loan in loans if loan.current_balance <= 0]
+        self.active = [loan for loan in loans if loan.current_balance > 0]
+
+    def __iter__(self) -> Iterator[Loan]:
+        yield from self.settled
+        yield from self.active
+
+    def __len__(self):
+        return len(self.settled) + len(self.active)
+
+    def update(self):
+        """
+        Retire paid-off loans and restore the ranking after balances changed.
+        """
+        active = self.active
+        if any(loan.current_balance <= 0 for loan in active):
+            self.settled.extend(loan for loan in active if loan.current_balance <= 0)
+            active = self.active = [loan for loan in active if loan.current_balance > 0]
+
+        if self.rank_by != "balance":
+            return
+        # Insertion repair: linear when nothing moved, and stable like list.sort
+        keys = [loan.current_balance for loan in active]
+        for i in range(1, len(active)):
+            key = keys[i]
+            if key >= keys[i - 1]:
+                continue
+            j = i - 1
+            while j > 0 and key < keys[j - 1]:
+                j -= 1
+            active.insert(j, active.pop(i))
+            keys.insert(j, keys.pop(i))
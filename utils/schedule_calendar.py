@@ -0,0 +1,100 @@
+from calendar import monthrange
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Optional
+import numpy as np
+
+# datetime64[D] counts days from 1970-01-01; date ordinals count from 0001-01-01
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Payoff plans stop after 1000 periods, so a shared calendar rarely needs to grow
+DEFAULT_PERIODS = 1000
+
+
+def due_dates(start_date: date, periods: int) -> np.ndarray:
+    """
+    Due dates of ``periods`` monthly payments starting on start_date, as datetime64[D].
+
+    Period k falls k calendar months after start_date on start_date's day of month,
+    clamped to the last day of shorter months: a loan first due on January 31st is
+    due on February 28th (or 29th), then on March 31st again.
+    """
+    months = np.datetime64(start_date, "M") + np.arange(periods)
+    first = months.astype("datetime64[D]")
+    month_lengths = ((months + 1).astype("datetime64[D]") - first).astype(np.int64)
+    return first + (np.minimum(start_date.day, month_lengths) - 1)
+
+
+def period_of(start_date: date, on_date: date) -> int:
+    """
+    First period of a schedule starting on start_date that is due on or after on_date.
+
+    Computed from the month difference, so no table is needed however far away on_date is.
+
+    Returns:
+        int: Period index, 0 for dates on or before start_date.
+    """
+    period = (on_date.year - start_date.year) * 12 + on_date.month - start_date.month
+    if period <= 0:
+        return 0 if on_date <= start_date else 1
+    year, month = divmod(start_date.month - 1 + period, 12)
+    year += start_date.year
+    due = date(year, month + 1, min(start_date.day, monthrange(year, month + 1)[1]))
+    return period if due >= on_date else period + 1
+
+
+class ScheduleCalendar:
+    """
+    Precomputed due-date table for schedules that start on the same date.
+
+    Holds the due_dates of a schedule as datetime64[D] (``days``), as date ordinals
+    (``ordinals``) and as "YYYY-MM-DD" strings (``iso``, built on first use), so
+    simulations look a period's date up by index instead of doing date arithmetic
+    and strftime per row. Calendars are shared through starting() and grow on
+    demand; existing entries never change.
+    """
+
+    def __init__(self, start_date: date, periods: int = DEFAULT_PERIODS):
+        """
+        Args:
+            start_date (date): Due date of period 0; its day of month anchors every later period.
+            periods (int): Number of periods to precompute.
+        """
+        self.start_date = start_date
+        self.days = due_dates(start_date, periods)
+        self.ordinals = self.days.astype(np.int64) + _EPOCH_ORDINAL
+        self._iso: List[str] = []
+
+    @classmethod
+    def starting(cls, start_date: Optional[date] = None) -> "ScheduleCalendar":
+        """
+        The shared calendar for schedules starting on start_date, today by default.
+        """
+        return _shared_calendar(start_date or datetime.today().date())
+
+    def __len__(self):
+        return len(self.days)
+
+    def extend(self, periods: int) -> "ScheduleCalendar":
+        """
+        Make sure the table covers at least ``periods`` periods, at least doubling it when it grows.
+        """
+        if periods > len(self):
+            self.days = due_dates(self.start_date, max(periods, 2 * len(self)))
+            self.ordinals = self.days.astype(np.int64) + _EPOCH_ORDINAL
+        return self
+
+    @property
+    def iso(self) -> List[str]:
+        """Due dates as "YYYY-MM-DD" strings, one per period."""
+        if len(self._iso) < len(self.days):
+            self._iso = self._iso + np.datetime_as_string(self.days[len(self._iso):], unit="D").tolist()
+        return self._iso
+
+    def due_date(self, period: int) -> date:
+        """Due date of one period as a date."""
+        return date.fromordinal(int(self.ordinals[period]))
+
+
+@lru_cache(maxsize=64)
+def _shared_calendar(start_date: date) -> ScheduleCalendar:
+    return ScheduleCalendar(start_date)
@@ -0,0 +1,97 @@
+from typing import Dict, List, Optional, Sequence
+from models.loan import Loan
+from utils.parallel import process_map
+
+
+def default_strategies(custom_orderings: Sequence[Sequence[int]] = (), engine: str = "numpy") -> Dict:
+    """
+    Snowball, Avalanche and one Custom strategy per ordering, keyed by display label.
+
+    Args:
+        custom_orderings (Sequence[Sequence[int]]): Loan id orderings, one Custom strategy each.
+        engine (str): Payoff engine for every strategy, see utils.ENGINES.
+
+    Returns:
+        Dict: Label to PayoffStrategy, in comparison order.
+    """
+    from strategies.snowball import SnowballStrategy
+    from strategies.avalanche import AvalancheStrategy
+    from strategies.custom_strategy import CustomStrategy
+    strategies = {"Snowball": SnowballStrategy(engine=engine), "Avalanche": AvalancheStrategy(engine=engine)}
+    for number, ordering in enumerate(custom_orderings, start=1):
+        strategies[f"Custom {number}"] = CustomStrategy(loan_priority=list(ordering), engine=engine)
+    return strategies
+
+
+def compare_strategies(loans: List[Loan], strategies: Optional[Dict] = None, extra_cash: float = 0.0,
+                       processes: Optional[int] = None) -> List[Dict]:
+    """
+    Summarize several payoff strategies side by side, one strategy per worker process.
+
+    Each strategy runs its summarize_plan through utils.parallel.process_map, which
+    falls back to running them one after another in this process.
+
+    Args:
+        loans (List[Loan]): Loans to plan for.
+        strategies (Dict, optional): Label to PayoffStrategy; defaults to default_strategies().
+        extra_cash (float): Additional monthly cash available for loan payments.
+        processes (int, optional): Worker processes; defaults to os.cpu_count().
+
+    Returns:
+        List[Dict]: One row per strategy, in the given order, with "strategy", "payoff_month",
+                    "payoff_date", "paid_off", "total_paid", "total_interest", and
+                    "months_saved" / "interest_saved" relative to the slowest strategy.
+    """
+    if strategies is None:
+        strategies = default_strategies()
+    tasks = [(label, strategy, loans, extra_cash) for label, strategy in strategies.items()]
+    return _comparison_rows(process_map(_summarize, tasks, processes))
+
+
+def format_comparison(rows: List[Dict]) -> str:
+    """
+    Render compare_strategies rows as a fixed-width text table.
+    """
+    header = f"{'Strategy':<14} {'Payoff Date':>12} {'Months':>6} {'Total Interest':>16} {'Months Saved':>12}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        payoff_date = row["payoff_date"] or "not paid off"
+        lines.append(f"{row['strategy']:<14} {payoff_date:>12} {row['payoff_month']:>6} "
+                     f"{row['total_interest']:>16,.2f} {row['months_saved']:>12}")
+    return "\n".join(lines)
+
+
+def _summarize(task) -> Dict:
+    # Module level so worker processes can unpickle it
+    label, strategy, loans, extra_cash = task
+    summary = strategy.summarize_plan(loans, extra_cash)
+    return dict(summary, strategy=label)
+
+
+def _comparison_rows(summaries: List[Dict]) -> List[Dict]:
+    if not summaries:
+        return []
+    slowest = max(summaries, key=lambda summary: (summary["payoff_month"], summary["total_interest"]))
+    return [{
+        "strategy": summary["strategy"],
+        "payoff_month": summary["payoff_month"],
+        "payoff_date": summary["payoff_date"],
+        "paid_off": summary["paid_off"],
+        "total_paid": summary["total_paid"],
+        "total_interest": summary["total_interest"],
+        "months_saved": slowest["payoff_month"] - summary["payoff_month"],
+        "interest_saved": round(slowest["total_interest"] - summary["total_interest"], 2),
+    } for summary in summaries]
+
+
+if __name__ == "__main__":
+    # Compare the default strategies for the loans in the application database
+    from database.db import Database
+    from models.portfolio import Portfolio
+    db = Database()
+    db.connect()
+    try:
+        db_loans = Portfolio.from_database(db)
+    finally:
+        db.close()
+    print(format_comparison(compare_strategies(db_loans)))
@@ -0,0 +1,422 @@
+from typing import List, Dict, Iterator, Optional
+import numpy as np
+from models.loan import Loan
+from models.portfolio import Portfolio
+from utils.plan_frame import PlanFrame
+from utils.schedule_calendar import ScheduleCalendar
+from utils.plan_events import (PlanEvent, EventQueue, build_event_queue, FORBEARANCE_START, FORBEARANCE_END, RATE,
+                               RATE_STEP, LUMP_SUM)
+
+
+def round_cents(values: np.ndarray) -> np.ndarray:
+    """
+    Round an array to cents exactly the way the built-in round(x, 2) does.
+
+    np.round scales by 100 before rounding, which can land on the wrong side of
+    a half-cent. Those values sit within a couple of ulps of the tie, so they
+    are detected and rounded with the built-in instead.
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, 2)
+    scaled = values * 100.0
+    near_tie = np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) <= 2 * np.spacing(np.abs(scaled))
+    for idx in np.flatnonzero(near_tie):
+        rounded.flat[idx] = round(float(values.flat[idx]), 2)
+    return rounded
+
+
+def cascade(pool, balances: np.ndarray) -> np.ndarray:
+    """
+    Pour ``pool`` into ``balances`` front to back, returning the amount each loan receives.
+
+    Entries that should be skipped must be passed as 0. The running pool is built with
+    subtract.accumulate so it matches the sequential ``pool -= bonus`` of the Python engine.
+    A 2-D ``balances`` is treated as one row per scenario with ``pool`` holding one value per row.
+    """
+    pool = np.asarray(pool, dtype=float)[..., None]
+    remaining = np.subtract.accumulate(np.concatenate((pool, balances), axis=-1), axis=-1)[..., :-1]
+    return np.where(remaining > 0, np.minimum(remaining, balances), 0.0)
+
+
+class LoanArrays:
+    """
+    Array view of a prioritized list of loans used by the vectorized engine.
+    """
+
+    def __init__(self, prioritized_loans: List[Loan]):
+        if isinstance(prioritized_loans, Portfolio):
+            # Already columnar; copy so the simulation never writes into the portfolio
+            self.names = prioritized_loans.names.tolist()
+            self.balances = prioritized_loans.balances.copy()
+            self.interest_rates = prioritized_loans.interest_rates.copy()
+            self.monthly_rates = self.interest_rates / 100 / 12
+            self.min_payments = prioritized_loans.min_payments.copy()
+            # Summed left to right like the list path, so both give bit-identical budgets
+            self.minimum_total_payment = sum(prioritized_loans.min_payments.tolist())
+            return
+        self.names = [loan.name for loan in prioritized_loans]
+        self.balances = np.array([loan.current_balance for loan in prioritized_loans], dtype=float)
+        self.interest_rates = np.array([loan.interest_rate for loan in prioritized_loans], dtype=float)
+        self.monthly_rates = self.interest_rates / 100 / 12
+        self.min_payments = np.array([loan.monthly_min_payment for loan in prioritized_loans], dtype=float)
+        self.minimum_total_payment = sum(loan.monthly_min_payment for loan in prioritized_loans)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def simulate_month(bal: np.ndarray, rates: np.ndarray, min_payments: np.ndarray,
+                   extra_cash: float, fixed_budget: float, frozen: Optional[np.ndarray] = None):
+    """
+    Advance one month for loans given in ranking order.
+
+    Args:
+        bal (np.ndarray): Balances at the start of the month, in ranking order.
+        rates (np.ndarray): Monthly interest rates, in ranking order.
+        min_payments (np.ndarray): Minimum payments, in ranking order.
+        extra_cash (float): Extra cash poured into the ranking after minimums.
+        fixed_budget (float): Total the month's payments are topped up to.
+        frozen (np.ndarray, optional): Loans in forbearance, in ranking order; they
+            neither accrue interest nor take payments this month.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Balances after the month and the rounded
+        payment made on each loan, both in ranking order.
+    """
+    active = bal > 0
+    if frozen is not None:
+        active &= ~frozen
+
+    # 1) Accrue interest and pay minimums on every active loan at once
+    interest = np.where(active, bal * rates, 0.0)
+    bal = np.where(active, bal + interest, bal)
+    mins = np.where(active, min_payments, 0.0)
+    paid = np.where(active, np.minimum(mins, bal), 0.0)
+    principal = np.maximum(0.0, paid - np.minimum(paid, interest))
+    bal = bal - principal
+    freed = float(np.cumsum(mins - paid)[-1]) if len(mins) else 0.0
+    payments = round_cents(paid)
+
+    # 2) Cascade the extra pool down the ranking
+    owed = bal > 0 if frozen is None else (bal > 0) & ~frozen
+    bonus = cascade(extra_cash + freed, np.where(owed, bal, 0.0))
+    bal = bal - bonus
+    payments = payments + round_cents(bonus)
+
+    # 2a) Ensure total_payment equals fixed_budget
+    actual_total = sum(payments.tolist())
+    if actual_total < fixed_budget:
+        owed = bal > 0 if frozen is None else (bal > 0) & ~frozen
+        bonus = cascade(fixed_budget - actual_total, np.where(owed, bal, 0.0))
+        bal = bal - bonus
+        payments = payments + round_cents(bonus)
+
+    return bal, payments
+
+
+def _apply_events(events: EventQueue, iteration: int, annual_rates: np.ndarray, monthly_rates: np.ndarray,
+                  frozen: np.ndarray) -> float:
+    """
+    Apply the events due by this period to the rate and forbearance arrays, returning the lump sums.
+    """
+    lump_sum = 0.0
+    for kind, position, value in events.pop_due(iteration):
+        if kind == LUMP_SUM:
+            lump_sum += value
+        elif kind in (FORBEARANCE_START, FORBEARANCE_END):
+            frozen[position] = kind == FORBEARANCE_START
+        elif kind in (RATE, RATE_STEP):
+            rate = value if kind == RATE else max(0.0, float(annual_rates[position]) + value)
+            annual_rates[position] = rate
+            # Same expression as the Python engine's interest, so both charge identical amounts
+            monthly_rates[position] = rate / 100 / 12
+    return lump_sum
+
+
+def _iter_months(state: LoanArrays, user_extra_cash: float, extra_cash_schedule: Optional[Dict[int, float]],
+                 rank_by: str, checkpoint=None, events: Optional[EventQueue] = None):
+    """
+    Run the monthly loop, yielding each committed month.
+
+    Args:
+        checkpoint (Tuple, optional): (iteration, balances, order, prev_total_balance) to
+            resume from instead of the loans' starting state.
+        events (EventQueue, optional): Events of the plan, consumed as months pass. When
+            resuming, the events before the checkpoint are replayed first.
+
+    Yields:
+        Tuple: (order, bal, payments, fixed_budget, total_balance, balances) where bal and
+        payments are in ranking order and balances is the live state in loan order.
+    """
+    if checkpoint is None:
+        checkpoint = (0, state.balances, np.arange(len(state)), None)
+    iteration, balances, order, prev_total_balance = checkpoint
+    balances = balances.copy()
+    extra_cash_schedule = extra_cash_schedule or {}
+    max_iterations = 1000
+    rates, frozen = state.monthly_rates, None
+    if events:
+        annual_rates, rates, frozen = state.interest_rates.copy(), rates.copy(), np.zeros(len(state), dtype=bool)
+        if iteration:
+            _apply_events(events, iteration - 1, annual_rates, rates, frozen)
+
+    while np.any(balances > 0):
+        ranked = balances[order]
+        if rank_by == "balance" and np.any(ranked[1:] < ranked[:-1]):
+            # Re-rank only in months where some loan actually changed places
+            order = order[np.argsort(ranked, kind="stable")]
+        if iteration >= max_iterations:
+            break
+
+        # Budget for this period, from the schedule when it has an entry
+        period_extra_cash = extra_cash_schedule.get(iteration, user_extra_cash)
+        if frozen is not None:
+            period_extra_cash += _apply_events(events, iteration, annual_rates, rates, frozen)
+        fixed_budget = state.minimum_total_payment + period_extra_cash
+
+        bal, payments = simulate_month(balances[order], rates[order], state.min_payments[order],
+                                       period_extra_cash, fixed_budget, None if frozen is None else frozen[order])
+        total_balance = sum(np.maximum(bal, 0.0).tolist())
+
+        # Detect stagnation; balances in forbearance stand still on purpose
+        if (prev_total_balance is not None and (frozen is None or not frozen.any())
+                and abs(total_balance - prev_total_balance) < 0.01):
+            break
+        prev_total_balance = total_balance
+
+        balances[order] = bal
+        yield order, bal, payments, fixed_budget, total_balance, balances
+        iteration += 1
+
+
+def generate_payment_plan_vectorized(prioritized_loans: List[Loan], user_extra_cash: float,
+                                    extra_cash_schedule: Optional[Dict[int, float]] = None,
+                                    rank_by: str = "balance",
+                                    events: Optional[List[PlanEvent]] = None) -> PlanFrame:
+    """
+    Generate a payment plan with NumPy arrays, written straight into a PlanFrame.
+
+    Takes the same arguments as iter_payment_plan_vectorized; no per-period dicts are built.
+
+    Returns:
+        PlanFrame: The plan in columnar form.
+    """
+    state = LoanArrays(prioritized_loans)
+    if len(set(state.names)) != len(state.names):
+        from utils.generate_payment_plan import iter_payment_plan
+        return PlanFrame.from_rows(iter_payment_plan(prioritized_loans, user_extra_cash,
+                                                     extra_cash_schedule=extra_cash_schedule, rank_by=rank_by,
+                                                     events=events),
+                                   list(dict.fromkeys(state.names)))
+
+    payments, balances, fixed_budgets, total_balances = [], [], [], []
+    months = _iter_months(state, user_extra_cash, extra_cash_schedule, rank_by,
+                          events=build_event_queue(prioritized_loans, events))
+    for order, bal, paid, fixed_budget, total_balance, _ in months:
+        row = np.empty(len(state))
+        row[order] = paid
+        payments.append(row)
+        row = np.empty(len(state))
+        row[order] = bal
+        balances.append(row)
+        fixed_budgets.append(round(fixed_budget, 2))
+        total_balances.append(round(total_balance, 2))
+
+    periods = len(payments)
+    return PlanFrame(state.names, ScheduleCalendar.starting().extend(periods).days[:periods],
+                     np.array(payments).reshape(periods, len(state)),
+                     round_cents(np.array(balances).reshape(periods, len(state))),
+                     fixed_budgets, total_balances,
+                     np.full(periods, round(state.minimum_total_payment, 2)), fixed_budgets)
+
+
+def iter_payment_plan_vectorized(prioritized_loans: List[Loan], user_extra_cash: float,
+                                 extra_cash_schedule: Optional[Dict[int, float]] = None,
+                                 rank_by: str = "balance",
+                                 events: Optional[List[PlanEvent]] = None) -> Iterator[Dict]:
+    """
+    Yield payment plan periods computed with NumPy arrays instead of per-loan Python loops.
+
+    Produces the same periods as utils.generate_payment_plan: loans are ranked by
+    balance (stable, so ties keep their previous order) or kept in priority order,
+    minimums are paid, and the extra pool cascades down the ranking.
+
+    Args:
+        prioritized_loans (List[Loan]): Loans in priority order.
+        user_extra_cash (float): Extra cash available each month.
+        extra_cash_schedule (Dict[int, float], optional): Sparse map of period index to
+            the extra cash for that period, used in place of user_extra_cash.
+        rank_by (str): "balance" or "priority", see utils.priority_index.RANKINGS.
+        events (List[PlanEvent], optional): Extra plan events, see utils.plan_events.build_event_queue.
+
+    Returns:
+        Iterator[Dict]: Each entry includes payment details, balances, and fixed totals.
+    """
+    state = LoanArrays(prioritized_loans)
+    if len(set(state.names)) != len(state.names):
+        # Plans are keyed by loan name; leave the collision semantics to the reference engine
+        from utils.generate_payment_plan import iter_payment_plan
+        yield from iter_payment_plan(prioritized_loans, user_extra_cash, extra_cash_schedule=extra_cash_schedule,
+                                     rank_by=rank_by, events=events)
+        return
+
+    names = np.array(state.names, dtype=object)
+    minimum_total_payment = round(state.minimum_total_payment, 2)
+    dates = ScheduleCalendar.starting().extend(1000).iso  # _iter_months stops after 1000 periods
+
+    months = _iter_months(state, user_extra_cash, extra_cash_schedule, rank_by,
+                          events=build_event_queue(prioritized_loans, events))
+    for month, (order, bal, payments, fixed_budget, total_balance, _) in enumerate(months):
+        sorted_names = names[order].tolist()
+        yield {
+            "date": dates[month],
+            "payments": dict(zip(sorted_names, payments.tolist())),
+            "balances": dict(zip(sorted_names, round_cents(bal).tolist())),
+            "total_payment": round(fixed_budget, 2),
+            "total_balance": round(total_balance, 2),
+            "minimum_total_payment": minimum_total_payment,
+            "adjusted_total_payment": round(fixed_budget, 2),
+        }
+
+
+def summarize_plan_vectorized(prioritized_loans: List[Loan], user_extra_cash: float,
+                              extra_cash_schedule: Optional[Dict[int, float]] = None,
+                              rank_by: str = "balance",
+                              events: Optional[List[PlanEvent]] = None) -> Dict:
+    """
+    Aggregates of generate_payment_plan_vectorized without building any period rows.
+
+    Returns:
+        Dict: See utils.generate_payment_plan.summarize_payment_plan.
+    """
+    state = LoanArrays(prioritized_loans)
+    if len(set(state.names)) != len(state.names):
+        from utils.generate_payment_plan import summarize_payment_plan
+        return summarize_payment_plan(prioritized_loans, user_extra_cash, extra_cash_schedule=extra_cash_schedule,
+                                      rank_by=rank_by, events=events)
+
+    balances = state.balances
+    was_active = balances > 0
+    payoff_month = np.zeros(len(state), dtype=int)
+    months = 0
+    total_paid = 0.0
+    for months, (_, _, payments, _, _, balances) in enumerate(
+            _iter_months(state, user_extra_cash, extra_cash_schedule, rank_by,
+                         events=build_event_queue(prioritized_loans, events)), start=1):
+        total_paid += sum(payments.tolist())
+        active = balances > 0
+        payoff_month[was_active & ~active] = months
+        was_active = active
+
+    paid_off = not np.any(balances > 0)
+    retired = np.maximum(state.balances, 0.0).sum() - np.maximum(balances, 0.0).sum()
+    return {
+        "payoff_month": months,
+        "payoff_date": ScheduleCalendar.starting().iso[months - 1] if months and paid_off else None,
+        "paid_off": paid_off,
+        "total_paid": round(total_paid, 2),
+        "total_interest": round(total_paid - float(retired), 2),
+        "loan_payoff_months": {name: int(month) or None for name, month in zip(state.names, payoff_month)},
+    }
+
+
+def sweep_extra_cash(prioritized_loans: List[Loan], extra_cash_values, rank_by: str = "balance",
+                     events: Optional[List[PlanEvent]] = None) -> Dict[str, np.ndarray]:
+    """
+    Simulate one payoff plan per extra-cash amount in a single pass.
+
+    State is held as a scenario x loan matrix and every scenario advances together,
+    using the same monthly rules as generate_payment_plan_vectorized. Only the
+    aggregates are kept, so no per-period rows are built.
+
+    Args:
+        prioritized_loans (List[Loan]): Loans in priority order.
+        extra_cash_values (Iterable[float]): Extra cash per month, one entry per scenario.
+        rank_by (str): "balance" or "priority", see utils.priority_index.RANKINGS.
+        events (List[PlanEvent], optional): Extra plan events. Plans with any events,
+            including the loans' own, are simulated one scenario at a time.
+
+    Returns:
+        Dict[str, np.ndarray]: Arrays aligned with ``extra_cash_values``:
+            - "extra_cash": The simulated extra-cash amounts
+            - "payoff_month": Number of periods in each plan
+            - "total_interest": Paid minus principal retired
+            - "total_paid": Sum of all payments
+            - "paid_off": False where the plan stopped with balances remaining
+    """
+    extra_cash = np.asarray(extra_cash_values, dtype=float).ravel()
+    if build_event_queue(prioritized_loans, events):
+        # Events change rates and frozen loans per month; the scenario matrix assumes fixed terms
+        summaries = [summarize_plan_vectorized(prioritized_loans, float(value), rank_by=rank_by, events=events)
+                     for value in extra_cash]
+        return {
+            "extra_cash": extra_cash,
+            "payoff_month": np.array([summary["payoff_month"] for summary in summaries], dtype=int),
+            "total_interest": np.array([summary["total_interest"] for summary in summaries], dtype=float),
+            "total_paid": np.array([summary["total_paid"] for summary in summaries], dtype=float),
+            "paid_off": np.array([summary["paid_off"] for summary in summaries], dtype=bool),
+        }
+
+    state = LoanArrays(prioritized_loans)
+    scenarios, count = len(extra_cash), len(state)
+
+    balances = np.tile(state.balances, (scenarios, 1))
+    order = np.tile(np.arange(count), (scenarios, 1))
+    fixed_budget = state.minimum_total_payment + extra_cash
+    payoff_month = np.zeros(scenarios, dtype=int)
+    total_paid = np.zeros(scenarios)
+    prev_total_balance = np.full(scenarios, np.nan)
+    running = np.ones(scenarios, dtype=bool)
+    max_iterations = 1000
+
+    while True:
+        running &= np.any(balances > 0, axis=1) & (payoff_month < max_iterations)
+        if not running.any():
+            break
+
+        bal = np.take_along_axis(balances, order, axis=1)
+        if rank_by == "balance" and np.any(bal[:, 1:] < bal[:, :-1]):
+            order = np.take_along_axis(order, np.argsort(bal, axis=1, kind="stable"), axis=1)
+            bal = np.take_along_axis(balances, order, axis=1)
+        rates = state.monthly_rates[order]
+        active = bal > 0
+
+        # 1) Accrue interest and pay minimums
+        interest = np.where(active, bal * rates, 0.0)
+        bal = np.where(active, bal + interest, bal)
+        mins = np.where(active, state.min_payments[order], 0.0)
+        paid = np.where(active, np.minimum(mins, bal), 0.0)
+        bal = bal - np.maximum(0.0, paid - np.minimum(paid, interest))
+        freed = np.cumsum(mins - paid, axis=1)[:, -1] if count else np.zeros(scenarios)
+        payments = round_cents(paid)
+
+        # 2) Cascade the extra pool, then top up to the fixed budget
+        bonus = cascade(extra_cash + freed, np.where(bal > 0, bal, 0.0))
+        bal = bal - bonus
+        payments = payments + round_cents(bonus)
+        actual_total = np.cumsum(payments, axis=1)[:, -1] if count else np.zeros(scenarios)
+        shortfall = np.where(actual_total < fixed_budget, fixed_budget - actual_total, 0.0)
+        bonus = cascade(shortfall, np.where(bal > 0, bal, 0.0))
+        bal = bal - bonus
+        payments = payments + round_cents(bonus)
+
+        # 3) Commit scenarios that are still moving
+        total_balance = np.cumsum(np.maximum(bal, 0.0), axis=1)[:, -1] if count else np.zeros(scenarios)
+        stagnant = np.abs(total_balance - prev_total_balance) < 0.01
+        commit = running & ~stagnant
+        updated = np.empty_like(balances)
+        np.put_along_axis(updated, order, bal, axis=1)
+        balances = np.where(commit[:, None], updated, balances)
+        total_paid = np.where(commit, total_paid + (np.cumsum(payments, axis=1)[:, -1] if count else 0.0), total_paid)
+        prev_total_balance = np.where(commit, total_balance, prev_total_balance)
+        payoff_month += commit
+        running &= ~stagnant
+
+    retired = np.maximum(state.balances, 0.0).sum() - np.maximum(balances, 0.0).sum(axis=1)
+    return {
+        "extra_cash": extra_cash,
+        "payoff_month": payoff_month,
+        "total_interest": round_cents(total_paid - retired),
+        "total_paid": round_cents(total_paid),
+        "paid_off": ~np.any(balances > 0, axis=1),
+    }